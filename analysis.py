@@ -1,40 +1,298 @@
 # analysis.py
 import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
 import pandas as pd
 import json
 import yaml
+import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from profile_store import ProfileStore, METADATA as PROFILE_METADATA
+
 # --- Constants from solver.py ---
 L_PRE_MIN, L_PRE_MAX = 0.02, 0.04
 POROSITY_MIN, POROSITY_MAX = 0.75, 0.85
 
-def load_results(file_path):
-    """Load results from either JSON or YAML file"""
+# Evaluation-log field -> key used in results.yaml entries
+LOG_FIELDS = {
+    'heat': 'Heat',
+    'nox': 'NOx',
+    'flame_location': 'Flame',
+    'fitness': 'Fitness',
+    'generation': 'Generation',
+    'status': 'Status',
+    'fidelity': 'Fidelity',
+    'solve_time': 'SolveTime',
+    'grid_points': 'GridPoints',
+    'coarse_heat': 'CoarseHeat',
+    'coarse_nox': 'CoarseNOx',
+    'coarse_flame_location': 'CoarseFlame',
+}
+
+def read_log_records(file_path, offset=0):
+    """
+    Read complete JSON-lines records from offset onwards.
+    A trailing line without a newline is still being written and is left for the next read.
+    Returns:
+        (records, offset just past the last complete line)
+    """
+    records = []
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        chunk = f.read()
+    end = chunk.rfind(b'\n') + 1
+    for line in chunk[:end].splitlines():
+        if line.strip():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records, offset + end
+
+# Run selection in an evaluation log shared by several runs (records carry a run_id)
+LATEST_RUN = 'latest'
+ALL_RUNS = 'all'
+
+def select_run(records, run=LATEST_RUN):
+    """
+    Records of one run: the run of the last record (LATEST_RUN), a given run
+    id, or every record (ALL_RUNS). Logs written before run ids existed count
+    as a single run.
+    """
+    if run == ALL_RUNS or not records:
+        return records
+    if run == LATEST_RUN:
+        run = records[-1].get('run_id')
+    return [r for r in records if r.get('run_id') == run]
+
+def log_record_to_result(record):
+    """Convert one evaluation-log record into a results.yaml style entry"""
+    result = {'porosities': [record['eps1'], record['eps2']], 'Lpre': record['Lpre']}
+    for field, key in LOG_FIELDS.items():
+        if field in record:
+            result[key] = record[field]
+    return result
+
+def load_evaluation_log(file_path, run=LATEST_RUN):
+    """Load one run of the solver's evaluation log (safe to call while the run is still writing it)"""
+    records, _ = read_log_records(file_path)
+    records = select_run(records, run)
+    results = [log_record_to_result(r) for r in records]
+    return {
+        'results': [r for r in results if r.get('Status', 'ok') == 'ok'],
+        'unsuccessful': [r for r in results if r.get('Status', 'ok') != 'ok']
+    }
+
+def watch_evaluation_log(file_path, interval=10.0, stats_path='analysis_statistics.json',
+                         plot_path='peak_fitness_vs_generation.png'):
+    """
+    Follow an evaluation log: print a progress line whenever new evaluations are
+    appended, and keep stats_path and the per-generation fitness plot up to date.
+    Only the new records are read each time; statistics are updated incrementally.
+    The statistics follow the latest run: they restart when a new run id appears.
+    """
+    matplotlib.use('Agg')
+    engine = StreamingStatistics()
+    offset = 0
+    count = failures = 0
+    best = None
+    run_id = None
+    while True:
+        if Path(file_path).exists():
+            records, offset = read_log_records(file_path, offset)
+            for record in records:
+                if record.get('run_id') != run_id:
+                    if count:
+                        print(f"New run {record.get('run_id')}: statistics restart", flush=True)
+                    run_id = record.get('run_id')
+                    engine = StreamingStatistics()
+                    count = failures = 0
+                    best = None
+                count += 1
+                engine.add_record(record)
+                if record.get('status', 'ok') != 'ok':
+                    failures += 1
+                elif best is None or record['fitness'] > best['fitness']:
+                    best = record
+            if records:
+                line = f"{count} evaluations ({failures} unsuccessful), generation {records[-1].get('generation')}"
+                if best is not None:
+                    line += (f" | best fitness {best['fitness']:.2f} at "
+                             f"[{best['eps1']:.4f}, {best['eps2']:.4f}, {best['Lpre']:.4f}]")
+                print(line, flush=True)
+                stats = engine.summary()
+                if stats:
+                    with open(stats_path, 'w') as f:
+                        json.dump(stats, f, indent=4)
+                    plot_peak_fitness(plot_path, *engine.generation_series())
+        time.sleep(interval)
+
+# --- Columnar loading ---
+# Column name -> key in results.yaml entries (parameters are handled separately)
+RESULT_COLUMNS = {
+    'heat': 'Heat',
+    'nox': 'NOx',
+    'flame_loc': 'Flame',
+    'fitness': 'Fitness',
+    'generation': 'Generation',
+    'solve_time': 'SolveTime',
+    'grid_points': 'GridPoints',
+    'coarse_heat': 'CoarseHeat',
+    'coarse_nox': 'CoarseNOx',
+    'coarse_flame_loc': 'CoarseFlame',
+}
+CACHE_VERSION = 2
+
+# libyaml's loader is several times faster than the pure-Python one for large archives
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+def entries_to_columns(entries):
+    """
+    Fill preallocated NumPy columns from a list of results.yaml style entries.
+    Missing values are NaN; entries without parameters or heat release are dropped.
+    """
+    n = len(entries)
+    columns = {'parameters': np.full((n, 3), np.nan)}
+    columns.update({name: np.full(n, np.nan) for name in RESULT_COLUMNS})
+    items = list(RESULT_COLUMNS.items())
+    keep = np.zeros(n, dtype=bool)
+    for i, entry in enumerate(entries):
+        try:
+            eps1, eps2 = entry['porosities']
+            columns['parameters'][i] = (eps1, eps2, entry['Lpre'])
+            columns['heat'][i] = entry['Heat']
+        except (KeyError, TypeError, ValueError):
+            continue
+        keep[i] = True
+        for name, key in items:
+            value = entry.get(key)
+            if value is not None:
+                columns[name][i] = value
+    if not keep.all():
+        print(f"Warning: Skipping {n - int(keep.sum())} results without parameters or heat release")
+        columns = {name: column[keep] for name, column in columns.items()}
+    return columns
+
+def log_to_columns(file_path, run=LATEST_RUN):
+    """Columns of the successful evaluations of one run in an evaluation log, plus the failure count"""
+    records, _ = read_log_records(file_path)
+    records = select_run(records, run)
+    ok = [log_record_to_result(r) for r in records if r.get('status', 'ok') == 'ok']
+    return entries_to_columns(ok), len(records) - len(ok)
+
+def cache_path(file_path):
+    """Binary cache written next to the source file"""
+    file_path = Path(file_path)
+    return file_path.with_name(f".{file_path.name}.npz")
+
+def file_digest(file_path):
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_column_cache(file_path, run=LATEST_RUN):
+    """
+    Columns from the cache if it still matches the source file, else None.
+    A matching mtime and size is trusted; otherwise the content hash decides
+    (so a touched or re-copied but unchanged archive still hits).
+    """
+    path = cache_path(file_path)
+    if not path.exists():
+        return None
+    try:
+        with np.load(path) as cached:
+            meta = json.loads(str(cached['_meta']))
+            columns = {name: cached[name] for name in cached.files if name != '_meta'}
+    except Exception:
+        return None
+    if meta.get('version') != CACHE_VERSION or meta.get('run') != run:
+        return None
+    stat = Path(file_path).stat()
+    if meta['size'] != stat.st_size:
+        return None
+    if meta['mtime_ns'] != stat.st_mtime_ns:
+        if meta['sha1'] != file_digest(file_path):
+            return None
+        write_column_cache(file_path, columns, meta['unsuccessful'], meta['sha1'], run)
+    return columns, meta['unsuccessful']
+
+def write_column_cache(file_path, columns, unsuccessful, digest=None, run=LATEST_RUN):
+    """Store columns next to the source file (best effort: a read-only directory just skips it)"""
+    stat = Path(file_path).stat()
+    meta = {'version': CACHE_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+            'sha1': digest or file_digest(file_path), 'unsuccessful': unsuccessful, 'run': run}
+    path = cache_path(file_path)
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    try:
+        with open(tmp, 'wb') as f:
+            np.savez(f, _meta=np.array(json.dumps(meta)), **columns)
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+def load_results(file_path, use_cache=True, run=LATEST_RUN):
+    """
+    Load results from a JSON, YAML or evaluation-log (JSONL) file.
+    Archives holding a 'results' list are returned in columnar form,
+    {'columns': {name: array}, 'unsuccessful': count}, and cached as .npz next
+    to the source so an unchanged archive loads without parsing. For an
+    evaluation log, only the records of run (see select_run) are loaded.
+    Other layouts are returned as parsed.
+    """
     file_path = Path(file_path)
     if not file_path.exists():
         raise FileNotFoundError(f"File not found: {file_path}")
         
     if file_path.stat().st_size == 0:
         raise ValueError(f"File is empty: {file_path}")
-        
-    if file_path.suffix == '.json':
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-    elif file_path.suffix in ['.yml', '.yaml']:
-        with open(file_path, 'r') as f:
-            data = yaml.safe_load(f)
-    else:
+
+    if file_path.suffix not in ['.jsonl', '.json', '.yml', '.yaml']:
         raise ValueError(f"Unsupported file format: {file_path.suffix}")
-        
+
+    cached = read_column_cache(file_path, run) if use_cache else None
+    if cached is not None:
+        columns, unsuccessful = cached
+        if not len(columns['heat']):
+            raise ValueError(f"No data found in file: {file_path}")
+        return {'columns': columns, 'unsuccessful': unsuccessful}
+
+    if file_path.suffix == '.jsonl':
+        columns, unsuccessful = log_to_columns(file_path, run)
+        data = {'columns': columns, 'unsuccessful': unsuccessful}
+    else:
+        with open(file_path, 'r') as f:
+            if file_path.suffix == '.json':
+                data = json.load(f)
+            else:
+                data = yaml.load(f, Loader=YAML_LOADER)
+        if isinstance(data, dict) and isinstance(data.get('results'), list):
+            data = {'columns': entries_to_columns(data['results']),
+                    'unsuccessful': len(data.get('unsuccessful') or [])}
+
+    if isinstance(data, dict) and 'columns' in data:
+        if use_cache:
+            write_column_cache(file_path, data['columns'], data['unsuccessful'], run=run)
+        if not len(data['columns']['heat']):
+            data = None
+
     if not data:
         raise ValueError(f"No data found in file: {file_path}")
         
     return data
 
 def extract_optimization_data(results):
-    """Extract optimization data from results"""
+    """
+    Extract optimization data from results.
+    parameters is an (n, 3) array; fitness (heat release), nox and flame_loc are
+    1-D arrays for the list-based formats.
+    """
     data = {
         'parameters': [],
         'fitness': [],
@@ -45,27 +303,15 @@ def extract_optimization_data(results):
     
     # Handle different result formats
     if isinstance(results, dict):
-        if 'results' in results and isinstance(results['results'], list):
-            # List-based results format
-            for result in results['results']:
-                try:
-                    # Extract parameters (porosities and Lpre)
-                    if 'porosities' in result and 'Lpre' in result:
-                        params = result['porosities'] + [result['Lpre']]
-                        data['parameters'].append(params)
-                    
-                    # Use Heat as fitness
-                    if 'Heat' in result:
-                        data['fitness'].append(result['Heat'])
-                    
-                    # Extract NOx and Flame location
-                    if 'NOx' in result:
-                        data['nox'].append([result['NOx']])  # Wrap in list for consistency
-                    if 'Flame' in result:
-                        data['flame_loc'].append(result['Flame'])
-                except Exception as e:
-                    print(f"Warning: Skipping result due to error: {str(e)}")
-                    continue
+        if 'columns' in results or ('results' in results and isinstance(results['results'], list)):
+            # List-based results format (columnar after load_results)
+            columns = results['columns'] if 'columns' in results else entries_to_columns(results['results'])
+            data['parameters'] = columns['parameters']
+            # Use Heat as fitness
+            data['fitness'] = columns['heat']
+            data['nox'] = columns['nox']
+            data['flame_loc'] = columns['flame_loc'][~np.isnan(columns['flame_loc'])]
+            data['generation'] = columns['generation']
                 
         elif 'parameters' in results:
             # Single result format
@@ -88,6 +334,10 @@ def extract_optimization_data(results):
                             data['temperature'].append(sim_results.get('temperature', []))
                             data['nox'].append(sim_results.get('nox_concentration', []))
                             data['flame_loc'].append(sim_results.get('flame_location', []))
+            
+        if isinstance(data['nox'], list):
+            # Profile formats: keep the first NOx value of each result, as plotted before
+            data['nox'] = np.array([np.ravel(n)[0] for n in data['nox'] if np.size(n)], dtype=float)
     
     # Validate that we have some data
     if not any(len(v) > 0 for v in data.values()):
@@ -95,169 +345,612 @@ def extract_optimization_data(results):
         
     return data
 
-def generate_analysis_plots(data):
+# --- Plot rendering ---
+# A figure is (filename, render function, inputs). Figures are rendered in a
+# process pool on the Agg backend and skipped when a hash of their inputs (and
+# of the render function) matches the one recorded when the file was last drawn.
+PARAM_LABELS = ['SiC3 Porosity', 'SiC10 Porosity', 'Preheating Length']
+FIGURE_MANIFEST = '.analysis_figures.json'
+
+# Above this many points scatters become 2-D density maps and the 3-D scatter a
+# binned-mean surface; the binning happens before dispatch, so render time and
+# the data sent to each worker stay flat as the archive grows
+AGGREGATE_THRESHOLD = 20000
+AGGREGATE_BINS = 120
+
+# Matplotlib 3.9 renamed boxplot's labels argument to tick_labels (the old name was removed in 3.11)
+BOXPLOT_LABELS_ARG = 'tick_labels' if matplotlib.__version_info__ >= (3, 9) else 'labels'
+
+# Stored flame profiles drawn with --profiles (best evaluations by fitness)
+PROFILES_TOP = 5
+
+def plot_parameter_distributions(path, parameters):
+    plt.figure(figsize=(7, 5))
+    plt.boxplot(parameters, **{BOXPLOT_LABELS_ARG: PARAM_LABELS})
+    plt.title('Parameter Distributions')
+    plt.ylabel('Value')
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+def plot_heat_vs_parameter(path, values, heat, label):
+    plt.figure(figsize=(7, 5))
+    plt.scatter(values, heat, alpha=0.5)
+    plt.title(f'Heat Release vs {label}')
+    plt.xlabel(label)
+    plt.ylabel('Heat Release (J)')
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+def bin_counts(x, y, bins=AGGREGATE_BINS):
+    """2-D histogram of (x, y), ignoring NaN pairs"""
+    valid = ~(np.isnan(x) | np.isnan(y))
+    return np.histogram2d(x[valid], y[valid], bins=bins)
+
+def bin_means(x, y, z, bins=AGGREGATE_BINS):
+    """Mean of z in each (x, y) bin; NaN where a bin is empty"""
+    valid = ~(np.isnan(x) | np.isnan(y) | np.isnan(z))
+    counts, xedges, yedges = np.histogram2d(x[valid], y[valid], bins=bins)
+    sums, _, _ = np.histogram2d(x[valid], y[valid], bins=[xedges, yedges], weights=z[valid])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+    return means, xedges, yedges
+
+def plot_density(path, counts, xedges, yedges, title, xlabel, ylabel):
+    plt.figure(figsize=(7, 5))
+    plt.pcolormesh(xedges, yedges, np.ma.masked_equal(counts.T, 0),
+                   norm=matplotlib.colors.LogNorm(), cmap='viridis')
+    plt.colorbar(label='Evaluations')
+    plt.title(title)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+def plot_heat_vs_nox(path, heat, nox):
+    plt.figure(figsize=(7, 5))
+    plt.scatter(heat, nox, alpha=0.5)
+    plt.title('Heat Release vs NOx Emissions')
+    plt.xlabel('Heat Release (J)')
+    plt.ylabel('NOx Concentration')
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+def plot_flame_location_distribution(path, flame_loc):
+    plt.figure(figsize=(7, 5))
+    plt.hist(flame_loc, bins=20, alpha=0.7)
+    plt.title('Flame Location Distribution')
+    plt.xlabel('Location (m)')
+    plt.ylabel('Frequency')
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+def plot_peak_fitness(path, generations, peak, mean):
+    plt.figure()
+    plt.plot(generations, peak, marker='o', label='Peak')
+    plt.plot(generations, mean, marker='.', linestyle='--', label='Mean')
+    plt.title('Peak Fitness vs Generation')
+    plt.xlabel('Generation')
+    plt.ylabel('Heat Release (J)')
+    plt.legend()
+    plt.grid(True)
+    plt.savefig(path)
+    plt.close()
+
+def plot_parameter_evolution(path, parameters):
+    plt.figure(figsize=(10, 6))
+    for i, label in enumerate(PARAM_LABELS):
+        plt.plot(parameters[:, i], label=label)
+    plt.title('Parameter Evolution Across Individuals')
+    plt.xlabel('Individual Index')
+    plt.ylabel('Parameter Value')
+    plt.legend()
+    plt.grid(True)
+    plt.savefig(path)
+    plt.close()
+
+def plot_fitness_distribution(path, fitness):
+    plt.figure()
+    plt.hist(fitness, bins=30, alpha=0.7)
+    plt.title('Fitness (Heat Release) Distribution')
+    plt.xlabel('Heat Release (J)')
+    plt.ylabel('Frequency')
+    plt.grid(True)
+    plt.savefig(path)
+    plt.close()
+
+def plot_fitness_3d(path, sic3, lpre, fitness):
+    fig = plt.figure()
+    ax = fig.add_subplot(111, projection='3d')
+    ax.scatter(sic3, lpre, fitness, c=fitness, cmap='viridis', alpha=0.7)
+    ax.set_xlabel('SiC3 Porosity')
+    ax.set_ylabel('Preheating Length')
+    ax.set_zlabel('Heat Release (J)')
+    ax.set_title('Fitness vs SiC3 Porosity vs Preheating Length')
+    plt.savefig(path)
+    plt.close()
+
+def plot_fitness_surface(path, means, xedges, yedges):
+    x, y = np.meshgrid((xedges[:-1] + xedges[1:]) / 2, (yedges[:-1] + yedges[1:]) / 2)
+    z = np.ma.masked_invalid(means.T)
+    fig = plt.figure()
+    ax = fig.add_subplot(111, projection='3d')
+    ax.plot_surface(x, y, z, cmap='viridis', norm=matplotlib.colors.Normalize(z.min(), z.max()),
+                    rstride=1, cstride=1, linewidth=0, antialiased=False)
+    ax.set_xlabel('SiC3 Porosity')
+    ax.set_ylabel('Preheating Length')
+    ax.set_zlabel('Mean Heat Release (J)')
+    ax.set_title('Fitness vs SiC3 Porosity vs Preheating Length')
+    plt.savefig(path)
+    plt.close()
+
+def plot_fidelity_comparison(path, pairs):
+    labels = {'heat': 'Heat Release (J)', 'nox': 'NOx Concentration', 'flame_loc': 'Flame Location (m)'}
+    fig, axes = plt.subplots(1, 3, figsize=(15, 5))
+    for ax, (name, label) in zip(axes, labels.items()):
+        if not len(pairs[name]):
+            ax.set_visible(False)
+            continue
+        coarse, fine = np.array(pairs[name], dtype=float).T
+        ax.scatter(fine, coarse, alpha=0.5)
+        lims = [min(fine.min(), coarse.min()), max(fine.max(), coarse.max())]
+        ax.plot(lims, lims, 'k--', linewidth=1)
+        ax.set_title(label)
+        ax.set_xlabel('Fine')
+        ax.set_ylabel('Coarse')
+        ax.grid(True)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+def plot_flame_profiles(path, grids, temperatures, nox, labels):
+    fig, (ax_t, ax_nox) = plt.subplots(2, 1, figsize=(10, 8), sharex=True)
+    for key in sorted(grids, key=int):
+        ax_t.plot(grids[key], temperatures[key], label=str(labels[key]))
+        if key in nox:
+            ax_nox.plot(grids[key], nox[key])
+    for ax in (ax_t, ax_nox):
+        ax.axvspan(L_PRE_MIN, L_PRE_MAX, color='grey', alpha=0.15)
+        ax.grid(True)
+    ax_t.set_ylabel('Temperature (K)')
+    ax_t.set_title('Flame Profiles of the Best Evaluations')
+    ax_t.legend(fontsize='small')
+    ax_nox.set_ylabel('NO + NO2 Mass Fraction')
+    ax_nox.set_xlabel('Distance Along Burner (m)')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+def analysis_figures(data, aggregate_threshold=AGGREGATE_THRESHOLD):
+    """
+    Figures of the parameter distributions and objective trade-offs.
+    Scatters switch to density maps above aggregate_threshold points.
+    """
+    figures = []
+    params = np.asarray(data['parameters'], dtype=float)
+    fitness = np.asarray(data['fitness'], dtype=float)
+    aggregate = len(fitness) > aggregate_threshold
+    if len(params):
+        figures.append(('parameter_distributions.png', plot_parameter_distributions,
+                        {'parameters': params}))
+    if len(params) and len(fitness):
+        for i, label in enumerate(PARAM_LABELS):
+            name = f'heat_vs_{label.lower().replace(" ", "_")}.png'
+            if aggregate:
+                counts, xedges, yedges = bin_counts(params[:, i], fitness)
+                figures.append((name, plot_density,
+                                {'counts': counts, 'xedges': xedges, 'yedges': yedges,
+                                 'title': f'Heat Release vs {label}', 'xlabel': label,
+                                 'ylabel': 'Heat Release (J)'}))
+            else:
+                figures.append((name, plot_heat_vs_parameter,
+                                {'values': params[:, i], 'heat': fitness, 'label': label}))
+    if len(fitness) and len(data['nox']) == len(fitness):
+        nox = np.asarray(data['nox'], dtype=float)
+        if aggregate:
+            counts, xedges, yedges = bin_counts(fitness, nox)
+            figures.append(('heat_vs_nox.png', plot_density,
+                            {'counts': counts, 'xedges': xedges, 'yedges': yedges,
+                             'title': 'Heat Release vs NOx Emissions',
+                             'xlabel': 'Heat Release (J)', 'ylabel': 'NOx Concentration'}))
+        else:
+            figures.append(('heat_vs_nox.png', plot_heat_vs_nox, {'heat': fitness, 'nox': nox}))
+    if len(data['flame_loc']):
+        figures.append(('flame_location_distribution.png', plot_flame_location_distribution,
+                        {'flame_loc': np.asarray(data['flame_loc'], dtype=float)}))
+    return figures
+
+def additional_figures(data, aggregate_threshold=AGGREGATE_THRESHOLD, engine=None):
+    """
+    Figures of optimization progress and parameter evolution.
+    Generations come from engine (a StreamingStatistics already fed with data, if given).
+    The 3-D scatter becomes a binned-mean surface above aggregate_threshold points.
+    """
+    figures = []
+    params = np.asarray(data['parameters'], dtype=float)
+    fitness = np.asarray(data['fitness'], dtype=float)
+    if engine is None:
+        engine = StreamingStatistics()
+        engine.update_data(data)
+    generations, peak, mean = engine.generation_series()
+    if len(generations):
+        figures.append(('peak_fitness_vs_generation.png', plot_peak_fitness,
+                        {'generations': generations, 'peak': peak, 'mean': mean}))
+    if len(params):
+        figures.append(('parameter_evolution.png', plot_parameter_evolution, {'parameters': params}))
+    if len(fitness):
+        figures.append(('fitness_distribution.png', plot_fitness_distribution, {'fitness': fitness}))
+    if len(params) and len(fitness):
+        if len(fitness) > aggregate_threshold:
+            means, xedges, yedges = bin_means(params[:, 0], params[:, 2], fitness, bins=40)
+            figures.append(('fitness_vs_sic3por_lpre.png', plot_fitness_surface,
+                            {'means': means, 'xedges': xedges, 'yedges': yedges}))
+        else:
+            figures.append(('fitness_vs_sic3por_lpre.png', plot_fitness_3d,
+                            {'sic3': params[:, 0], 'lpre': params[:, 2], 'fitness': fitness}))
+    return figures
+
+def profile_figures(store_path, log_path, top=PROFILES_TOP, run=LATEST_RUN):
+    """
+    Figure of the T and NOx profiles of the top evaluations by fitness, read
+    (memory-mapped for npy stores) from a solver.py --profile-store directory.
+    Evaluation IDs come from the evaluation log records of run.
+    """
+    if not (Path(store_path) / PROFILE_METADATA).exists() or not os.path.exists(log_path):
+        return []
+    store = ProfileStore(store_path)
+    records, _ = read_log_records(log_path)
+    records = [r for r in select_run(records, run) if r.get('eval_id') and r.get('status', 'ok') == 'ok']
+    records.sort(key=lambda r: r['fitness'], reverse=True)
+    grids, temperatures, nox, labels = {}, {}, {}, {}
+    for record in records:
+        if len(grids) == top:
+            break
+        if record['eval_id'] not in store:
+            continue
+        profile = store.load(record['eval_id'])
+        key = str(len(grids))
+        grids[key] = np.asarray(profile['grid'], dtype=float)
+        temperatures[key] = np.asarray(profile['T'], dtype=float)
+        if 'NO' in profile and 'NO2' in profile:
+            nox[key] = np.asarray(profile['NO'], dtype=float) + np.asarray(profile['NO2'], dtype=float)
+        labels[key] = (f"eps1={record['eps1']:.3f}, eps2={record['eps2']:.3f}, "
+                       f"Lpre={record['Lpre']:.4f}, fitness={record['fitness']:.4g}")
+    store.close()
+    if not grids:
+        return []
+    return [('flame_profiles.png', plot_flame_profiles,
+             {'grids': grids, 'temperatures': temperatures, 'nox': nox, 'labels': labels})]
+
+def update_code_digest(digest, code):
+    """Feed a code object into digest (nested code objects by content, not by address)"""
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):
+            update_code_digest(digest, const)
+        else:
+            digest.update(repr(const).encode())
+
+def figure_key(name, func, inputs):
+    """Hash of a figure's inputs and of the code that draws it"""
+    digest = hashlib.sha1(name.encode())
+    update_code_digest(digest, func.__code__)
+    for key in sorted(inputs):
+        value = inputs[key]
+        digest.update(key.encode())
+        if isinstance(value, dict):
+            value = {k: np.asarray(v) for k, v in sorted(value.items())}
+            for k, v in value.items():
+                digest.update(f"{k}{v.dtype}{v.shape}".encode())
+                digest.update(np.ascontiguousarray(v).tobytes())
+        elif isinstance(value, np.ndarray):
+            digest.update(f"{value.dtype}{value.shape}".encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+        else:
+            digest.update(repr(value).encode())
+    return digest.hexdigest()
+
+def _init_render_worker():
+    matplotlib.use('Agg')
+
+def _render_figure(figure):
+    name, func, inputs = figure
+    start = time.perf_counter()
+    func(name, **inputs)
+    return name, time.perf_counter() - start
+
+def render_figures(figures, jobs=None, force=False, manifest=FIGURE_MANIFEST):
+    """
+    Draw figures whose inputs changed since they were last drawn.
+    Args:
+        figures: list of (filename, render function, inputs)
+        jobs: worker processes (default: one per stale figure, up to os.cpu_count())
+        force: redraw every figure
+        manifest: JSON file recording the input hash of each drawn figure
+    Returns:
+        (rendered filenames, skipped filenames)
+    """
+    try:
+        with open(manifest) as f:
+            drawn = json.load(f)
+    except (OSError, ValueError):
+        drawn = {}
+    keys = {name: figure_key(name, func, inputs) for name, func, inputs in figures}
+    stale = [figure for figure in figures
+             if force or drawn.get(figure[0]) != keys[figure[0]] or not Path(figure[0]).exists()]
+    skipped = [name for name, _, _ in figures if name not in {f[0] for f in stale}]
+
+    jobs = min(jobs or os.cpu_count() or 1, len(stale))
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_render_worker) as executor:
+            timings = list(executor.map(_render_figure, stale))
+    else:
+        timings = [_render_figure(figure) for figure in stale]
+
+    for name, _ in timings:
+        drawn[name] = keys[name]
+    if timings:
+        with open(manifest, 'w') as f:
+            json.dump(drawn, f, indent=4)
+    return [name for name, _ in timings], skipped
+
+def generate_analysis_plots(data, jobs=None, force=False, aggregate_threshold=AGGREGATE_THRESHOLD):
     """Generate analysis plots from the data as separate figures."""
-    import matplotlib.pyplot as plt
-    import numpy as np
-
-    # 1. Parameter Distribution (Boxplot)
-    if data['parameters']:
-        params = np.array(data['parameters'])
-        plt.figure(figsize=(7, 5))
-        plt.boxplot(params, labels=['SiC3 Porosity', 'SiC10 Porosity', 'Preheating Length'])
-        plt.title('Parameter Distributions')
-        plt.ylabel('Value')
-        plt.grid(True)
-        plt.tight_layout()
-        plt.savefig('parameter_distributions.png')
-        plt.close()
-
-    # 2. Fitness vs Parameters (Scatter)
-    if data['parameters'] and data['fitness']:
-        params = np.array(data['parameters'])
-        fitness = np.array(data['fitness'])
-        for i, label in enumerate(['SiC3 Porosity', 'SiC10 Porosity', 'Preheating Length']):
-            plt.figure(figsize=(7, 5))
-            plt.scatter(params[:, i], fitness, alpha=0.5)
-            plt.title(f'Heat Release vs {label}')
-            plt.xlabel(label)
-            plt.ylabel('Heat Release (J)')
-            plt.grid(True)
-            plt.tight_layout()
-            plt.savefig(f'heat_vs_{label.lower().replace(" ", "_")}.png')
-            plt.close()
-
-    # 3. Heat vs NOx Trade-off (Scatter)
-    if data['fitness'] and data['nox']:
-        heat = np.array(data['fitness'])
-        nox = np.array([n[0] for n in data['nox']])  # Extract single NOx value
-        plt.figure(figsize=(7, 5))
-        plt.scatter(heat, nox, alpha=0.5)
-        plt.title('Heat Release vs NOx Emissions')
-        plt.xlabel('Heat Release (J)')
-        plt.ylabel('NOx Concentration')
-        plt.grid(True)
-        plt.tight_layout()
-        plt.savefig('heat_vs_nox.png')
-        plt.close()
-
-    # 4. Flame Location Distribution (Histogram)
-    if data['flame_loc']:
-        flame_locs = data['flame_loc']
-        plt.figure(figsize=(7, 5))
-        plt.hist(flame_locs, bins=20, alpha=0.7)
-        plt.title('Flame Location Distribution')
-        plt.xlabel('Location (m)')
-        plt.ylabel('Frequency')
-        plt.grid(True)
-        plt.tight_layout()
-        plt.savefig('flame_location_distribution.png')
-        plt.close()
-
-def generate_additional_plots(data):
+    return render_figures(analysis_figures(data, aggregate_threshold), jobs, force)
+
+def generate_additional_plots(data, jobs=None, force=False, aggregate_threshold=AGGREGATE_THRESHOLD):
     """Generate additional analysis plots for optimization progress and parameter evolution."""
-    import matplotlib.pyplot as plt
-    import numpy as np
-
-    # 1. Peak Fitness vs Generation (if generations can be inferred)
-    if data['fitness']:
-        fitness = np.array(data['fitness'])
-        # Assume each 20 results = 1 generation (adjust if needed)
-        gen_size = 20
-        generations = len(fitness) // gen_size
-        if generations > 0:
-            peak_fitness = [np.max(fitness[i*gen_size:(i+1)*gen_size]) for i in range(generations)]
-            plt.figure()
-            plt.plot(range(1, generations+1), peak_fitness, marker='o')
-            plt.title('Peak Fitness vs Generation')
-            plt.xlabel('Generation')
-            plt.ylabel('Peak Heat Release (J)')
-            plt.grid(True)
-            plt.savefig('peak_fitness_vs_generation.png')
-            plt.close()
-
-    # 2. Parameter Evolution Across Individuals
-    if data['parameters']:
-        params = np.array(data['parameters'])
-        plt.figure(figsize=(10, 6))
-        for i, label in enumerate(['SiC3 Porosity', 'SiC10 Porosity', 'Preheating Length']):
-            plt.plot(params[:, i], label=label)
-        plt.title('Parameter Evolution Across Individuals')
-        plt.xlabel('Individual Index')
-        plt.ylabel('Parameter Value')
-        plt.legend()
-        plt.grid(True)
-        plt.savefig('parameter_evolution.png')
-        plt.close()
-
-    # 3. Fitness Distribution Histogram
-    if data['fitness']:
-        plt.figure()
-        plt.hist(data['fitness'], bins=30, alpha=0.7)
-        plt.title('Fitness (Heat Release) Distribution')
-        plt.xlabel('Heat Release (J)')
-        plt.ylabel('Frequency')
-        plt.grid(True)
-        plt.savefig('fitness_distribution.png')
-        plt.close()
-
-    # 4. 3D Scatter: Fitness vs SiC3 Porosity vs Preheating Length
-    if data['parameters'] and data['fitness']:
-        from mpl_toolkits.mplot3d import Axes3D
-        params = np.array(data['parameters'])
-        fitness = np.array(data['fitness'])
-        fig = plt.figure()
-        ax = fig.add_subplot(111, projection='3d')
-        ax.scatter(params[:, 0], params[:, 2], fitness, c=fitness, cmap='viridis', alpha=0.7)
-        ax.set_xlabel('SiC3 Porosity')
-        ax.set_ylabel('Preheating Length')
-        ax.set_zlabel('Heat Release (J)')
-        ax.set_title('Fitness vs SiC3 Porosity vs Preheating Length')
-        plt.savefig('fitness_vs_sic3por_lpre.png')
-        plt.close()
-
-def generate_summary_statistics(data):
-    """Generate summary statistics from the data"""
+    return render_figures(additional_figures(data, aggregate_threshold), jobs, force)
+
+def extract_fidelity_pairs(results):
+    """Collect (coarse, fine) objective pairs for individuals solved at both fidelities"""
+    pairs = {name: np.empty((0, 2)) for name in ('heat', 'nox', 'flame_loc')}
+    if isinstance(results, dict) and isinstance(results.get('results'), list):
+        results = {'columns': entries_to_columns(results['results'])}
+    if isinstance(results, dict) and 'columns' in results:
+        columns = results['columns']
+        for name in pairs:
+            both = np.column_stack([columns['coarse_' + name], columns[name]])
+            pairs[name] = both[~np.isnan(both).any(axis=1)]
+    return pairs
+
+def fidelity_statistics(pairs):
+    """Agreement statistics between coarse and fine objectives (multi-fidelity runs)"""
     stats = {}
-    
-    if data['parameters']:
-        params = np.array(data['parameters'])
-        stats['parameters'] = {
-            'mean': np.mean(params, axis=0).tolist(),
-            'std': np.std(params, axis=0).tolist(),
-            'min': np.min(params, axis=0).tolist(),
-            'max': np.max(params, axis=0).tolist()
-        }
-    
-    if data['fitness']:
-        fitness = np.array(data['fitness'])
-        stats['fitness'] = {
-            'mean': float(np.mean(fitness)),
-            'std': float(np.std(fitness)),
-            'min': float(np.min(fitness)),
-            'max': float(np.max(fitness))
-        }
-    
-    if data['flame_loc']:
-        flame_locs = data['flame_loc']
-        stats['flame_location'] = {
-            'mean': float(np.mean(flame_locs)),
-            'std': float(np.std(flame_locs)),
-            'min': float(np.min(flame_locs)),
-            'max': float(np.max(flame_locs))
+    for name in ('heat', 'nox', 'flame_loc'):
+        if not len(pairs[name]):
+            continue
+        coarse, fine = np.array(pairs[name], dtype=float).T
+        rel_error = np.abs(coarse - fine) / np.maximum(np.abs(fine), 1e-300)
+        stats[name] = {
+            'count': int(len(fine)),
+            'mean_abs_error': float(np.mean(np.abs(coarse - fine))),
+            'mean_rel_error': float(np.mean(rel_error)),
+            'max_rel_error': float(np.max(rel_error)),
+            # Rank agreement is what matters for screening candidates
+            'rank_correlation': (float(np.corrcoef(np.argsort(np.argsort(coarse)),
+                                                   np.argsort(np.argsort(fine)))[0, 1])
+                                 if len(fine) > 1 else None)
         }
-    
     return stats
 
-def main():
+# --- Streaming statistics ---
+# Archives without a generation field (e.g. results.yaml) are split into
+# generations of this many consecutive results
+LEGACY_GENERATION_SIZE = 20
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+class RunningStats:
+    """
+    Streaming mean/variance (Welford, merged batch-wise with Chan's update),
+    running min/max and approximate quantiles from a fixed-size uniform sample.
+    Rows containing NaN are ignored.
+    """
+    def __init__(self, width=1, sample_size=1024, seed=0):
+        """
+        Args:
+            width: number of columns tracked together (e.g. 3 for the parameters)
+            sample_size: values kept for the quantile estimates
+            seed: seed of the sampling keys (results are reproducible)
+        """
+        self.width = width
+        self.sample_size = sample_size
+        self.count = 0
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+        self.min = np.full(width, np.inf)
+        self.max = np.full(width, -np.inf)
+        self._rng = np.random.default_rng(seed)
+        self._sample = np.empty((0, width))
+        self._keys = np.empty(0)
+
+    def update(self, values):
+        """Add a batch of values, shape (n,) for width 1 or (n, width)"""
+        values = np.asarray(values, dtype=float).reshape(-1, self.width)
+        values = values[~np.isnan(values).any(axis=1)]
+        n = len(values)
+        if not n:
+            return
+        batch_mean = values.mean(axis=0)
+        batch_m2 = ((values - batch_mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean = self.mean + delta * n / total
+        self.m2 = self.m2 + batch_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min = np.minimum(self.min, values.min(axis=0))
+        self.max = np.maximum(self.max, values.max(axis=0))
+        # Keeping the values with the smallest random keys is a uniform sample of everything seen
+        keys = np.concatenate([self._keys, self._rng.random(n)])
+        sample = np.concatenate([self._sample, values])
+        if len(keys) > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size)[:self.sample_size]
+            keys, sample = keys[keep], sample[keep]
+        self._keys, self._sample = keys, sample
+
+    def add(self, value):
+        self.update([value])
+
+    def quantiles(self, qs=QUANTILES):
+        return np.quantile(self._sample, qs, axis=0)
+
+    def summary(self):
+        """Mean, std (population), min, max and quantiles; lists when width > 1"""
+        convert = (lambda a: float(a[0])) if self.width == 1 else (lambda a: a.tolist())
+        if not self.count:
+            return {'count': 0}
+        quantiles = self.quantiles()
+        return {
+            'count': self.count,
+            'mean': convert(self.mean),
+            'std': convert(np.sqrt(self.m2 / self.count)),
+            'min': convert(self.min),
+            'max': convert(self.max),
+            'quantiles': {f"{int(q * 100)}%": convert(v) for q, v in zip(QUANTILES, quantiles)}
+        }
+
+class StreamingStatistics:
+    """
+    Summary statistics accumulated one record (or one batch) at a time, overall
+    and per generation, so a live run can be summarised without re-reading the archive.
+    """
+    def __init__(self):
+        self.parameters = RunningStats(width=3)
+        self.fitness = RunningStats()
+        self.flame_location = RunningStats()
+        self.generations = {}  # generation -> RunningStats of heat release
+        self.seen = 0          # results consumed (position for archives without generations)
+
+    def update(self, parameters, heat, flame_loc=None, generation=None):
+        """
+        Add a batch of successful results.
+        Args:
+            parameters: (n, 3) array; heat: (n,) heat release
+            flame_loc: (n,) flame locations (NaN or None where unknown)
+            generation: (n,) generation numbers; missing ones fall back to
+                consecutive blocks of LEGACY_GENERATION_SIZE results
+        """
+        heat = np.asarray(heat, dtype=float).ravel()
+        n = len(heat)
+        position = self.seen + np.arange(n)
+        self.seen += n
+        self.parameters.update(parameters)
+        self.fitness.update(heat)
+        if flame_loc is not None:
+            self.flame_location.update(flame_loc)
+        if generation is None:
+            generation = np.full(n, np.nan)
+        generation = np.asarray(generation, dtype=float).ravel()
+        missing = np.isnan(generation)
+        generation[missing] = position[missing] // LEGACY_GENERATION_SIZE
+        for g in np.unique(generation):
+            g = int(g)
+            if g not in self.generations:
+                self.generations[g] = RunningStats(sample_size=256, seed=g)
+            self.generations[g].update(heat[generation == g])
+
+    def add_record(self, record):
+        """Add one evaluation-log record (unsuccessful evaluations are skipped)"""
+        if record.get('status', 'ok') != 'ok':
+            return
+        generation = record.get('generation')
+        self.update([[record['eps1'], record['eps2'], record['Lpre']]], [record['heat']],
+                    [record.get('flame_location', np.nan)],
+                    [np.nan if generation is None else generation])
+
+    def update_data(self, data):
+        """Add the arrays returned by extract_optimization_data"""
+        params = np.asarray(data['parameters'], dtype=float).reshape(-1, 3)
+        heat = np.asarray(data['fitness'], dtype=float)
+        self.update(params, heat, generation=data.get('generation'))
+        if len(data['flame_loc']):
+            self.flame_location.update(np.asarray(data['flame_loc'], dtype=float))
+
+    def generation_series(self):
+        """(generations, peak heat release, mean heat release) in generation order"""
+        gens = sorted(g for g, s in self.generations.items() if s.count)
+        return (np.array(gens, dtype=int),
+                np.array([self.generations[g].max[0] for g in gens]),
+                np.array([self.generations[g].mean[0] for g in gens]))
+
+    def summary(self):
+        stats = {}
+        if self.parameters.count:
+            stats['parameters'] = self.parameters.summary()
+        if self.fitness.count:
+            stats['fitness'] = self.fitness.summary()
+        if self.flame_location.count:
+            stats['flame_location'] = self.flame_location.summary()
+        gens, peak, mean = self.generation_series()
+        if len(gens):
+            stats['generations'] = [
+                {'generation': int(g), 'count': self.generations[g].count,
+                 'peak': float(p), 'mean': float(m),
+                 'std': float(np.sqrt(self.generations[g].m2[0] / self.generations[g].count))}
+                for g, p, m in zip(gens, peak, mean)]
+        return stats
+
+def generate_summary_statistics(data, engine=None):
+    """Generate summary statistics from the data (streamed through a StreamingStatistics)"""
+    if engine is None:
+        engine = StreamingStatistics()
+        engine.update_data(data)
+    return engine.summary()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse GA burner optimisation results")
+    parser.add_argument("results", nargs="?", default=None,
+                        help="results file (default: first of evaluations.jsonl, results.json, "
+                             "results.yml, results.yaml)")
+    parser.add_argument("--watch", action="store_true",
+                        help="follow a live evaluation log: print progress and keep "
+                             "analysis_statistics.json and peak_fitness_vs_generation.png up to date")
+    parser.add_argument("--interval", type=float, default=10.0,
+                        help="polling interval for --watch (seconds)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always parse the results file instead of using its .npz cache")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="processes used to draw figures (default: one per figure, up to the CPU count)")
+    parser.add_argument("--replot", action="store_true",
+                        help="redraw every figure, even those whose inputs are unchanged")
+    parser.add_argument("--aggregate-threshold", type=int, default=AGGREGATE_THRESHOLD,
+                        help="point count above which scatters are drawn as binned densities "
+                             "(0: always)")
+    parser.add_argument("--run", default=LATEST_RUN,
+                        help="run of an evaluation log shared by several runs: a run_id, "
+                             f"'{LATEST_RUN}' (default) or '{ALL_RUNS}'")
+    parser.add_argument("--profiles", default=None,
+                        help="solver.py --profile-store directory: plot the T and NOx profiles of "
+                             "the best evaluations in the evaluation log to flame_profiles.png")
+    parser.add_argument("--profiles-top", type=int, default=PROFILES_TOP,
+                        help="number of evaluations drawn by --profiles")
+    args = parser.parse_args(argv)
+
+    if args.watch:
+        try:
+            watch_evaluation_log(args.results or 'evaluations.jsonl', args.interval)
+        except KeyboardInterrupt:
+            pass
+        return
+
     # Try to load results from different possible files
-    result_files = ['results.json', 'results.yml', 'results.yaml']
+    result_files = [args.results] if args.results else [
+        'evaluations.jsonl', 'results.json', 'results.yml', 'results.yaml']
     results = None
     error_messages = []
     
     for file in result_files:
         try:
-            results = load_results(file)
+            results = load_results(file, use_cache=not args.no_cache, run=args.run)
             print(f"Successfully loaded results from {file}")
             break
         except FileNotFoundError:
@@ -274,19 +967,36 @@ def main():
         print("\nFailed to load any results file. Errors encountered:")
         for msg in error_messages:
             print(f"- {msg}")
-        print("\nPlease ensure you have a valid results file (results.json, results.yml, or results.yaml) with data.")
+        print("\nPlease ensure you have a valid results file (evaluations.jsonl, results.json, results.yml, or results.yaml) with data.")
         return
     
     try:
         # Extract and process data
         data = extract_optimization_data(results)
         
-        # Generate plots
-        generate_analysis_plots(data)
-        generate_additional_plots(data)
+        # Generate plots (all figures share one pool; unchanged ones are skipped)
+        engine = StreamingStatistics()
+        engine.update_data(data)
+        figures = (analysis_figures(data, args.aggregate_threshold)
+                   + additional_figures(data, args.aggregate_threshold, engine))
+        fidelity_pairs = extract_fidelity_pairs(results)
+        if len(fidelity_pairs['heat']):
+            figures.append(('coarse_vs_fine.png', plot_fidelity_comparison, {'pairs': fidelity_pairs}))
+        if args.profiles:
+            log_path = file if file.endswith('.jsonl') else 'evaluations.jsonl'
+            profiles = profile_figures(args.profiles, log_path, args.profiles_top, args.run)
+            if not profiles:
+                print(f"No evaluation in {log_path} has a profile in {args.profiles}")
+            figures += profiles
+        start = time.perf_counter()
+        rendered, skipped = render_figures(figures, jobs=args.jobs, force=args.replot)
+        print(f"Rendered {len(rendered)} figures in {time.perf_counter() - start:.1f}s"
+              + (f" ({len(skipped)} unchanged, skipped)" if skipped else ""))
         
         # Generate and save statistics
-        stats = generate_summary_statistics(data)
+        stats = generate_summary_statistics(data, engine)
+        if len(fidelity_pairs['heat']):
+            stats['fidelity_agreement'] = fidelity_statistics(fidelity_pairs)
         with open('analysis_statistics.json', 'w') as f:
             json.dump(stats, f, indent=4)
         
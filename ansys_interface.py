@@ -1,16 +1,163 @@
 import os
+import re
 import json
+import mmap
+import signal
+import subprocess
+import time
+import argparse
+import warnings
 import numpy as np
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+CASES_DIR = "ansys_cases"
+CASES_SUMMARY = "cases.json"
+# Parameters that change the mesh; cases sharing them can run in one Fluent session
+GEOMETRY_PARAMS = ("preheating_length", "burner_diameter", "burner_length")
+# ASCII export written by the journals for extract_results: cell values of the porous zones
+EXPORT_FILE = "results.txt"
+EXPORT_SURFACES = ("sic3", "sic10")
+EXPORT_FIELDS = ("temperature", "heat-release-rate", "mass-fraction-no", "mass-fraction-no2",
+                 "velocity-magnitude")
+
+# --- Fluent export parsing ---
+CHUNK_BYTES = 64 * 1024 * 1024  # ASCII exports are parsed in pieces of about this size
+# Column names accepted for each field (case-insensitive); extract_results(columns=...) overrides
+FIELD_NAMES = {
+    'temperature': ('temperature', 'static-temperature'),
+    'heat_release': ('heat-release-rate', 'total-heat-release-rate', 'volumetric-heat-release-rate'),
+    'nox': ('nox', 'mass-fraction-nox'),
+    'no': ('no', 'mass-fraction-no'),
+    'no2': ('no2', 'mass-fraction-no2'),
+    'velocity': ('velocity-magnitude', 'velocity'),
+}
+
+
+def _parse_floats(text):
+    """Whitespace-separated numbers -> float array, refusing anything that is not a number"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)  # partial parses only warn by default
+        return np.fromstring(text, sep=' ')
+
+
+def fluent_columns(path):
+    """Field names of a Fluent ASCII export (header line) or profile file (section names)"""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if mm[:2] == b'((':
+            return [m.group(1).decode() for m in re.finditer(rb'\(([^\s()]+)\s*\n', mm)]
+        header = mm[:mm.find(b'\n')].decode()
+    return [name.strip() for name in (header.split(',') if ',' in header else header.split())
+            if name.strip()]
+
+
+def read_fluent_ascii(path, fields, chunk_bytes=CHUNK_BYTES):
+    """
+    Read columns of a Fluent ASCII export (a header line of column names, then one
+    comma- or space-separated row per cell or node) into float arrays.
+    The file is memory-mapped and parsed in line-aligned chunks by NumPy, keeping
+    only the requested columns, so no per-value Python objects are created.
+    Args:
+        fields: Column names to return
+        chunk_bytes: Approximate size of each parsed chunk
+    Returns:
+        {column name: float64 array}
+    """
+    names = fluent_columns(path)
+    keep = [names.index(field) for field in fields]
+    pieces = []
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start, size = mm.find(b'\n') + 1, len(mm)
+        while 0 < start < size:
+            end = size
+            if start + chunk_bytes < size:
+                end = mm.rfind(b'\n', start, start + chunk_bytes) + 1
+                if end <= start:  # a single line longer than chunk_bytes
+                    end = mm.find(b'\n', start + chunk_bytes) + 1 or size
+            values = _parse_floats(mm[start:end].replace(b',', b' '))
+            if values.size % len(names):
+                raise ValueError(f"{path}: rows do not match the {len(names)} header columns")
+            pieces.append(values.reshape(-1, len(names))[:, keep])
+            start = end
+    if not pieces:
+        return {field: np.empty(0) for field in fields}
+    return {field: np.concatenate([piece[:, i] for piece in pieces]) for i, field in enumerate(fields)}
+
+
+def read_fluent_profile(path, fields):
+    """
+    Read fields of a Fluent profile file ("((name point n)" followed by one
+    "(field" section of whitespace-separated values per field) into float arrays.
+    Only the requested sections are parsed, straight from the memory-mapped file.
+    """
+    arrays = {}
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for match in re.finditer(rb'\(([^\s()]+)\s*\n', mm):
+            name = match.group(1).decode()
+            if name in fields:
+                arrays[name] = _parse_floats(mm[match.end():mm.find(b')', match.end())])
+    missing = [field for field in fields if field not in arrays]
+    if missing:
+        raise KeyError(f"{path}: no section {', '.join(missing)}")
+    return arrays
+
+
+def axial_profile(axial, values, bins=None):
+    """
+    Average cell values over each axial station (or over `bins` equal-width
+    axial bins), giving the 1D profile the Cantera reductions work on.
+    Returns:
+        (station positions, list of averaged arrays, one per entry of values)
+    """
+    if bins:
+        edges = np.linspace(axial.min(), axial.max(), bins + 1)
+        inverse = np.clip(np.searchsorted(edges, axial, side='right') - 1, 0, bins - 1)
+        stations = (edges[:-1] + edges[1:]) / 2
+    else:
+        stations, inverse = np.unique(axial, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(stations))
+    occupied = counts > 0
+    means = [(np.bincount(inverse, weights=v, minlength=len(stations))[occupied] / counts[occupied])
+             for v in values]
+    return stations[occupied], means
+
+
+def cfd_objectives(axial, temperature, heat_release=None, nox=None, bins=None):
+    """
+    The reductions solver.flame_objectives applies to a Cantera flame, computed
+    on the axial profile of CFD data: heat release integrated along the axis,
+    peak NOx mass fraction and the flame base (position of the steepest rise of T).
+    Returns:
+        (heat release or None, peak NOx or None, flame location)
+    """
+    values = [temperature] + [v for v in (heat_release, nox) if v is not None]
+    stations, means = axial_profile(axial, values, bins)
+    T = means.pop(0)
+    heat = float(np.trapezoid(means.pop(0), stations)) if heat_release is not None else None
+    peak_nox = float(np.max(means.pop(0))) if nox is not None else None
+    if len(stations) < 2:
+        raise ValueError("need at least two axial stations to locate the flame")
+    flame_location = float(stations[np.argmax(np.gradient(T, stations))])
+    return heat, peak_nox, flame_location
+
+def export_command(filename):
+    """Fluent TUI command exporting EXPORT_FIELDS on EXPORT_SURFACES as comma-delimited cell values"""
+    return (f'/file/export/ascii "{filename}" {" ".join(EXPORT_SURFACES)} () yes '
+            f'{" ".join(EXPORT_FIELDS)} () no')
+
 
 class AnsysInterface:
-    def __init__(self, ansys_path=None):
+    def __init__(self, ansys_path=None, ansys_command=None, fluent_command=None):
         """
         Initialize ANSYS interface
         Args:
             ansys_path: Path to ANSYS installation (optional)
+            ansys_command, fluent_command: MAPDL / Fluent executables (default: under ansys_path);
+                any program accepting the same command line can stand in for them
         """
         self.ansys_path = ansys_path or self._find_ansys_path()
+        self.ansys_command = ansys_command
+        self.fluent_command = fluent_command
         self.params_file = "params.txt"
         self.default_params = {
             "sic3_porosity": 0.5,
@@ -38,16 +185,17 @@ class AnsysInterface:
                 return path
         return None
     
-    def create_params_file(self, params=None):
+    def create_params_file(self, params=None, directory="."):
         """
         Create or update params.txt with simulation parameters
         Args:
             params: Dictionary of parameters to write (optional)
+            directory: Where to write params.txt (default: current directory)
         """
         if params is None:
             params = self.default_params
             
-        with open(self.params_file, 'w') as f:
+        with open(os.path.join(directory, self.params_file), 'w') as f:
             for key, value in params.items():
                 f.write(f"{key} = {value}\n")
     
@@ -59,7 +207,10 @@ class AnsysInterface:
                 for line in f:
                     if '=' in line:
                         key, value = line.split('=')
-                        params[key.strip()] = float(value.strip())
+                        try:
+                            params[key.strip()] = float(value.strip())
+                        except ValueError:
+                            params[key.strip()] = value.strip()  # e.g. fuel_composition
         return params
     
     def update_params_from_optimization(self, optimization_results):
@@ -80,9 +231,15 @@ class AnsysInterface:
         
         self.create_params_file(params)
     
-    def create_ansys_geometry(self):
-        """Create ANSYS geometry based on parameters"""
-        params = self.read_params_file()
+    def create_ansys_geometry(self, params=None, directory="."):
+        """
+        Create ANSYS geometry based on parameters
+        Args:
+            params: Parameter dictionary (default: read from params.txt)
+            directory: Where to write the APDL script (default: current directory)
+        """
+        if params is None:
+            params = self.read_params_file()
         apdl_script = f"""
         /PREP7
         ! Create burner geometry
@@ -116,18 +273,26 @@ class AnsysInterface:
         """
         
         # Write APDL script to file
-        with open('create_geometry.apdl', 'w') as f:
+        with open(os.path.join(directory, 'create_geometry.apdl'), 'w') as f:
             f.write(apdl_script)
         
         return 'create_geometry.apdl'
     
-    def setup_fluent_simulation(self):
-        """Setup Fluent simulation based on parameters"""
-        params = self.read_params_file()
+    def setup_fluent_simulation(self, params=None, directory=".", case_file="burner.cas"):
+        """
+        Setup Fluent simulation based on parameters
+        Args:
+            params: Parameter dictionary (default: read from params.txt)
+            directory: Where to write the journal (default: current directory)
+            case_file: Fluent case the journal starts from
+        The journal ends by exporting the solution to EXPORT_FILE for extract_results.
+        """
+        if params is None:
+            params = self.read_params_file()
         
         # Create Fluent journal file
         journal = f"""
-        /file/read-case-data "burner.cas"
+        /file/read-case-data "{case_file}"
         
         /define/models/energy? yes
         
@@ -147,14 +312,264 @@ class AnsysInterface:
         
         /file/write-case-data "results.cas"
         /file/write-data "results.dat"
+        {export_command(EXPORT_FILE)}
         """
         
         # Write journal file
-        with open('fluent_simulation.jou', 'w') as f:
+        with open(os.path.join(directory, 'fluent_simulation.jou'), 'w') as f:
             f.write(journal)
         
         return 'fluent_simulation.jou'
     
+    def setup_fluent_batch(self, cases, directory=".", case_file="burner.cas", iterations=1000,
+                           indices=None):
+        """
+        Write one journal that runs several cases in a single Fluent session.
+        The case file is read once; every case then updates the boundary and
+        porous-zone conditions, continues from the previous case's converged
+        data (only the first is initialised), writes case_<index>.dat and
+        exports case_<index>.txt for extract_results.
+        Args:
+            cases: Parameter sets sharing one geometry (see case_params)
+            directory: Where to write the journal (default: current directory)
+            case_file: Fluent case the session starts from
+            iterations: Iterations per case
+            indices: Case numbers used in the result file names (default: 0, 1, ...)
+        Returns:
+            Journal file name, and the data and export file names of each case
+        """
+        cases = [self.case_params(case) for case in cases]
+        indices = list(indices) if indices is not None else list(range(len(cases)))
+        geometries = {tuple(params[key] for key in GEOMETRY_PARAMS) for params in cases}
+        if len(geometries) > 1:
+            raise ValueError(f"cases of one Fluent session must share {', '.join(GEOMETRY_PARAMS)}; "
+                             f"got {len(geometries)} geometries (see geometry_groups)")
+        
+        blocks = [f"""
+        /file/read-case-data "{case_file}"
+        
+        /define/models/energy? yes
+        /define/materials/fluid/air
+        /define/materials/fluid/ch4
+        """]
+        data_files, export_files = [], []
+        for n, (index, params) in enumerate(zip(indices, cases)):
+            data_file = f"case_{index:04d}.dat"
+            export_file = f"case_{index:04d}.txt"
+            data_files.append(data_file)
+            export_files.append(export_file)
+            initialise = "/solve/initialize/hybrid-initialization" if n == 0 else \
+                "; continue from the previous case's converged data"
+            blocks.append(f"""
+        ; case {index}
+        /define/boundary-conditions/velocity-inlet "inlet"
+        velocity-magnitude {params['inlet_velocity']}
+        temperature {params['inlet_temperature']}
+        
+        /define/boundary-conditions/fluid "sic3"
+        porosity {params['sic3_porosity']}
+        /define/boundary-conditions/fluid "sic10"
+        porosity {params['sic10_porosity']}
+        
+        /define/models/species/transport&reactions
+        fuel {params['fuel_composition']}
+        equivalence-ratio {params['equivalence_ratio']}
+        
+        {initialise}
+        /solve/iterate {iterations}
+        /file/write-data "{data_file}"
+        {export_command(export_file)}
+        """)
+        blocks.append("""
+        /exit yes
+        """)
+        
+        with open(os.path.join(directory, 'fluent_batch.jou'), 'w') as f:
+            f.write("".join(blocks))
+        
+        return 'fluent_batch.jou', data_files, export_files
+    
+    def geometry_groups(self, cases):
+        """Group parameter sets by GEOMETRY_PARAMS; returns lists of (case index, params)"""
+        groups = {}
+        for index, case in enumerate(cases):
+            params = self.case_params(case)
+            groups.setdefault(tuple(params[key] for key in GEOMETRY_PARAMS), []).append((index, params))
+        return list(groups.values())
+    
+    def _commands(self, geometry_script, fluent_journal):
+        """(step name, argv) of the MAPDL and Fluent runs, relative to the case directory"""
+        ansys = self.ansys_command or f"{self.ansys_path}/ansys/bin/ansys"
+        fluent = self.fluent_command or f"{self.ansys_path}/fluent/bin/fluent"
+        return [("geometry", [ansys, "-b", "-i", geometry_script]),
+                ("fluent", [fluent, "3d", "-i", fluent_journal])]
+    
+    def case_params(self, case):
+        """
+        Full parameter dictionary of one case
+        Args:
+            case: [sic3_porosity, sic10_porosity, length] or a dict overriding default_params
+        """
+        params = dict(self.default_params)
+        if isinstance(case, dict):
+            params.update(case)
+        else:
+            params['sic3_porosity'], params['sic10_porosity'], params['preheating_length'] = case
+        return params
+    
+    def prepare_case(self, params, directory, case_file="burner.cas"):
+        """Write params.txt, the APDL script and the Fluent journal of one case into directory"""
+        os.makedirs(directory, exist_ok=True)
+        self.create_params_file(params, directory)
+        geometry_script = self.create_ansys_geometry(params, directory)
+        fluent_journal = self.setup_fluent_simulation(params, directory, case_file)
+        return self._commands(geometry_script, fluent_journal)
+    
+    def _run_step(self, name, argv, directory, timeout):
+        """Run one step in its case directory; the whole process group is killed on timeout"""
+        log_path = os.path.join(directory, f"{name}.log")
+        start = time.perf_counter()
+        with open(log_path, 'w') as log:
+            try:
+                process = subprocess.Popen(argv, cwd=directory, stdout=log, stderr=subprocess.STDOUT,
+                                           stdin=subprocess.DEVNULL, start_new_session=True)
+            except OSError as e:
+                return {'step': name, 'status': 'error', 'returncode': None, 'error': str(e),
+                        'elapsed': 0.0, 'log': log_path}
+            try:
+                returncode = process.wait(timeout=timeout)
+                status = 'ok' if returncode == 0 else 'failed'
+            except subprocess.TimeoutExpired:
+                # Fluent and MAPDL start helper processes; take them down too
+                os.killpg(process.pid, signal.SIGKILL)
+                returncode = process.wait()
+                status = 'timeout'
+        return {'step': name, 'status': status, 'returncode': returncode,
+                'elapsed': time.perf_counter() - start, 'log': log_path}
+    
+    def case_objectives(self, path):
+        """
+        Heat, NOx and flame location of a case's ASCII export (see extract_results)
+        Returns:
+            dict with 'heat', 'nox', 'flame_location' and 'status' ('ok'; 'missing' when
+            Fluent wrote no export, 'error' with the reason when it cannot be parsed)
+        """
+        if not os.path.exists(path):
+            return {'status': 'missing'}
+        try:
+            results = self.extract_results(path)
+        except (ValueError, KeyError) as e:
+            return {'status': 'error', 'error': str(e)}
+        return {key: results[key] for key in ('heat', 'nox', 'flame_location', 'status')}
+    
+    def run_case(self, index, case, output_dir=CASES_DIR, timeout=None, case_file="burner.cas"):
+        """
+        Prepare and run one case in output_dir/case_<index>, stopping at the first failed step
+        Returns:
+            dict with the case index, directory, parameters, export file, overall status,
+            per-step results and, once Fluent has run, the objectives (see case_objectives)
+        """
+        directory = os.path.join(output_dir, f"case_{index:04d}")
+        params = self.case_params(case)
+        steps = []
+        status = 'ok'
+        for name, argv in self.prepare_case(params, directory, os.path.abspath(case_file)):
+            step = self._run_step(name, argv, directory, timeout)
+            steps.append(step)
+            if step['status'] != 'ok':
+                status = step['status']
+                break
+        result = {'case': index, 'directory': directory, 'params': params,
+                  'export_file': os.path.join(directory, EXPORT_FILE), 'status': status, 'steps': steps}
+        if status == 'ok':
+            result.update(self.case_objectives(result['export_file']))
+        return result
+    
+    def run_session(self, number, group, output_dir=CASES_DIR, timeout=None,
+                    case_file="burner.cas", iterations=1000):
+        """
+        Mesh one geometry and run all its cases in one Fluent session in output_dir/session_<number>
+        Args:
+            group: (case index, params) pairs sharing one geometry (see geometry_groups)
+        Returns:
+            dict with the session's directory, status and steps, and per-case data and
+            export files, status and objectives (see case_objectives)
+        """
+        directory = os.path.join(output_dir, f"session_{number:04d}")
+        os.makedirs(directory, exist_ok=True)
+        indices = [index for index, _ in group]
+        cases = [params for _, params in group]
+        self.create_params_file(cases[0], directory)
+        geometry_script = self.create_ansys_geometry(cases[0], directory)
+        fluent_journal, data_files, export_files = self.setup_fluent_batch(
+            cases, directory, os.path.abspath(case_file), iterations, indices)
+        steps = []
+        status = 'ok'
+        for name, argv in self._commands(geometry_script, fluent_journal):
+            step = self._run_step(name, argv, directory, timeout)
+            steps.append(step)
+            if step['status'] != 'ok':
+                status = step['status']
+                break
+        # A session that dies part-way still keeps the cases it finished
+        case_results = []
+        for index, params, data_file, export_file in zip(indices, cases, data_files, export_files):
+            case = {'case': index, 'params': params, 'data_file': os.path.join(directory, data_file),
+                    'export_file': os.path.join(directory, export_file)}
+            if os.path.exists(case['data_file']):
+                case.update(self.case_objectives(case['export_file']))
+            else:
+                case['status'] = status if status != 'ok' else 'missing'
+            case_results.append(case)
+        return {'session': number, 'directory': directory, 'status': status, 'steps': steps,
+                'cases': case_results}
+    
+    def run_sessions(self, cases, output_dir=CASES_DIR, max_workers=None, timeout=None,
+                     case_file="burner.cas", iterations=1000):
+        """
+        Like run_cases, but all cases sharing a geometry run in one Fluent session,
+        so the launch and case-read cost is paid once per geometry instead of once per case.
+        timeout applies to a whole session. Returns the per-session results (see run_session),
+        also written to output_dir/cases.json.
+        """
+        if not (self.ansys_command and self.fluent_command) and not self.ansys_path:
+            raise Exception("ANSYS path not found")
+        os.makedirs(output_dir, exist_ok=True)
+        with ThreadPoolExecutor(max_workers or os.cpu_count()) as executor:
+            futures = [executor.submit(self.run_session, n, group, output_dir, timeout,
+                                       case_file, iterations)
+                       for n, group in enumerate(self.geometry_groups(cases))]
+            results = [future.result() for future in futures]
+        
+        with open(os.path.join(output_dir, CASES_SUMMARY), 'w') as f:
+            json.dump(results, f, indent=4)
+        return results
+    
+    def run_cases(self, cases, output_dir=CASES_DIR, max_workers=None, timeout=None,
+                  case_file="burner.cas"):
+        """
+        Run several cases at once, each in its own working directory
+        Args:
+            cases: List of parameter sets (see case_params)
+            output_dir: Parent directory of the case_<index> directories
+            max_workers: Cases running at the same time (default: os.cpu_count())
+            timeout: Wall-clock limit per MAPDL/Fluent step in seconds (None: no limit)
+            case_file: Base Fluent case, shared read-only by all cases
+        Returns:
+            List of per-case results (see run_case), also written to output_dir/cases.json
+        """
+        if not (self.ansys_command and self.fluent_command) and not self.ansys_path:
+            raise Exception("ANSYS path not found")
+        os.makedirs(output_dir, exist_ok=True)
+        with ThreadPoolExecutor(max_workers or os.cpu_count()) as executor:
+            futures = [executor.submit(self.run_case, i, case, output_dir, timeout, case_file)
+                       for i, case in enumerate(cases)]
+            results = [future.result() for future in futures]
+        
+        with open(os.path.join(output_dir, CASES_SUMMARY), 'w') as f:
+            json.dump(results, f, indent=4)
+        return results
+    
     def run_ansys_simulation(self):
         """Run ANSYS simulation using created scripts"""
         if not self.ansys_path:
@@ -175,23 +590,120 @@ class AnsysInterface:
         for cmd in commands:
             os.system(cmd)
     
-    def extract_results(self):
-        """Extract results from ANSYS simulation"""
-        # Read Fluent results
-        results = {
-            'temperature': [],
-            'nox_concentration': [],
-            'velocity': []
-        }
+    def extract_results(self, path=EXPORT_FILE, axis="z", columns=None, bins=None,
+                        chunk_bytes=CHUNK_BYTES):
+        """
+        Extract results from a Fluent ASCII export or profile file
+        Args:
+            path: Exported file (solution data as ASCII, as written by the journals,
+                or a .prof profile)
+            axis: Burner axis; its coordinate column is "<axis>-coordinate" (or just axis)
+            columns: {field: column name} overriding FIELD_NAMES ('temperature', 'heat_release',
+                'nox' or 'no'/'no2', 'velocity')
+            bins: Average over this many axial bins instead of exact axial stations (3D meshes)
+            chunk_bytes: Parse ASCII exports in pieces of about this size
+        Returns:
+            dict with the per-cell arrays ('axial', 'temperature', 'nox_concentration', 'velocity';
+            None when not exported) and, as in solver.simulate, 'heat', 'nox', 'flame_location'
+            and 'status'
+        """
+        available = {name.lower(): name for name in fluent_columns(path)}
+        candidates = dict(FIELD_NAMES, axial=(f"{axis}-coordinate", axis))
+        for field, name in (columns or {}).items():
+            candidates[field] = (name,)
+        resolved = {}
+        for field, names in candidates.items():
+            for name in names:
+                if name.lower() in available:
+                    resolved[field] = available[name.lower()]
+                    break
+        for field in ('axial', 'temperature'):
+            if field not in resolved:
+                raise ValueError(f"{path}: no {field} column among {sorted(available.values())}")
         
-        # This would need to be implemented based on how you want to read the results
-        # Could be from a specific file format or through ANSYS API
+        fields = sorted(set(resolved.values()))
+        with open(path, 'rb') as f:
+            is_profile = f.read(2) == b'(('
+        data = read_fluent_profile(path, fields) if is_profile else \
+            read_fluent_ascii(path, fields, chunk_bytes)
+        arrays = {field: data[name] for field, name in resolved.items()}
         
-        return results
+        # NOx as NO + NO2 (as in the Cantera objectives) unless exported as one field
+        nox = arrays.get('nox')
+        if nox is None and 'no' in arrays:
+            nox = arrays['no'] + arrays['no2'] if 'no2' in arrays else arrays['no']
+        heat, peak_nox, flame_location = cfd_objectives(arrays['axial'], arrays['temperature'],
+                                                        arrays.get('heat_release'), nox, bins)
+        return {
+            'axial': arrays['axial'],
+            'temperature': arrays['temperature'],
+            'nox_concentration': nox,
+            'velocity': arrays.get('velocity'),
+            'heat': heat,
+            'nox': peak_nox,
+            'flame_location': flame_location,
+            'status': 'ok'
+        }
+
+def objectives_text(result):
+    """' | heat ... | NOx ... | flame ...' for a case with objectives, else ''"""
+    if result.get('heat') is None:
+        return ""
+    return (f" | heat {result['heat']:.2f} | NOx {result['nox']:.6f}"
+            f" | flame {result['flame_location']:.4f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ANSYS/Fluent interface: example run, or a "
+                                                 "batch of cases in separate directories")
+    parser.add_argument("--cases", default=None,
+                        help="JSON list of parameter sets ([sic3, sic10, length] or dicts) "
+                             "to run in parallel")
+    parser.add_argument("--output", default=CASES_DIR,
+                        help="parent directory of the per-case working directories")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="cases run at the same time (default: all cores)")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="wall-clock limit per MAPDL/Fluent step in seconds")
+    parser.add_argument("--case-file", default="burner.cas",
+                        help="base Fluent case read by every journal")
+    parser.add_argument("--single-session", action="store_true",
+                        help="run all cases sharing a geometry in one Fluent session")
+    parser.add_argument("--iterations", type=int, default=1000,
+                        help="with --single-session, Fluent iterations per case")
+    parser.add_argument("--ansys-path", default=None,
+                        help="ANSYS installation directory")
+    parser.add_argument("--ansys-command", default=None,
+                        help="MAPDL executable (default: under the installation)")
+    parser.add_argument("--fluent-command", default=None,
+                        help="Fluent executable (default: under the installation)")
+    args = parser.parse_args(argv)
+
+    interface = AnsysInterface(args.ansys_path, args.ansys_command, args.fluent_command)
+    if args.cases:
+        with open(args.cases) as f:
+            cases = json.load(f)
+        if args.single_session:
+            sessions = interface.run_sessions(cases, args.output, args.workers, args.timeout,
+                                              args.case_file, args.iterations)
+            for session in sessions:
+                print(f"session {session['session']:4d}: {session['status']:<8} "
+                      + ", ".join(f"case {c['case']} {c['status']}" for c in session['cases']))
+                for case in session['cases']:
+                    if case.get('heat') is not None:
+                        print(f"  case {case['case']:4d}{objectives_text(case)}")
+            print(f"Summary written to {os.path.join(args.output, CASES_SUMMARY)}")
+            return
+        results = interface.run_cases(cases, args.output, args.workers, args.timeout,
+                                      args.case_file)
+        for result in results:
+            steps = ", ".join(f"{s['step']} {s['status']} ({s['elapsed']:.1f}s, exit {s['returncode']})"
+                              for s in result['steps'])
+            print(f"case {result['case']:4d}: {result['status']:<8} {steps}{objectives_text(result)}")
+        print(f"Summary written to {os.path.join(args.output, CASES_SUMMARY)}")
+        return
 
-def main():
     # Example usage
-    interface = AnsysInterface()
     
     # Create default params file
     interface.create_params_file()
@@ -207,8 +719,8 @@ def main():
     # Run simulation
     interface.run_ansys_simulation()
     
-    # Extract results
-    results = interface.extract_results()
+    # Extract results (the journal exports them to EXPORT_FILE)
+    results = interface.extract_results(EXPORT_FILE)
     print("Simulation results:", results)
 
 if __name__ == "__main__":
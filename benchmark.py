@@ -0,0 +1,272 @@
+# benchmark.py
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import cantera as ct
+import numpy as np
+
+import solver
+
+# --- Benchmark settings ---
+BASELINE_FILE = 'benchmark_baseline.json'
+RESULTS_FILE = 'benchmark_results.json'
+SEED = 0
+N_RANDOM = 3          # seeded interior individuals added to the corners and centre
+GA_POP_SIZE = 6
+GA_GENERATIONS = 2
+
+# --- Regression thresholds ---
+TIME_THRESHOLD = 0.25   # fail when total wall time grows by more than this fraction
+DRIFT_THRESHOLD = 1e-3  # fail when heat, NOx or flame location move by more than this (relative)
+OBJECTIVES = ('heat', 'nox', 'flame_location')
+
+
+def benchmark_individuals(n_random=N_RANDOM, seed=SEED):
+    """The 8 corners of the parameter box, its centre and n_random seeded interior points"""
+    highs = solver.PARAM_LOWS + solver.PARAM_SPANS
+    corners = [list(map(float, c)) for c in itertools.product(*zip(solver.PARAM_LOWS, highs))]
+    centre = [float(x) for x in solver.PARAM_LOWS + solver.PARAM_SPANS / 2]
+    rng = np.random.default_rng(seed)
+    interior = solver.PARAM_LOWS + rng.random((n_random, 3)) * solver.PARAM_SPANS
+    return corners + [centre] + [[float(x) for x in p] for p in interior]
+
+
+def environment():
+    """Versions and the solver configuration hash, so drift can be attributed"""
+    return {
+        'cantera': ct.__version__,
+        'numpy': np.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'mechanism': solver.mechanism_path(solver.MECHANISM),
+        'config_hash': solver.config_hash(solver.MECHANISM),
+    }
+
+
+def run_evaluations(individuals, repeat=1):
+    """
+    Solve every individual in this process, the way a pool worker does (one
+    reused EvaluationContext, no warm starts). Wall time is the best of repeat runs.
+    """
+    solver.init_worker(solver.MECHANISM, reuse=True)
+    results = []
+    for individual in individuals:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = solver.simulate(individual)
+            times.append(time.perf_counter() - start)
+        entry = {'individual': individual, 'wall_time': min(times),
+                 'status': result['status'], 'grid_points': result.get('grid_points')}
+        for name in OBJECTIVES:
+            entry[name] = result.get(name)
+        results.append(entry)
+    return results
+
+
+def warm_start_gaps(cold):
+    """
+    Re-solve each individual warm-started from the previous one (the first from
+    the last), as --warm-start-dir does from its nearest archived neighbour, and
+    compare with its cold solve from run_evaluations.
+    Returns:
+        per individual, the neighbour, whether the warm start took and the
+        relative change of each objective
+    """
+    gaps = []
+    neighbours = [entry['individual'] for entry in cold[-1:] + cold[:-1]]
+    for neighbour, entry in zip(neighbours, cold):
+        with tempfile.TemporaryDirectory() as archive:
+            solver.init_worker(solver.MECHANISM, reuse=True, warm_start_dir=archive)
+            solver.simulate(neighbour)  # the only profile in the archive
+            result = solver.simulate(entry['individual'])
+        gap = {'individual': entry['individual'], 'neighbour': neighbour,
+               'warm_start': bool(result.get('warm_start')), 'grid_points': result.get('grid_points')}
+        for name in OBJECTIVES:
+            gap[name] = relative_change(result.get(name), entry[name])
+        gaps.append(gap)
+    return gaps
+
+
+def run_ga(pop_size=GA_POP_SIZE, generations=GA_GENERATIONS, seed=SEED, workers=None):
+    """Small fixed-seed GA through solver.main, run in a scratch directory"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            start = time.perf_counter()
+            hof, log = solver.main(['--seed', str(seed), '--pop-size', str(pop_size),
+                                    '--generations', str(generations), '--eval-log', '']
+                                   + (['--workers', str(workers)] if workers else []))
+            wall_time = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+    return {'wall_time': wall_time, 'pop_size': pop_size, 'generations': generations,
+            'seed': seed, 'evaluations': int(sum(log.select('nevals'))),
+            'best_individual': [float(x) for x in hof[0]],
+            'best_fitness': float(hof[0].fitness.values[0])}
+
+
+def relative_change(new, old):
+    if new is None or old is None:
+        return None
+    return abs(new - old) / max(abs(old), 1e-300)
+
+
+def compare(results, baseline, time_threshold=TIME_THRESHOLD, drift_threshold=DRIFT_THRESHOLD):
+    """
+    Compare a benchmark run with the stored baseline.
+    Returns:
+        (report lines, failure messages)
+    """
+    lines, failures = [], []
+    if baseline['environment'].get('config_hash') != results['environment']['config_hash']:
+        lines.append("Note: mechanism or solver settings differ from the baseline; drift is expected")
+    for key in ('cantera', 'numpy', 'python'):
+        if baseline['environment'].get(key) != results['environment'][key]:
+            lines.append(f"Note: {key} {baseline['environment'].get(key)} -> {results['environment'][key]}")
+
+    old_by_individual = {tuple(e['individual']): e for e in baseline['evaluations']}
+    lines.append(f"{'individual':>26} | {'time (s)':>15} | {'grid':>9} | "
+                 + " | ".join(f"{'d' + name:>15}" for name in OBJECTIVES))
+    for entry in results['evaluations']:
+        old = old_by_individual.get(tuple(entry['individual']))
+        label = "[" + ", ".join(f"{x:.4f}" for x in entry['individual']) + "]"
+        if old is None:
+            lines.append(f"{label:>26} | not in baseline")
+            continue
+        if entry['status'] != old['status']:
+            failures.append(f"{label}: status {old['status']} -> {entry['status']}")
+        drifts = [relative_change(entry[name], old[name]) for name in OBJECTIVES]
+        for name, drift in zip(OBJECTIVES, drifts):
+            if drift is not None and drift > drift_threshold:
+                failures.append(f"{label}: {name} drifted by {100 * drift:.3g}%")
+        lines.append(f"{label:>26} | {old['wall_time']:6.2f} -> {entry['wall_time']:6.2f} | "
+                     f"{old['grid_points'] or 0:>4}->{entry['grid_points'] or 0:<4} | "
+                     + " | ".join(f"{100 * d:14.4g}%" if d is not None else f"{'-':>15}" for d in drifts))
+
+    old_total = sum(e['wall_time'] for e in baseline['evaluations'])
+    new_total = sum(e['wall_time'] for e in results['evaluations'])
+    slowdown = new_total / old_total - 1 if old_total > 0 else 0.0
+    lines.append(f"Evaluation wall time: {old_total:.1f}s -> {new_total:.1f}s ({100 * slowdown:+.1f}%)")
+    if slowdown > time_threshold:
+        failures.append(f"evaluation wall time grew by {100 * slowdown:.1f}% "
+                        f"(threshold {100 * time_threshold:.0f}%)")
+
+    if results.get('ga') and baseline.get('ga'):
+        old_ga, new_ga = baseline['ga'], results['ga']
+        ga_slowdown = new_ga['wall_time'] / old_ga['wall_time'] - 1
+        ga_drift = relative_change(new_ga['best_fitness'], old_ga['best_fitness'])
+        lines.append(f"GA: {old_ga['wall_time']:.1f}s -> {new_ga['wall_time']:.1f}s "
+                     f"({100 * ga_slowdown:+.1f}%), best fitness drift {100 * ga_drift:.3g}%")
+        if ga_slowdown > time_threshold:
+            failures.append(f"GA wall time grew by {100 * ga_slowdown:.1f}%")
+        if ga_drift > drift_threshold:
+            failures.append(f"GA best fitness drifted by {100 * ga_drift:.3g}%")
+    return lines, failures
+
+
+def report_warm_start(gaps, cold, drift_threshold=DRIFT_THRESHOLD):
+    """
+    Report lines and failure messages for warm_start_gaps: a warm-started
+    objective further than drift_threshold (relative) from the cold solve fails.
+    """
+    lines = [f"{'individual':>26} | {'grid':>9} | " + " | ".join(f"{'d' + name:>15}" for name in OBJECTIVES)]
+    failures = []
+    for gap, entry in zip(gaps, cold):
+        label = "[" + ", ".join(f"{x:.4f}" for x in gap['individual']) + "]"
+        if not gap['warm_start']:
+            lines.append(f"{label:>26} | warm start failed, solved cold")
+            continue
+        drifts = [gap[name] for name in OBJECTIVES]
+        for name, drift in zip(OBJECTIVES, drifts):
+            if drift is not None and drift > drift_threshold:
+                failures.append(f"{label}: warm-started {name} differs from the cold solve by {100 * drift:.3g}%")
+        lines.append(f"{label:>26} | {entry['grid_points'] or 0:>4}->{gap['grid_points'] or 0:<4} | "
+                     + " | ".join(f"{100 * d:14.4g}%" if d is not None else f"{'-':>15}" for d in drifts))
+    return lines, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the flame evaluation pipeline "
+                                                 "against a stored baseline")
+    parser.add_argument("--baseline", default=BASELINE_FILE,
+                        help="baseline JSON to compare with (or to write with --save-baseline)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store this run as the new baseline instead of comparing")
+    parser.add_argument("--output", default=RESULTS_FILE,
+                        help="where to write this run's measurements")
+    parser.add_argument("--random", type=int, default=N_RANDOM,
+                        help="seeded interior individuals in addition to the corners and centre")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="solves per individual; the fastest is reported")
+    parser.add_argument("--no-ga", action="store_true",
+                        help="skip the fixed-seed GA run")
+    parser.add_argument("--ga-pop-size", type=int, default=GA_POP_SIZE,
+                        help="population size of the GA run")
+    parser.add_argument("--ga-generations", type=int, default=GA_GENERATIONS,
+                        help="generations of the GA run")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for the GA run (default: all cores)")
+    parser.add_argument("--time-threshold", type=float, default=TIME_THRESHOLD,
+                        help="allowed relative growth of wall time")
+    parser.add_argument("--drift-threshold", type=float, default=DRIFT_THRESHOLD,
+                        help="allowed relative drift of heat, NOx and flame location")
+    parser.add_argument("--warm-start-check", action="store_true",
+                        help="instead of comparing with the baseline, re-solve every individual "
+                             "warm-started from another and report how far it lands from its cold solve")
+    args = parser.parse_args(argv)
+
+    if args.warm_start_check:
+        cold = run_evaluations(benchmark_individuals(args.random))
+        gaps = warm_start_gaps(cold)
+        with open(args.output, 'w') as f:
+            json.dump({'environment': environment(), 'evaluations': cold, 'warm_start': gaps}, f, indent=4)
+        lines, failures = report_warm_start(gaps, cold, args.drift_threshold)
+        print("Warm start vs cold solve (relative change):")
+        print("\n".join(lines))
+        if failures:
+            print("\nWARM STARTS CHANGE THE OBJECTIVES:")
+            for failure in failures:
+                print(f"- {failure}")
+            return 1
+        print("\nWarm-started objectives agree with cold solves within the drift threshold")
+        return 0
+
+    results = {'environment': environment(),
+               'evaluations': run_evaluations(benchmark_individuals(args.random), args.repeat)}
+    if not args.no_ga:
+        results['ga'] = run_ga(args.ga_pop_size, args.ga_generations, SEED, args.workers)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=4)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first")
+        return 2
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    lines, failures = compare(results, baseline, args.time_threshold, args.drift_threshold)
+    print("\n".join(lines))
+    if failures:
+        print("\nREGRESSION:")
+        for failure in failures:
+            print(f"- {failure}")
+        return 1
+    print("\nNo regression beyond the configured thresholds")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,377 @@
+import argparse
+import importlib
+import itertools
+import multiprocessing
+import os
+import pickle
+import secrets
+import socket
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from multiprocessing.managers import BaseManager
+from pathlib import Path
+
+from supervised_pool import AsyncResult
+
+DEFAULT_HOST = 'localhost'  # other machines need an explicit HOST (e.g. 0.0.0.0) to reach the queue
+DEFAULT_PORT = 50000
+DEFAULT_AUTHKEY = os.environ.get('FARM_AUTHKEY')  # no built-in key: tasks are unpickled on both sides
+LEASE = 30.0      # seconds without a heartbeat after which a worker's tasks are re-queued
+HEARTBEAT = 5.0   # seconds between worker heartbeats
+STOP = 'stop'     # returned by TaskBoard.take once the farm shuts down
+
+
+class TaskBoard:
+    """
+    State of the evaluation farm, living in the manager's server process.
+    Tasks are opaque pickled payloads: the parent submits them, workers lease
+    them with take() and hand back results with complete(). A worker whose
+    heartbeats stop for longer than the lease loses its tasks to the queue.
+    """
+    def __init__(self):
+        self.lease = LEASE
+        self._cond = threading.Condition()
+        self._pending = deque()   # task ids waiting for a worker
+        self._payloads = {}       # task id -> pickled (func, args)
+        self._leases = {}         # task id -> worker id
+        self._workers = {}        # worker id -> time of last heartbeat
+        self._results = deque()   # (task id, ok, pickled result or exception)
+        self._main_module = None  # importable name of the parent's __main__
+        self._setup = None        # pickled (initializer, initargs)
+        self._stopped = False
+        self.completed = 0
+        self.requeued = 0
+        threading.Thread(target=self._reap, daemon=True).start()
+
+    # --- Parent side ---
+    def configure(self, lease, main_module, setup):
+        with self._cond:
+            self.lease = lease
+            self._main_module = main_module
+            self._setup = setup
+
+    def submit(self, task_id, payload):
+        with self._cond:
+            self._payloads[task_id] = payload
+            self._pending.append(task_id)
+            self._cond.notify_all()
+
+    def results(self, timeout):
+        """Wait up to timeout for finished tasks and return them all"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._results, timeout)
+            finished = list(self._results)
+            self._results.clear()
+        return finished
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def status(self):
+        with self._cond:
+            return {'workers': len(self._workers), 'pending': len(self._pending),
+                    'running': len(self._leases), 'completed': self.completed,
+                    'requeued': self.requeued}
+
+    # --- Worker side ---
+    def setup(self):
+        return self._main_module, self._setup
+
+    def heartbeat(self, worker_id):
+        with self._cond:
+            self._workers[worker_id] = time.monotonic()
+
+    def take(self, worker_id, timeout):
+        """Lease the next task as (task id, payload); None if none arrived in time, STOP at shutdown"""
+        with self._cond:
+            self._workers[worker_id] = time.monotonic()
+            self._cond.wait_for(lambda: self._pending or self._stopped, timeout)
+            if self._stopped:
+                return STOP
+            while self._pending and self._pending[0] not in self._payloads:
+                self._pending.popleft()  # answered while it waited to be re-queued
+            if not self._pending:
+                return None
+            task_id = self._pending.popleft()
+            self._leases[task_id] = worker_id
+            return task_id, self._payloads[task_id]
+
+    def complete(self, worker_id, task_id, ok, payload):
+        with self._cond:
+            # Whoever holds the lease, the task is done (a late answer from a worker
+            # presumed lost may arrive after the task was leased to another one)
+            self._leases.pop(task_id, None)
+            if task_id not in self._payloads:
+                return  # already answered by another worker
+            if task_id in self._pending:
+                self._pending.remove(task_id)
+            del self._payloads[task_id]
+            self.completed += 1
+            self._results.append((task_id, ok, payload))
+            self._cond.notify_all()
+
+    def leave(self, worker_id):
+        with self._cond:
+            self._drop(worker_id)
+
+    def _drop(self, worker_id):
+        self._workers.pop(worker_id, None)
+        for task_id, holder in list(self._leases.items()):
+            if holder == worker_id:
+                del self._leases[task_id]
+                self._pending.appendleft(task_id)
+                self.requeued += 1
+        self._cond.notify_all()
+
+    def _reap(self):
+        while True:
+            time.sleep(1.0)
+            with self._cond:
+                now = time.monotonic()
+                for worker_id, seen in list(self._workers.items()):
+                    if now - seen > self.lease:
+                        self._drop(worker_id)
+
+
+_board = None
+
+
+def _get_board():
+    global _board
+    if _board is None:
+        _board = TaskBoard()
+    return _board
+
+
+class FarmManager(BaseManager):
+    pass
+
+
+FarmManager.register('board', callable=_get_board)
+
+
+def parse_address(address):
+    """'host:port' (or ':port', or 'host') -> (host, port); the host defaults to localhost"""
+    host, _, port = address.rpartition(':') if ':' in address else (address, '', '')
+    return host or DEFAULT_HOST, int(port) if port else DEFAULT_PORT
+
+
+def _main_module_name():
+    """Importable name of the parent's __main__, so workers can unpickle functions defined there"""
+    main = sys.modules.get('__main__')
+    path = getattr(main, '__file__', None)
+    return Path(path).stem if path else None
+
+
+def run_worker(address, authkey=DEFAULT_AUTHKEY, heartbeat=HEARTBEAT, poll=1.0):
+    """
+    Serve tasks from the farm at address ((host, port) or 'host:port') until it
+    shuts down or goes away. The parent's initializer runs once, as in a Pool worker.
+    """
+    if not authkey:
+        raise ValueError("A farm worker needs the farm's authkey ($FARM_AUTHKEY or --authkey)")
+    if isinstance(address, str):
+        address = parse_address(address)
+    manager = FarmManager(address=address, authkey=authkey.encode())
+    manager.connect()
+    board = manager.board()
+    worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    board.heartbeat(worker_id)
+
+    done = threading.Event()
+
+    def beat():
+        # Own proxy: proxies are per thread, and solves release the GIL
+        own_board = manager.board()
+        while not done.wait(heartbeat):
+            try:
+                own_board.heartbeat(worker_id)
+            except (OSError, EOFError):
+                return
+    threading.Thread(target=beat, daemon=True).start()
+
+    main_module, setup = board.setup()
+    if main_module and main_module != _main_module_name():
+        # Functions pickled from the parent's script refer to __main__
+        module = importlib.import_module(main_module)
+        sys.modules['__main__'] = sys.modules['__mp_main__'] = module
+    initializer, initargs = pickle.loads(setup)
+    if initializer is not None:
+        initializer(*initargs)
+
+    try:
+        while True:
+            task = board.take(worker_id, poll)
+            if task == STOP:
+                break
+            if task is None:
+                continue
+            task_id, payload = task
+            try:
+                func, args = pickle.loads(payload)
+                result = (True, pickle.dumps(func(*args)))
+            except Exception as e:
+                try:
+                    result = (False, pickle.dumps(e))
+                except Exception:
+                    result = (False, pickle.dumps(RuntimeError(repr(e))))
+            board.complete(worker_id, task_id, *result)
+    except (OSError, EOFError):
+        pass  # the farm went away
+    finally:
+        done.set()
+        try:
+            board.leave(worker_id)
+        except (OSError, EOFError):
+            pass
+
+
+class FarmPool:
+    """
+    Pool backed by a TCP work queue that worker processes on any machine join
+    with `python evaluation_farm.py worker --address HOST:PORT`. Tasks held by a
+    worker that stops sending heartbeats are re-queued. Offers the same subset
+    of the multiprocessing.Pool interface as SupervisedPool (map, apply_async,
+    close, join, terminate), so the GA drivers are unchanged.
+    """
+    def __init__(self, address=(DEFAULT_HOST, DEFAULT_PORT), authkey=DEFAULT_AUTHKEY, initializer=None,
+                 initargs=(), local_workers=0, lease=LEASE, poll_interval=0.5):
+        """
+        Args:
+            address: (host, port) the queue server listens on
+            authkey: shared secret workers must present; None generates a random one
+                (read it back from self.authkey and hand it to the workers)
+            initializer, initargs: run once in every worker (must be picklable)
+            local_workers: worker processes to start on this machine
+            lease: seconds without a heartbeat before a worker's tasks are re-queued
+            poll_interval: how often the collector checks for results (seconds)
+        """
+        self.address = address
+        self.authkey = authkey or secrets.token_urlsafe(24)
+        self.poll_interval = poll_interval
+        self._manager = FarmManager(address=address, authkey=self.authkey.encode())
+        self._manager.start()
+        self.address = self._manager.address
+        self._board = self._manager.board()
+        self._board.configure(lease, _main_module_name(), pickle.dumps((initializer, initargs)))
+
+        self._lock = threading.Lock()
+        self._task_ids = itertools.count()
+        self._results = {}   # task id -> AsyncResult
+        self._closed = False
+        self._stopped = False
+        self._final_status = None
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+        host, port = self.address
+        local_address = ('localhost' if host in ('', '0.0.0.0') else host, port)
+        self._local = [multiprocessing.Process(target=run_worker, daemon=True,
+                                               args=(local_address, self.authkey))
+                       for _ in range(local_workers)]
+        for process in self._local:
+            process.start()
+
+    def _collect(self):
+        board = self._manager.board()  # the collector thread's own proxy
+        while True:
+            with self._lock:
+                if self._stopped or (self._closed and not self._results):
+                    break
+            try:
+                finished = board.results(self.poll_interval)
+            except (OSError, EOFError):
+                break
+            for task_id, ok, payload in finished:
+                with self._lock:
+                    result = self._results.pop(task_id, None)
+                if result is None:
+                    continue
+                value = pickle.loads(payload)
+                if ok:
+                    result._set(value)
+                else:
+                    result._set(error=value)
+
+    def apply_async(self, func, args=(), callback=None, error_callback=None):
+        result = AsyncResult(callback, error_callback)
+        with self._lock:
+            if self._closed:
+                raise ValueError("Pool not running")
+            task_id = next(self._task_ids)
+            self._results[task_id] = result
+        self._board.submit(task_id, pickle.dumps((func, tuple(args))))
+        return result
+
+    def map(self, func, iterable):
+        return [result.get() for result in
+                [self.apply_async(func, (item,)) for item in iterable]]
+
+    def status(self):
+        """Worker, queue and re-queue counts (as of shutdown once the pool is joined)"""
+        if self._final_status is not None:
+            return self._final_status
+        return self._board.status()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+
+    def join(self):
+        self._collector.join()
+        self._shutdown()
+
+    def terminate(self):
+        with self._lock:
+            self._closed = True
+            self._stopped = True
+        self._collector.join()
+        self._shutdown()
+
+    def _shutdown(self):
+        try:
+            self._final_status = self._board.status()
+            self._board.stop()
+        except (OSError, EOFError):
+            pass
+        for process in self._local:
+            process.join(5)
+            if process.is_alive():
+                process.terminate()
+        self._manager.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluation farm worker: pull individuals from "
+                                                 "a solver.py --farm queue and push results back")
+    sub = parser.add_subparsers(dest="command", required=True)
+    worker = sub.add_parser("worker", help="run worker processes on this machine")
+    worker.add_argument("--address", default=f"{DEFAULT_HOST}:{DEFAULT_PORT}",
+                        help="HOST:PORT of the queue server")
+    worker.add_argument("--authkey", default=DEFAULT_AUTHKEY, required=DEFAULT_AUTHKEY is None,
+                        help="shared secret printed by solver.py --farm (default: $FARM_AUTHKEY)")
+    worker.add_argument("--processes", type=int, default=1,
+                        help="worker processes to start (one solve each at a time)")
+    worker.add_argument("--heartbeat", type=float, default=HEARTBEAT,
+                        help="seconds between heartbeats")
+    args = parser.parse_args(argv)
+
+    address = parse_address(args.address)
+    # The parent's script and helper modules must be importable from here
+    sys.path.insert(0, os.getcwd())
+    processes = [multiprocessing.Process(target=run_worker,
+                                         args=(address, args.authkey, args.heartbeat))
+                 for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
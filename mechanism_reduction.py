@@ -0,0 +1,214 @@
+# mechanism_reduction.py
+import argparse
+import json
+import os
+import time
+
+import cantera as ct
+import numpy as np
+
+import solver
+
+# --- Reduction settings ---
+TARGETS = ('CH4', 'O2', 'NO', 'NO2')  # fuel, oxidiser and the NOx species flame_objectives reads
+RETAINED = ('N2',)                    # bath gas, kept whatever its coefficient
+THRESHOLDS = (0.003, 0.01, 0.03, 0.1)
+TOLERANCE = 0.02    # largest relative error in heat, NOx or flame location of the chosen mechanism
+N_REFERENCE = 3     # Lpre values (evenly spaced over the range) of the reference solves
+OUTPUT = 'gri30_skeletal.yaml'
+REPORT = 'mechanism_reduction.json'
+OBJECTIVES = ('heat', 'nox', 'flame_location')
+
+
+def solve_flames(mechanism, lengths):
+    """
+    Solve the burner flame for each preheating length the way simulate() does
+    (cold start, full fidelity).
+    Returns:
+        one dict per length with the objectives, solve time, grid size and, for
+        converged flames, the (T, Y) states along the grid
+    """
+    ctx = solver.EvaluationContext(mechanism)
+    flames = []
+    for Lpre in lengths:
+        start = time.perf_counter()
+        try:
+            flame = ctx.prepare(Lpre + solver.SIC3_LENGTH + solver.SIC10_LENGTH)
+            flame.solve(loglevel=0, auto=True, refine_grid=True)
+        except ct.CanteraError:
+            flames.append({'Lpre': float(Lpre), 'status': 'failed',
+                           'solve_time': time.perf_counter() - start})
+            continue
+        heat, nox, flame_location = solver.flame_objectives(flame, ctx.gas)
+        flames.append({'Lpre': float(Lpre), 'status': 'ok', 'heat': heat, 'nox': nox,
+                       'flame_location': flame_location,
+                       'solve_time': time.perf_counter() - start, 'grid_points': len(flame.grid),
+                       'states': (flame.T.copy(), flame.Y.T.copy())})
+    return flames
+
+
+def direct_interactions(gas):
+    """
+    DRGEP direct interaction coefficients r[A, B] at the gas's current state:
+    |sum over reactions involving B of the net production of A| / max(production, consumption of A)
+    """
+    production = (gas.product_stoich_coeffs - gas.reactant_stoich_coeffs) * gas.net_rates_of_progress
+    involved = ((gas.product_stoich_coeffs + gas.reactant_stoich_coeffs) > 0).astype(float)
+    scale = np.maximum(production.clip(min=0).sum(axis=1), (-production).clip(min=0).sum(axis=1))
+    r = np.abs(production @ involved.T)
+    r = np.divide(r, scale[:, None], out=np.zeros_like(r), where=scale[:, None] > 0)
+    np.fill_diagonal(r, 0.0)
+    return np.minimum(r, 1.0)
+
+
+def path_coefficients(r, target):
+    """Largest product of direct coefficients over any path from target to each species (Dijkstra)"""
+    R = np.zeros(len(r))
+    R[target] = 1.0
+    done = np.zeros(len(r), dtype=bool)
+    for _ in range(len(r)):
+        a = int(np.argmax(np.where(done, -1.0, R)))
+        if done[a] or R[a] == 0.0:
+            break
+        done[a] = True
+        R = np.maximum(R, R[a] * r[a])
+    return R
+
+
+def drgep_importance(mechanism, flames, targets=TARGETS):
+    """
+    Overall DRGEP coefficient of every species: the maximum, over all reference
+    flame states and targets, of the path coefficient from the target.
+    Returns:
+        {species name: coefficient}
+    """
+    gas = ct.Solution(mechanism)
+    target_indices = [gas.species_index(t) for t in targets]
+    importance = np.zeros(gas.n_species)
+    for flame in flames:
+        if flame['status'] != 'ok':
+            continue
+        for T, Y in zip(*flame['states']):
+            gas.TPY = T, solver.P, Y
+            r = direct_interactions(gas)
+            for t in target_indices:
+                importance = np.maximum(importance, path_coefficients(r, t))
+    return dict(zip(gas.species_names, importance.tolist()))
+
+
+def skeletal_mechanism(mechanism, keep, name='skeletal'):
+    """
+    Cantera Solution with only the species in keep and the reactions among
+    them (explicit third bodies included); third-body efficiencies of removed
+    species are dropped.
+    """
+    gas = ct.Solution(mechanism)
+    species = [gas.species(s) for s in gas.species_names if s in keep]
+    reactions = []
+    for reaction in gas.reactions():
+        third_body = reaction.third_body
+        if not set(reaction.reactants) | set(reaction.products) <= keep:
+            continue
+        if third_body is not None:
+            if third_body.name != 'M' and third_body.name not in keep:
+                continue
+            third_body.efficiencies = {s: e for s, e in third_body.efficiencies.items() if s in keep}
+        reactions.append(reaction)
+    return ct.Solution(thermo='ideal-gas', kinetics='gas', transport_model='mixture-averaged',
+                       species=species, reactions=reactions, name=name)
+
+
+def objective_errors(flames, references):
+    """Largest relative error of each objective against the full-mechanism solves (inf if any failed)"""
+    errors = {}
+    for name in OBJECTIVES:
+        worst = 0.0
+        for flame, reference in zip(flames, references):
+            if flame['status'] != 'ok':
+                worst = np.inf
+                break
+            worst = max(worst, abs(flame[name] - reference[name]) / abs(reference[name]))
+        errors[name] = worst
+    return errors
+
+
+def summary(flames):
+    return [{k: v for k, v in flame.items() if k != 'states'} for flame in flames]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DRGEP reduction of the flame mechanism for the "
+                                                 "burner operating point")
+    parser.add_argument("--mechanism", default=solver.MECHANISM,
+                        help="detailed mechanism to reduce")
+    parser.add_argument("--targets", nargs="+", default=list(TARGETS),
+                        help="DRGEP target species (NO and NO2 are always kept)")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=list(THRESHOLDS),
+                        help="DRGEP thresholds to try; species below the threshold are removed")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="largest relative error in heat, NOx or flame location accepted")
+    parser.add_argument("--reference", type=int, default=N_REFERENCE,
+                        help="number of preheating lengths solved with the full mechanism")
+    parser.add_argument("--output", default=OUTPUT,
+                        help="YAML file for the smallest mechanism within --tolerance")
+    parser.add_argument("--report", default=REPORT,
+                        help="JSON report of every threshold tried")
+    args = parser.parse_args(argv)
+
+    lengths = np.linspace(solver.L_PRE_MIN, solver.L_PRE_MAX, args.reference)
+    full = ct.Solution(args.mechanism)
+    print(f"Reference solves with {args.mechanism} ({full.n_species} species, "
+          f"{full.n_reactions} reactions) at Lpre = {', '.join(f'{L:.4f}' for L in lengths)}")
+    references = solve_flames(args.mechanism, lengths)
+    if any(flame['status'] != 'ok' for flame in references):
+        raise SystemExit("The full mechanism failed to converge; nothing to reduce against")
+    full_time = sum(flame['solve_time'] for flame in references)
+    importance = drgep_importance(args.mechanism, references, args.targets)
+
+    # --- Try every distinct species set, smallest first ---
+    always = set(args.targets) | set(RETAINED) | {'NO', 'NO2', solver.FUEL}
+    candidates = {}
+    for threshold in sorted(args.thresholds, reverse=True):
+        keep = frozenset(s for s, value in importance.items() if value >= threshold) | always
+        candidates.setdefault(keep, threshold)
+
+    results, chosen = [], None
+    for keep, threshold in sorted(candidates.items(), key=lambda item: len(item[0])):
+        skeletal = skeletal_mechanism(args.mechanism, keep)
+        path = f"{args.output}.{threshold:g}.tmp.yaml"
+        skeletal.write_yaml(path)
+        flames = solve_flames(path, lengths)
+        errors = objective_errors(flames, references)
+        solve_time = sum(flame['solve_time'] for flame in flames)
+        result = {'threshold': threshold, 'species': skeletal.n_species,
+                  'reactions': skeletal.n_reactions,
+                  'removed': sorted(set(full.species_names) - keep),
+                  'errors': errors, 'speedup': full_time / solve_time if solve_time else None,
+                  'flames': summary(flames)}
+        results.append(result)
+        print(f"threshold {threshold:g}: {skeletal.n_species} species, {skeletal.n_reactions} reactions"
+              f" | " + " | ".join(f"{name} {100 * errors[name]:.3g}%" for name in OBJECTIVES)
+              + f" | {result['speedup']:.2f}x faster")
+        if chosen is None and max(errors.values()) <= args.tolerance:
+            chosen = result
+            skeletal.write_yaml(args.output)
+        os.remove(path)
+        if chosen is not None:
+            break  # every remaining candidate is larger
+
+    with open(args.report, 'w') as f:
+        json.dump({'mechanism': args.mechanism, 'targets': args.targets,
+                   'tolerance': args.tolerance, 'importance': importance,
+                   'reference': summary(references), 'candidates': results,
+                   'chosen': chosen and {k: chosen[k] for k in ('threshold', 'species', 'reactions')},
+                   'output': args.output if chosen else None}, f, indent=4)
+    if chosen is None:
+        print(f"No threshold kept every error within {100 * args.tolerance:g}%; see {args.report}")
+        return 1
+    print(f"Skeletal mechanism ({chosen['species']} species, {chosen['reactions']} reactions) "
+          f"written to {args.output}; run the GA with python solver.py --mechanism {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
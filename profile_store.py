@@ -0,0 +1,162 @@
+# profile_store.py
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import h5py
+except ImportError:  # only needed for format='hdf5'
+    h5py = None
+
+# --- Store settings ---
+PROFILE_SPECIES = ('CH4', 'O2', 'CO', 'OH', 'NO', 'NO2')  # mass fractions kept by default
+BASE_ROWS = ('grid', 'T', 'heat_release_rate')
+FORMATS = ('npy', 'hdf5')
+METADATA = 'store.json'
+DTYPE = np.float32
+
+
+class ProfileStore:
+    """
+    Directory of converged flame profiles, one entry per evaluation ID.
+    Each entry is a float32 array with one row per quantity (grid, T, heat
+    release rate, then the mass fraction of each stored species) and one column
+    per grid point. With format 'npy' every entry is its own <id>.npy file,
+    written to a temporary name and renamed, and load() memory-maps it. With
+    format 'hdf5' (needs h5py) each process appends chunked datasets to its own
+    profiles-<pid>.h5, read one entry at a time. The format and species are
+    fixed when the store is created (store.json).
+    """
+    def __init__(self, path, species=None, format=None):
+        """
+        Args:
+            path: store directory (created if missing)
+            species: species to store; None uses the store's (or PROFILE_SPECIES for a new store)
+            format: 'npy' or 'hdf5'; None uses the store's (or 'npy' for a new store)
+        Raises:
+            ValueError if species or format differ from an existing store's
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        metadata_path = self.path / METADATA
+        if metadata_path.exists():
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+            for name, value in (('species', species), ('format', format)):
+                stored = metadata[name]
+                if value is not None and (list(value) if name == 'species' else value) != stored:
+                    raise ValueError(f"Profile store {self.path} holds {name} {stored}, not {value}")
+        else:
+            species = list(species or PROFILE_SPECIES)
+            metadata = {'species': species, 'format': format or 'npy',
+                        'rows': list(BASE_ROWS) + species, 'dtype': np.dtype(DTYPE).name}
+            if metadata['format'] not in FORMATS:
+                raise ValueError(f"Unknown profile store format {metadata['format']!r}")
+            tmp = metadata_path.with_name(f"{METADATA}.{os.getpid()}.tmp")
+            with open(tmp, 'w') as f:
+                json.dump(metadata, f, indent=4)
+            os.replace(tmp, metadata_path)
+        self.species = metadata['species']
+        self.format = metadata['format']
+        self.rows = metadata['rows']
+        if self.format == 'hdf5' and h5py is None:
+            raise ValueError("The hdf5 profile store format needs h5py (pip install h5py)")
+        self._files = {}  # HDF5 file name -> (mtime when opened, read-only handle)
+        self._index = {}  # evaluation ID -> HDF5 file name
+
+    # --- Writing (workers) ---
+    def add(self, flame):
+        """
+        Store a solved FreeFlame.
+        Returns:
+            the new evaluation ID
+        """
+        eval_id = f"{os.getpid()}_{time.time_ns()}"
+        names = flame.gas.species_names
+        data = np.full((len(self.rows), len(flame.grid)), np.nan, dtype=DTYPE)
+        data[0] = flame.grid
+        data[1] = flame.T
+        data[2] = flame.heat_release_rate
+        for row, name in enumerate(self.species, start=len(BASE_ROWS)):
+            if name in names:  # species missing from the mechanism stay NaN
+                data[row] = flame.Y[names.index(name)]
+
+        if self.format == 'npy':
+            tmp = self.path / f".{eval_id}.npy.tmp"
+            with open(tmp, 'wb') as f:
+                np.save(f, data)
+            os.replace(tmp, self.path / f"{eval_id}.npy")
+        else:
+            # One file per writer process: HDF5 files take no concurrent writers
+            with h5py.File(self.path / f"profiles-{os.getpid()}.h5", 'a') as f:
+                f.create_dataset(eval_id, data=data, chunks=(len(self.rows), min(len(flame.grid), 256)))
+        return eval_id
+
+    # --- Reading (analysis) ---
+    def _refresh(self):
+        """(Re)open HDF5 files that are new or changed since they were last opened"""
+        for entry in os.listdir(self.path):
+            if not (entry.startswith('profiles-') and entry.endswith('.h5')):
+                continue
+            try:
+                mtime = os.stat(self.path / entry).st_mtime_ns
+                if entry in self._files and self._files[entry][0] == mtime:
+                    continue
+                if entry in self._files:
+                    self._files.pop(entry)[1].close()
+                handle = h5py.File(self.path / entry, 'r')
+                self._files[entry] = (mtime, handle)
+                for eval_id in handle:
+                    self._index[eval_id] = entry
+            except OSError:
+                continue  # being written, or left corrupt by a killed worker
+
+    def ids(self):
+        """Evaluation IDs in the store"""
+        if self.format == 'npy':
+            return sorted(entry[:-4] for entry in os.listdir(self.path)
+                          if entry.endswith('.npy') and not entry.startswith('.'))
+        self._refresh()
+        return sorted(self._index)
+
+    def __contains__(self, eval_id):
+        if self.format == 'npy':
+            return (self.path / f"{eval_id}.npy").exists()
+        if eval_id not in self._index:
+            self._refresh()
+        return eval_id in self._index
+
+    def __len__(self):
+        return len(self.ids())
+
+    def array(self, eval_id):
+        """The stored (rows, grid points) array: a read-only memmap (npy) or an h5py dataset"""
+        if self.format == 'npy':
+            return np.load(self.path / f"{eval_id}.npy", mmap_mode='r')
+        if eval_id not in self._index:
+            self._refresh()
+        return self._files[self._index[eval_id]][1][eval_id]
+
+    def load(self, eval_id):
+        """
+        Profiles of one evaluation, keyed by row name ('grid', 'T',
+        'heat_release_rate' and the species names). npy rows are views of the
+        memory-mapped file, so nothing is read until used.
+        Raises:
+            KeyError if eval_id is not in the store
+        """
+        if eval_id not in self:
+            raise KeyError(eval_id)
+        data = self.array(eval_id)
+        if self.format == 'hdf5':
+            data = data[()]  # one small read; only npy entries stay on disk
+        return {name: data[row] for row, name in enumerate(self.rows)}
+
+    def close(self):
+        for _, handle in self._files.values():
+            handle.close()
+        self._files, self._index = {}, {}
+
@@ -3,13 +3,40 @@ import numpy as np
 from deap import base, creator, tools, algorithms
 import random
 import multiprocessing
+import argparse
+import cProfile
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import queue
+import sqlite3
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are not locked
+    fcntl = None
+
+from supervised_pool import SupervisedPool
+from profile_store import ProfileStore, PROFILE_SPECIES, FORMATS as PROFILE_FORMATS
+from evaluation_farm import FarmPool, DEFAULT_AUTHKEY, LEASE, parse_address
 
 # --- GA parameter bounds ---
 POROSITY_MIN, POROSITY_MAX = 0.75, 0.85
 L_PRE_MIN, L_PRE_MAX = 0.02, 0.04  # meters
 
+# Lower bounds and ranges of (eps1, eps2, Lpre), used to map individuals onto the unit cube
+PARAM_LOWS = np.array([POROSITY_MIN, POROSITY_MIN, L_PRE_MIN])
+PARAM_SPANS = np.array([POROSITY_MAX - POROSITY_MIN, POROSITY_MAX - POROSITY_MIN, L_PRE_MAX - L_PRE_MIN])
+
 # --- Fitness penalty weight for NOx ---
 w_NOx = 1e5  # Adjust as needed for your system
+FAILED_FITNESS = -1e12  # assigned when Cantera fails to converge
+TIMEOUT_FITNESS = -2e12  # assigned when a solve exceeds --eval-timeout
 
 # --- Burner geometry (meters) ---
 YZA_LENGTH = 0.0508  # 2 inches
@@ -22,65 +49,970 @@ PHI = 0.6
 P = ct.one_atm
 TIN = 300.0  # K
 
-def evaluate(individual):
-    eps1, eps2, Lpre = individual
-    try:
-        # Set up gas object
-        gas = ct.Solution('gri30.yaml')
-        gas.set_equivalence_ratio(PHI, FUEL, 'O2:0.21,N2:0.79')
-        gas.TP = TIN, P
+# --- Flame model settings ---
+MECHANISM = 'gri30.yaml'
+OXIDIZER = 'O2:0.21,N2:0.79'
+TRANSPORT_MODEL = 'Mix'
+REFINE_CRITERIA = {'ratio': 3, 'slope': 0.06, 'curve': 0.12}
+# Cheap first pass used by the multi-fidelity mode
+COARSE_TRANSPORT_MODEL = 'unity-Lewis-number'
+COARSE_REFINE_CRITERIA = {'ratio': 5, 'slope': 0.3, 'curve': 0.5}
+FIDELITY_SETTINGS = {
+    'fine': (TRANSPORT_MODEL, REFINE_CRITERIA),
+    'coarse': (COARSE_TRANSPORT_MODEL, COARSE_REFINE_CRITERIA),
+}
+# Relative positions of the starting grid (same as ct.FreeFlame(width=...))
+INITIAL_GRID = np.array([0.0, 0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 1.0])
 
 
+def normalise(individuals):
+    """Map one individual, or an (n, 3) array of them, onto the unit cube"""
+    return (np.asarray(individuals, dtype=float) - PARAM_LOWS) / PARAM_SPANS
 
 
+class EvaluationContext:
+    """
+    Cantera objects that live for the whole lifetime of a worker process.
+    The mechanism is parsed once and the FreeFlame is resized per individual.
+    """
+    def __init__(self, mechanism=MECHANISM, timing=False):
+        start = time.perf_counter()
+        self.mechanism = mechanism
+        self.timing = timing
+        self.gas = ct.Solution(mechanism)
+        self.gas.set_equivalence_ratio(PHI, FUEL, OXIDIZER)
+        self.gas.TP = TIN, P
+        self.inlet_X = self.gas.X.copy()
+        self.flame = ct.FreeFlame(self.gas, width=L_PRE_MIN + SIC3_LENGTH + SIC10_LENGTH)
+        self.flame.set_refine_criteria(**REFINE_CRITERIA)
+        self.flame.transport_model = TRANSPORT_MODEL
+        self.fidelity = 'fine'
+        self.setup_time = time.perf_counter() - start
 
-        # Domain: preheat (YZA), SiC3, SiC10
-        width = Lpre + SIC3_LENGTH + SIC10_LENGTH
-        flame = ct.FreeFlame(gas, width=width)
-        flame.set_refine_criteria(ratio=3, slope=0.06, curve=0.12)
-        flame.transport_model = 'Mix'
+    def set_fidelity(self, fidelity):
+        """Switch transport model and refine criteria ('fine' or 'coarse')"""
+        if fidelity != self.fidelity:
+            transport_model, refine_criteria = FIDELITY_SETTINGS[fidelity]
+            self.flame.transport_model = transport_model
+            self.flame.set_refine_criteria(**refine_criteria)
+            self.fidelity = fidelity
+
+    def reset_inlet(self):
+        """Restore the unburnt inlet state (solves leave the gas equilibrated)"""
+        self.gas.TPX = TIN, P, self.inlet_X
+
+    def prepare(self, width):
+        """Resize the flame template to a fresh grid on [0, width]"""
+        self.reset_inlet()
+        flame = self.flame
+        flame.flame.grid = INITIAL_GRID * width
         flame.inlet.T = TIN
-        flame.inlet.X = gas.X
+        flame.inlet.X = self.inlet_X
+        flame.inlet.mdot = 0.0  # let set_initial_guess pick the default mass flux
         flame.P = P
+        flame.set_initial_guess()
+        return flame
+
+    def prepare_warm(self, width, profile):
+        """
+        Resize the flame template and load a converged neighbour as the initial guess.
+        The solve then refines the neighbour's grid rather than the starting grid, so
+        its objectives differ from a cold solve's by about the discretisation error
+        (see benchmark.py --warm-start-check).
+        Args:
+            width: domain width for the new individual
+            profile: dict from ProfileArchive.nearest(); its grid is scaled to width
+        """
+        self.reset_inlet()
+        flame = self.flame
+        grid = profile['grid'] * (width / profile['width'])
+        flame.flame.grid = grid
+        flame.inlet.T = TIN
+        flame.inlet.X = self.inlet_X
+        flame.inlet.mdot = profile['mdot']
+        flame.P = P
+        flame.set_initial_guess()
+
+        positions = (grid - grid[0]) / (grid[-1] - grid[0])
+        flame.flame.set_profile('velocity', positions, profile['velocity'])
+        flame.flame.set_profile('T', positions, profile['T'])
+        for k, name in enumerate(profile['species']):
+            if name in self.gas.species_names:
+                flame.flame.set_profile(name, positions, profile['Y'][k])
+
+        # Anchor the flame at the same relative position as the neighbour
+        T = flame.T
+        Tmid = 0.75 * T[0] + 0.25 * T[-1]
+        flame.fixed_temperature = T[np.flatnonzero(T < Tmid)[-1]]
+        return flame
+
+
+# --- Warm-start archive of converged flames ---
+class ProfileArchive:
+    """
+    Directory of converged FreeFlame profiles shared by all workers.
+    Each solve is written to its own .npz file, so concurrent writers never
+    touch the same file; readers pick up new entries on every lookup.
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._keys = {}  # file name -> normalised (eps1, eps2, Lpre)
+
+    def _refresh(self):
+        for entry in os.listdir(self.path):
+            if entry.endswith('.npz') and entry not in self._keys:
+                try:
+                    with np.load(self.path / entry) as data:
+                        self._keys[entry] = normalise(data['individual'])
+                except (OSError, ValueError, KeyError):
+                    continue  # partially written by another worker
+
+    def add(self, individual, width, flame):
+        """Store a converged flame for the given individual and requested width"""
+        name = f"{os.getpid()}_{time.time_ns()}.npz"
+        tmp = self.path / (name + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.savez(f, individual=np.asarray(individual, dtype=float), width=width,
+                     grid=flame.grid, T=flame.T, Y=flame.Y, velocity=flame.velocity,
+                     mdot=flame.inlet.mdot, species=np.array(flame.gas.species_names))
+        os.replace(tmp, self.path / name)
+        self._keys[name] = normalise(individual)
+
+    def nearest(self, individual):
+        """Return the stored profile closest to individual, or None if the archive is empty"""
+        self._refresh()
+        if not self._keys:
+            return None
+        names = list(self._keys)
+        distances = np.linalg.norm(np.array([self._keys[n] for n in names])
+                                   - normalise(individual), axis=1)
+        with np.load(self.path / names[int(np.argmin(distances))]) as data:
+            profile = {key: data[key] for key in data.files}
+        profile['width'] = float(profile['width'])
+        profile['mdot'] = float(profile['mdot'])
+        profile['species'] = [str(name) for name in profile['species']]
+        return profile
+
+
+_context = None
+_reuse_context = True
+
+
+_archive = None
+_fidelity = 'fine'
+_fidelity_margin = 0.02
+_best_fitness = None
+_eval_log = None
+_generation = None
+_instrument = None      # WorkerInstrumentation, when the run is instrumented
+_last_timings = {}      # phase timings of the most recent simulate() call
+_profile_store = None   # ProfileStore of converged profiles, when --profile-store is set
+_run_id = None          # tags every evaluation-log record with the run that wrote it
+
+
+def init_worker(mechanism=MECHANISM, reuse=True, timing=False, warm_start_dir=None,
+                fidelity='fine', fidelity_margin=0.02, best_fitness=None,
+                eval_log=None, generation=None, instrument_dir=None, profile_fraction=0.0,
+                profile_store=None, run_id=None):
+    """
+    multiprocessing.Pool initializer: build the worker's EvaluationContext once.
+    Args:
+        mechanism: Cantera mechanism file
+        reuse: keep the context between evaluations (False rebuilds it per call)
+        timing: print setup and solve times for every evaluation
+        warm_start_dir: ProfileArchive directory used to warm-start solves (optional)
+        fidelity: 'fine' (always full refinement) or 'multi' (coarse pass first)
+        fidelity_margin: in 'multi' mode, re-solve at full fidelity when the coarse
+            fitness is within this fraction of the best fine fitness so far
+        best_fitness: multiprocessing.Value shared by the workers holding that best
+        eval_log: path of the JSON-lines EvaluationLog to append to (optional)
+        generation: multiprocessing.Value with the generation being evaluated
+        instrument_dir: directory for per-evaluation timing records (optional)
+        profile_fraction: share of evaluations run under cProfile when instrumented
+        profile_store: ProfileStore directory that keeps every converged profile (optional)
+        run_id: run identifier written to every evaluation-log record (see new_run_id)
+    """
+    global _context, _reuse_context, _archive, _fidelity, _fidelity_margin, _best_fitness
+    global _eval_log, _generation, _instrument, _profile_store, _run_id
+    _reuse_context = reuse
+    _context = EvaluationContext(mechanism, timing=timing)
+    _archive = ProfileArchive(warm_start_dir) if warm_start_dir else None
+    _fidelity = fidelity
+    _fidelity_margin = fidelity_margin
+    _best_fitness = best_fitness
+    _eval_log = EvaluationLog(eval_log) if eval_log else None
+    _generation = generation
+    _instrument = (WorkerInstrumentation(instrument_dir, profile_fraction)
+                   if instrument_dir else None)
+    _profile_store = ProfileStore(profile_store) if profile_store else None
+    _run_id = run_id
+    if timing:
+        print(f"[worker {os.getpid()}] context setup: {_context.setup_time:.3f}s")
+
+
+def get_context():
+    """Return this process's EvaluationContext, creating it on first use"""
+    global _context
+    if _context is None or not _reuse_context:
+        timing = _context.timing if _context is not None else False
+        mechanism = _context.mechanism if _context is not None else MECHANISM
+        _context = EvaluationContext(mechanism, timing=timing)
+    return _context
+
+
+def fitness_from_objectives(heat_release, NOx, flame_location, w_nox=None):
+    """Combine raw objectives into the scalar fitness maximised by the GA"""
+    if w_nox is None:
+        w_nox = w_NOx
+
+    # Penalty if flame base not within Lpre bounds
+    penalty = 1e6 * location_violation(flame_location)
+
+    # Fitness: maximize heat, penalize NOx and flame location
+    return heat_release - w_nox * NOx - penalty
+
+
+def location_violation(flame_location):
+    """Distance of the flame base outside [L_PRE_MIN, L_PRE_MAX] (0 when inside, inf if unknown)"""
+    if flame_location is None:
+        return np.inf
+    return float(abs(flame_location - np.clip(flame_location, L_PRE_MIN, L_PRE_MAX)))
+
+
+def flame_objectives(flame, gas):
+    """Return (heat release, peak NOx, flame base location) of a solved flame"""
+    # Extract heat release (integral over domain)
+    heat_release = np.trapezoid(flame.heat_release_rate, flame.grid)
+
+    # Extract NOx (sum of NO and NO2 at outlet)
+    no = flame.Y[gas.species_index('NO'), :]
+    no2 = flame.Y[gas.species_index('NO2'), :]
+    NOx = np.max(no + no2)  # or use outlet value: (no + no2)[-1]
+
+    # Find flame base (max dT/dx)
+    dTdx = np.gradient(flame.T, flame.grid)
+    flame_index = np.argmax(dTdx)
+    flame_location = flame.grid[flame_index]
+    return float(heat_release), float(NOx), float(flame_location)
+
+
+def simulate(individual, w_nox=None):
+    """
+    Solve the flame for one individual and return its raw objectives
+    Returns:
+        dict with 'heat', 'nox', 'flame_location', 'status' ('ok' or 'failed') and
+        'fidelity' ('fine' or 'coarse'); individuals re-solved after a coarse pass
+        also carry 'coarse_heat', 'coarse_nox' and 'coarse_flame_location'
+    """
+    global _last_timings
+    eps1, eps2, Lpre = individual
+    setup_start = time.perf_counter()
+    post_time = 0.0
+    _last_timings = {}
+    try:
+        # Set up gas object and flame (reused across calls in this worker)
+        ctx = get_context()
+        multi_fidelity = _fidelity == 'multi'
+        ctx.set_fidelity('coarse' if multi_fidelity else 'fine')
+
+        # Domain: preheat (YZA), SiC3, SiC10
+        width = Lpre + SIC3_LENGTH + SIC10_LENGTH
+        neighbour = _archive.nearest(individual) if _archive is not None else None
+        gas = ctx.gas
+        setup_time = time.perf_counter() - setup_start
 
         # Optionally, adjust transport/heat loss to mimic porosity (advanced)
         # For now, just note the porosity values in the individual
         # (You can extend this to modify transport/energy loss as needed)
 
-        # Solve flame
-        flame.solve(loglevel=0, auto=True, refine_grid=True)
+        # Solve flame, starting from the nearest converged neighbour when available
+        solve_start = time.perf_counter()
+        warm = False
+        if neighbour is not None:
+            try:
+                flame = ctx.prepare_warm(width, neighbour)
+                flame.clear_stats()
+                flame.solve(loglevel=0, auto=False, refine_grid=True)
+                warm = True
+            except ct.CanteraError:
+                pass  # fall back to the default initial guess
+        if not warm:
+            flame = ctx.prepare(width)
+            flame.clear_stats()
+            flame.solve(loglevel=0, auto=True, refine_grid=True)
+        post_start = time.perf_counter()
+        heat_release, NOx, flame_location = flame_objectives(flame, gas)
+        post_time += time.perf_counter() - post_start
+        result = {'fidelity': ctx.fidelity}
+
+        if multi_fidelity:
+            # Re-solve contenders at full fidelity, starting from the coarse profile
+            fitness = fitness_from_objectives(heat_release, NOx, flame_location, w_nox)
+            best = _best_fitness.value if _best_fitness is not None else -np.inf
+            if fitness >= best - _fidelity_margin * abs(best):
+                coarse = {'coarse_heat': heat_release, 'coarse_nox': NOx,
+                          'coarse_flame_location': flame_location}
+                try:
+                    ctx.set_fidelity('fine')
+                    flame.solve(loglevel=0, auto=False, refine_grid=True)
+                    post_start = time.perf_counter()
+                    heat_release, NOx, flame_location = flame_objectives(flame, gas)
+                    post_time += time.perf_counter() - post_start
+                    result = {'fidelity': 'fine', **coarse}
+                except ct.CanteraError:
+                    pass  # keep the coarse result
+        if result['fidelity'] == 'fine' and _best_fitness is not None:
+            fitness = fitness_from_objectives(heat_release, NOx, flame_location, w_nox)
+            with _best_fitness.get_lock():
+                _best_fitness.value = max(_best_fitness.value, fitness)
+        solve_time = time.perf_counter() - solve_start
+        _last_timings = {'setup_time': setup_time, 'solve_time': solve_time - post_time,
+                         'post_time': post_time, 'grid_points': len(flame.grid),
+                         'fidelity': result['fidelity'], 'warm_start': warm, 'status': 'ok'}
+        if _archive is not None:
+            _archive.add(individual, width, flame)
+        if _profile_store is not None:
+            result['eval_id'] = _profile_store.add(flame)
+
+        line = f"Porosities: {eps1:.4f}, {eps2:.4f} | Lpre: {Lpre:.4f} | Heat: {heat_release:.2f} | NOx: {NOx:.6f} | Flame: {flame_location:.4f}"
+        if multi_fidelity:
+            line += f" | Fidelity: {result['fidelity']}"
+            if 'coarse_heat' in result:
+                line += (f" | Coarse Heat: {result['coarse_heat']:.2f} | Coarse NOx: {result['coarse_nox']:.6f}"
+                         f" | Coarse Flame: {result['coarse_flame_location']:.4f}")
+        print(line)
+        if ctx.timing:
+            print(f"[worker {os.getpid()}] setup: {setup_time:.3f}s | solve: {solve_time:.3f}s"
+                  f" | {'warm' if warm else 'cold'} start | time steps: {sum(flame.time_step_stats)}"
+                  f" | Jacobians: {sum(flame.jacobian_count_stats)}")
+        result.update({'heat': heat_release, 'nox': NOx, 'flame_location': flame_location,
+                       'status': 'ok', 'solve_time': solve_time, 'grid_points': len(flame.grid),
+                       'warm_start': warm})
+        return result
+
+    except Exception as e:
+        # If Cantera fails, the caller assigns a very poor fitness
+        _last_timings = {'solve_time': time.perf_counter() - setup_start, 'status': 'failed'}
+        return {'heat': None, 'nox': None, 'flame_location': None, 'status': 'failed',
+                'solve_time': time.perf_counter() - setup_start, 'grid_points': None}
+
+
+def evaluate(individual, w_nox=None):
+    result = simulate(individual, w_nox)
+    if result['status'] != 'ok':
+        fitness = FAILED_FITNESS
+    else:
+        fitness = fitness_from_objectives(result['heat'], result['nox'], result['flame_location'], w_nox)
+    log_evaluation(individual, result, fitness)
+    return (fitness,)
+
+
+FAILED_OBJECTIVES = (0.0, 0.0, None)  # (heat, NOx, flame location) of a failed or timed-out solve
+
+
+def pareto_objectives(result):
+    """Raw (heat, NOx, flame location) of a simulate() result, as used by the NSGA-II mode"""
+    if result['status'] != 'ok':
+        return FAILED_OBJECTIVES
+    return result['heat'], result['nox'], result['flame_location']
 
-        # Extract heat release (integral over domain)
-        heat_release = np.trapezoid(flame.heat_release_rate, flame.grid)
 
-        # Extract NOx (sum of NO and NO2 at outlet)
-        no = flame.Y[gas.species_index('NO'), :]
-        no2 = flame.Y[gas.species_index('NO2'), :]
-        NOx = np.max(no + no2)  # or use outlet value: (no + no2)[-1]
+def evaluate_pareto(individual, w_nox=None):
+    """evaluate() for --pareto: returns the raw objectives; the log still gets the weighted fitness"""
+    result = simulate(individual, w_nox)
+    if result['status'] != 'ok':
+        fitness = FAILED_FITNESS
+    else:
+        fitness = fitness_from_objectives(result['heat'], result['nox'], result['flame_location'], w_nox)
+    log_evaluation(individual, result, fitness)
+    return pareto_objectives(result)
 
-        # Find flame base (max dT/dx)
-        dTdx = np.gradient(flame.T, flame.grid)
-        flame_index = np.argmax(dTdx)
-        flame_location = flame.grid[flame_index]
 
-        # Penalty if flame base not within Lpre bounds
-        penalty = 0.0
-        if not (L_PRE_MIN <= flame_location <= L_PRE_MAX):
-            penalty += 1e6 * abs(flame_location - np.clip(flame_location, L_PRE_MIN, L_PRE_MAX))
+# --- Streaming per-evaluation log ---
+class EvaluationLog:
+    """
+    Append-only JSON-lines file with one record per evaluation.
+    Every record is a single O_APPEND write made under an exclusive flock, so
+    any number of worker processes can append while readers tail the file.
+    """
+    def __init__(self, path):
+        self.path = str(path)
 
-        # Fitness: maximize heat, penalize NOx and flame location
-        fitness = heat_release - w_NOx * NOx - penalty
-        print(f"Porosities: {eps1:.4f}, {eps2:.4f} | Lpre: {Lpre:.4f} | Heat: {heat_release:.2f} | NOx: {NOx:.6f} | Flame: {flame_location:.4f}")
+    def write(self, record):
+        line = (json.dumps(record) + '\n').encode()
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            os.write(fd, line)
+        finally:
+            os.close(fd)  # also releases the lock
+
+
+def new_run_id():
+    """Identifier of a new run (start time and parent PID), kept across --resume"""
+    return f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+
+
+def evaluation_record(individual, result, fitness, generation=None):
+    """Flatten one evaluation into the record stored in the EvaluationLog"""
+    eps1, eps2, Lpre = map(float, individual)
+    record = {'time': time.time(), 'pid': os.getpid(), 'run_id': _run_id, 'generation': generation,
+              'eps1': eps1, 'eps2': eps2, 'Lpre': Lpre, 'fitness': float(fitness)}
+    for key in ('heat', 'nox', 'flame_location', 'status', 'fidelity', 'solve_time',
+                'grid_points', 'warm_start', 'source', 'eval_id', 'coarse_heat', 'coarse_nox',
+                'coarse_flame_location'):
+        if key in result:
+            record[key] = result[key]
+    return record
+
+
+def log_evaluation(individual, result, fitness):
+    """Append an evaluation to this worker's EvaluationLog, if one is configured"""
+    if _eval_log is not None:
+        generation = _generation.value if _generation is not None else None
+        _eval_log.write(evaluation_record(individual, result, fitness, generation))
+
+
+# --- Instrumentation (opt-in, --instrument) ---
+INSTRUMENT_RECORDS = 'timings.jsonl'  # per-evaluation timings, distinct from the evaluation log
+def timing_summary(values):
+    """Total, mean, median, 95th percentile and max of a list of durations"""
+    values = np.asarray([v for v in values if v is not None], dtype=float)
+    if not len(values):
+        return {'count': 0}
+    return {'count': int(len(values)), 'total': float(values.sum()), 'mean': float(values.mean()),
+            'p50': float(np.percentile(values, 50)), 'p95': float(np.percentile(values, 95)),
+            'max': float(values.max())}
+
+
+class WorkerInstrumentation:
+    """
+    Worker side of --instrument: times each evaluation, appends a record to
+    <directory>/timings.jsonl and runs a sampled fraction under cProfile.
+    """
+    def __init__(self, directory, profile_fraction=0.0):
+        self.directory = Path(directory)
+        self.log = EvaluationLog(self.directory / INSTRUMENT_RECORDS)
+        self.profile_fraction = profile_fraction
+        self.rng = random.Random(os.getpid())  # independent of the GA's random state
+        self.count = 0
+
+    def call(self, func, individual, dispatched):
+        """Evaluate individual with func and record where the time went"""
+        global _last_timings
+        _last_timings = {}
+        self.count += 1
+        start = time.time()
+        profile_path = None
+        if self.profile_fraction > 0 and self.rng.random() < self.profile_fraction:
+            profile_path = self.directory / 'profiles' / f"eval-{os.getpid()}-{self.count}.prof"
+            profile = cProfile.Profile()
+            try:
+                fitness = profile.runcall(func, individual)
+            finally:
+                profile.dump_stats(profile_path)
+        else:
+            fitness = func(individual)
+        end = time.time()
+
+        record = {'pid': os.getpid(),
+                  'generation': _generation.value if _generation is not None else None,
+                  'individual': [float(x) for x in individual],
+                  'dispatched': dispatched, 'start': start, 'end': end,
+                  'queue_wait': start - dispatched if dispatched is not None else None,
+                  'evaluate_time': end - start}
+        # No simulate() timings means the evaluation was answered by the cache
+        record.update(_last_timings or {'status': 'ok', 'source': 'cache'})
+        if profile_path is not None:
+            record['profile'] = profile_path.name
+        self.log.write(record)
+        return fitness
+
+
+class RunInstrumentation:
+    """
+    Parent side of --instrument: per-generation time spent on variation
+    (select/clone/mate/mutate), dispatch and the wait for stragglers, combined
+    with the workers' per-evaluation records into <directory>/summary.json.
+    """
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        (self.directory / 'profiles').mkdir(parents=True, exist_ok=True)
+        self.records_path = self.directory / INSTRUMENT_RECORDS
+        self.records_path.unlink(missing_ok=True)  # records belong to a single run
+        self.generations = []
+        self._current = {'variation': 0.0, 'dispatch': 0.0}
+        self.started = time.time()
+
+    def timed(self, func):
+        """Toolbox decorator adding the time spent in func to the current generation's variation"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._current['variation'] += time.perf_counter() - start
+        return wrapper
+
+    def begin_map(self, generation):
+        self._current.update(generation=generation, map_start=time.time())
+
+    def end_map(self):
+        self._current['map_end'] = time.time()
+        self.close_generation()
+
+    def add_dispatch(self, seconds):
+        self._current['dispatch'] += seconds
+
+    def close_generation(self, generation=None):
+        if generation is not None:
+            self._current['generation'] = generation
+        self.generations.append(self._current)
+        self._current = {'variation': 0.0, 'dispatch': 0.0}
+
+    def summary(self, n_workers, **extra):
+        records = []
+        if self.records_path.exists():
+            with open(self.records_path) as f:
+                records = [json.loads(line) for line in f if line.strip()]
+        wall = time.time() - self.started
+        per_worker = {}
+        for r in records:
+            worker = per_worker.setdefault(str(r['pid']), {'evaluations': 0, 'busy': 0.0})
+            worker['evaluations'] += 1
+            worker['busy'] += r['evaluate_time']
+
+        generations = []
+        for g in self.generations:
+            entry = {'generation': g.get('generation'), 'variation': g['variation'],
+                     'dispatch': g['dispatch']}
+            batch = [r for r in records if r.get('generation') == g.get('generation')]
+            if 'map_start' in g and batch:
+                # Barrier generations: latency until the first task started, and the time
+                # the barrier was held after the first worker ran out of work
+                last_end = {}
+                for r in batch:
+                    last_end[r['pid']] = max(last_end.get(r['pid'], 0.0), r['end'])
+                finish = max(last_end.values())
+                idle_workers = max(n_workers - len(last_end), 0)
+                entry.update({
+                    'evaluations': len(batch),
+                    'dispatch': g['dispatch'] + min(r['start'] for r in batch) - g['map_start'],
+                    'map_time': g['map_end'] - g['map_start'],
+                    'straggler_wait': finish - min(last_end.values()),
+                    'straggler_idle_worker_seconds':
+                        sum(finish - end for end in last_end.values())
+                        + idle_workers * (finish - g['map_start']),
+                })
+            generations.append(entry)
+
+        phases = ('queue_wait', 'setup_time', 'solve_time', 'post_time', 'evaluate_time')
+        return {
+            'wall_time': wall,
+            'workers': n_workers,
+            'evaluations': len(records),
+            'status': {s: sum(r.get('status') == s for r in records) for s in ('ok', 'failed')},
+            'cache_hits': sum(r.get('source') == 'cache' for r in records),
+            'warm_starts': sum(bool(r.get('warm_start')) for r in records),
+            'phases': {p: timing_summary([r.get(p) for r in records]) for p in phases},
+            'grid_points': timing_summary([r.get('grid_points') for r in records]),
+            'utilisation': sum(w['busy'] for w in per_worker.values()) / (n_workers * wall),
+            'per_worker': per_worker,
+            'generations': generations,
+            'totals': {key: sum(g.get(key, 0.0) for g in generations)
+                       for key in ('variation', 'dispatch', 'straggler_wait')},
+            'profiles': sorted(r['profile'] for r in records if 'profile' in r),
+            **extra,
+        }
+
+    def write_summary(self, n_workers, **extra):
+        summary = self.summary(n_workers, **extra)
+        with open(self.directory / 'summary.json', 'w') as f:
+            json.dump(summary, f, indent=4)
+        return summary
+
+
+# --- Persistent evaluation cache ---
+def mechanism_path(mechanism=MECHANISM):
+    """Resolve a mechanism name the same way Cantera does (cwd, then data directories)"""
+    if os.path.exists(mechanism):
+        return mechanism
+    for directory in ct.get_data_directories():
+        candidate = os.path.join(directory, mechanism)
+        if os.path.exists(candidate):
+            return candidate
+    raise FileNotFoundError(f"Mechanism not found: {mechanism}")
+
+
+def config_hash(mechanism=MECHANISM):
+    """Hash of the mechanism file and every setting besides the individual that affects a solve"""
+    digest = hashlib.sha256()
+    with open(mechanism_path(mechanism), 'rb') as f:
+        digest.update(f.read())
+    settings = (FUEL, OXIDIZER, PHI, TIN, P, TRANSPORT_MODEL, sorted(REFINE_CRITERIA.items()),
+                SIC3_LENGTH, SIC10_LENGTH)
+    digest.update(repr(settings).encode())
+    return digest.hexdigest()[:16]
+
+
+class EvaluationCache:
+    """
+    SQLite store of raw objectives (heat, NOx, flame location) that wraps evaluate.
+    Individuals are quantised to `tolerance` times each parameter range, and the
+    weighted fitness is rebuilt on every lookup, so a new w_NOx needs no new solves.
+    With pareto=True it returns the raw objectives instead, like evaluate_pareto.
+    """
+    def __init__(self, path, tolerance=1e-3, mechanism=MECHANISM, w_nox=None, pareto=False):
+        self.path = str(path)
+        self.tolerance = tolerance
+        # Keys are only comparable at the same resolution, so it is part of the config
+        self.config = f"{config_hash(mechanism)}:{tolerance!r}"
+        self.w_nox = w_nox
+        self.pareto = pareto
+        self._conn = None
+
+    def __getstate__(self):
+        # Connections cannot be pickled; each worker opens its own
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        return state
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=60)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS evaluations (
+                config TEXT, key TEXT, eps1 REAL, eps2 REAL, Lpre REAL,
+                heat REAL, nox REAL, flame_location REAL,
+                PRIMARY KEY (config, key))""")
+            self._conn.commit()
+        return self._conn
+
+    def key(self, individual):
+        return ':'.join(str(int(round(x / self.tolerance))) for x in normalise(individual))
+
+    def get(self, individual):
+        """Return cached raw objectives for individual, or None"""
+        row = self._connect().execute(
+            "SELECT heat, nox, flame_location FROM evaluations WHERE config = ? AND key = ?",
+            (self.config, self.key(individual))).fetchone()
+        if row is None:
+            return None
+        return {'heat': row[0], 'nox': row[1], 'flame_location': row[2], 'status': 'ok'}
+
+    def put(self, individual, result):
+        conn = self._connect()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         (self.config, self.key(individual), *map(float, individual),
+                          result['heat'], result['nox'], result['flame_location']))
+
+    def count(self):
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM evaluations WHERE config = ?", (self.config,)).fetchone()[0]
+
+    def __call__(self, individual):
+        result = self.get(individual)
+        if result is None:
+            result = simulate(individual, self.w_nox)
+            # Coarse-only results from the multi-fidelity mode are not cached
+            if result['status'] == 'ok' and result.get('fidelity', 'fine') == 'fine':
+                self.put(individual, result)
+        else:
+            result['source'] = 'cache'
+        if result['status'] != 'ok':
+            fitness = FAILED_FITNESS
+        else:
+            fitness = fitness_from_objectives(result['heat'], result['nox'],
+                                              result['flame_location'], self.w_nox)
+        log_evaluation(individual, result, fitness)
+        if self.pareto:
+            return pareto_objectives(result)
         return (fitness,)
 
-    except Exception as e:
-        # If Cantera fails, return a very poor fitness
-        return (-1e12,)
+
+# --- Surrogate-assisted pre-screening ---
+class Surrogate:
+    """
+    Gaussian-process regressor of fitness over the normalised parameter box (NumPy only).
+    The length scale is chosen by leave-one-out error every time the model is refit.
+    """
+    LENGTH_SCALES = (0.05, 0.1, 0.2, 0.4, 0.8)
+
+    def __init__(self, noise=1e-6):
+        self.noise = noise
+        self.X = np.empty((0, 3))
+        self.y = np.empty(0)
+        self.fitted = False
+
+    def add(self, individuals, fitnesses):
+        """Append training points; failed evaluations are ignored"""
+        X = normalise(individuals).reshape(-1, 3)
+        y = np.asarray(fitnesses, dtype=float)
+        keep = np.isfinite(y) & (y > FAILED_FITNESS)
+        self.X = np.vstack([self.X, X[keep]])
+        self.y = np.concatenate([self.y, y[keep]])
+
+    @staticmethod
+    def _kernel(A, B, length):
+        d2 = ((A[:, None, :] - B[None, :, :]) ** 2).sum(axis=-1)
+        return np.exp(-0.5 * d2 / length ** 2)
+
+    def fit(self):
+        """Refit on every point added so far"""
+        if len(self.y) < 2:
+            self.fitted = False
+            return
+        self._offset = self.y.mean()
+        self._scale = self.y.std() or 1.0
+        z = (self.y - self._offset) / self._scale
+        identity = np.eye(len(z))
+        best = None
+        for length in self.LENGTH_SCALES:
+            K = self._kernel(self.X, self.X, length) + self.noise * identity
+            try:
+                L = np.linalg.cholesky(K)
+            except np.linalg.LinAlgError:
+                continue
+            L_inv = np.linalg.solve(L, identity)
+            K_inv = L_inv.T @ L_inv
+            alpha = K_inv @ z
+            loo_error = np.mean((alpha / np.diag(K_inv)) ** 2)
+            if best is None or loo_error < best[0]:
+                best = (loo_error, length, L, alpha)
+        if best is None:
+            self.fitted = False
+            return
+        _, self.length, self._L, self._alpha = best
+        self.fitted = True
+
+    def predict(self, individuals):
+        """Return predicted fitness mean and standard deviation for each individual"""
+        Xs = normalise(individuals).reshape(-1, 3)
+        k = self._kernel(Xs, self.X, self.length)
+        mean = self._offset + self._scale * (k @ self._alpha)
+        v = np.linalg.solve(self._L, k.T)
+        var = np.clip(1.0 - (v ** 2).sum(axis=0), 0.0, None)
+        return mean, self._scale * np.sqrt(var)
+
+
+def screen_offspring(surrogate, candidates, fraction, explore):
+    """
+    Split candidates into (to evaluate, screened out) using the surrogate.
+    Args:
+        fraction: share of candidates sent to the real solver
+        explore: share of those picked by predicted uncertainty rather than predicted fitness
+    """
+    n_eval = min(len(candidates), int(np.ceil(fraction * len(candidates))))
+    if not surrogate.fitted or n_eval == len(candidates):
+        return list(candidates), []
+    mean, std = surrogate.predict(candidates)
+    chosen = list(np.argsort(-std)[:int(round(explore * n_eval))])
+    for i in np.argsort(-mean):
+        if len(chosen) >= n_eval:
+            break
+        if i not in chosen:
+            chosen.append(i)
+    chosen = set(int(i) for i in chosen)
+    return ([ind for i, ind in enumerate(candidates) if i in chosen],
+            [ind for i, ind in enumerate(candidates) if i not in chosen])
+
+
+def load_previous_evaluations(path, w_nox=None):
+    """Read (individuals, fitnesses) from a results.yaml archive of earlier evaluations"""
+    import yaml
+    with open(path, 'r') as f:
+        data = yaml.safe_load(f) or {}
+    individuals, fitnesses = [], []
+    for result in data.get('results', []):
+        try:
+            individual = list(result['porosities']) + [result['Lpre']]
+            fitness = fitness_from_objectives(result['Heat'], result['NOx'], result['Flame'], w_nox)
+        except (KeyError, TypeError):
+            continue
+        individuals.append(individual)
+        fitnesses.append(fitness)
+    return individuals, fitnesses
+
+# --- Sensitivity screening ---
+PARAM_NAMES = ('eps1', 'eps2', 'Lpre')
+OBJECTIVE_NAMES = ('heat', 'nox', 'flame_location')
+
+
+def morris_design(n_trajectories=6, levels=4, seed=None):
+    """
+    Morris one-at-a-time trajectories on the unit cube.
+    Returns an array of shape (n_trajectories, 4, 3): each trajectory moves
+    one parameter at a time by delta = levels / (2 * (levels - 1)).
+    """
+    rng = np.random.default_rng(seed)
+    k = len(PARAM_NAMES)
+    delta = levels / (2 * (levels - 1))
+    starts = np.arange(levels) / (levels - 1)
+    starts = starts[starts <= 1 - delta + 1e-12]
+    B = np.tril(np.ones((k + 1, k)), -1)
+    J = np.ones((k + 1, k))
+    trajectories = []
+    for _ in range(n_trajectories):
+        x0 = rng.choice(starts, size=k)
+        D = np.diag(rng.choice([-1.0, 1.0], size=k))
+        perm = np.eye(k)[rng.permutation(k)]
+        trajectories.append((x0 + (delta / 2) * ((2 * B - J) @ D + J)) @ perm)
+    return np.array(trajectories)
+
+
+def morris_indices(design, outputs):
+    """
+    Elementary-effect statistics per parameter and objective.
+    Args:
+        design: (r, k + 1, k) unit-cube trajectories from morris_design
+        outputs: (r, k + 1, n_objectives) objective values, NaN for failed solves
+    Returns:
+        {objective: {parameter: {'mu_star', 'mu', 'sigma', 'n'}}}
+    """
+    effects = {(o, p): [] for o in range(outputs.shape[2]) for p in range(design.shape[2])}
+    for x, y in zip(design, outputs):
+        for step in range(len(x) - 1):
+            dx = x[step + 1] - x[step]
+            p = int(np.argmax(np.abs(dx)))
+            for o in range(outputs.shape[2]):
+                effect = (y[step + 1, o] - y[step, o]) / dx[p]
+                if np.isfinite(effect):
+                    effects[o, p].append(effect)
+    indices = {}
+    for o, objective in enumerate(OBJECTIVE_NAMES[:outputs.shape[2]]):
+        indices[objective] = {}
+        for p, parameter in enumerate(PARAM_NAMES):
+            ee = np.array(effects[o, p])
+            indices[objective][parameter] = {
+                'mu_star': float(np.mean(np.abs(ee))) if len(ee) else float('nan'),
+                'mu': float(np.mean(ee)) if len(ee) else float('nan'),
+                'sigma': float(np.std(ee)) if len(ee) else float('nan'),
+                'n': int(len(ee)),
+            }
+    return indices
+
+
+def screened_objectives(indices):
+    """Objectives with at least one finite mu* (all solves failing leaves none for an objective)"""
+    return [objective for objective, per_param in indices.items()
+            if any(np.isfinite(v['mu_star']) for v in per_param.values())]
+
+
+def insensitive_parameters(indices, threshold=0.05):
+    """
+    Parameters whose mu* is below threshold * the largest mu* for every screened
+    objective. A parameter without a finite mu* for some objective is kept, and
+    with no screened objective at all nothing is reported insensitive.
+    """
+    objectives = screened_objectives(indices)
+    if not objectives:
+        return []
+    insensitive = []
+    for parameter in PARAM_NAMES:
+        relative = []
+        for objective in objectives:
+            per_param = indices[objective]
+            largest = max(v['mu_star'] for v in per_param.values() if np.isfinite(v['mu_star']))
+            value = per_param[parameter]['mu_star']
+            if not np.isfinite(value):
+                relative.append(np.inf)  # no effect could be measured: do not freeze it
+            else:
+                relative.append(value / largest if largest > 0 else 0.0)
+        if max(relative) < threshold:
+            insensitive.append(parameter)
+    return insensitive
+
+
+def run_screening(map_func, n_trajectories=6, levels=4, seed=None, w_nox=None):
+    """
+    Evaluate a Morris design with map_func (e.g. the pool's map) and compute the indices.
+    Returns:
+        dict with the design points, raw objectives and per-parameter indices
+    """
+    design = morris_design(n_trajectories, levels, seed)
+    points = PARAM_LOWS + design.reshape(-1, len(PARAM_NAMES)) * PARAM_SPANS
+    results = map_func(functools.partial(simulate, w_nox=w_nox), [list(p) for p in points])
+    outputs = np.full((len(points), len(OBJECTIVE_NAMES)), np.nan)
+    for i, result in enumerate(results):
+        # Failed or timed-out solves stay NaN and drop out of the statistics
+        if isinstance(result, dict) and result.get('status') == 'ok':
+            outputs[i] = [result[name] for name in OBJECTIVE_NAMES]
+    indices = morris_indices(design, outputs.reshape(design.shape[0], design.shape[1], -1))
+    return {'points': points.tolist(), 'objectives': outputs.tolist(), 'indices': indices}
+
+
+def freeze_genes(frozen):
+    """
+    Toolbox decorator for mate/mutate that resets frozen genes after variation.
+    Args:
+        frozen: {gene index: fixed value}
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            offspring = func(*args, **kwargs)
+            for ind in offspring:
+                for i, value in frozen.items():
+                    ind[i] = value
+            return offspring
+        return wrapper
+    return decorator
 
 # --- DEAP GA setup ---
 creator.create("FitnessMax", base.Fitness, weights=(1.0,))
 creator.create("Individual", list, fitness=creator.FitnessMax)
 
+
+class ConstrainedFitness(base.Fitness):
+    """
+    Maximise heat release, minimise NOx, subject to the flame base staying in
+    [L_PRE_MIN, L_PRE_MAX]. Domination follows Deb's constraint handling: a
+    feasible individual dominates an infeasible one, of two infeasible ones the
+    smaller violation wins, and only feasible individuals compare on the objectives.
+    """
+    weights = (1.0, -1.0)
+
+    def __init__(self, values=()):
+        super().__init__(values)
+        self.violation = 0.0
+        self.flame_location = None
+
+    def set_objectives(self, objectives):
+        """Assign the (heat, NOx, flame location) returned by evaluate_pareto"""
+        heat, nox, flame_location = objectives
+        self.values = (heat, nox)
+        self.flame_location = flame_location
+        self.violation = location_violation(flame_location)
+
+    @property
+    def feasible(self):
+        return self.violation == 0.0
+
+    def dominates(self, other, obj=slice(None)):
+        if self.violation != other.violation:
+            return self.violation < other.violation
+        if not self.feasible:
+            return False
+        return super().dominates(other, obj)
+
+    def __deepcopy__(self, memo):
+        copy_ = self.__class__()
+        copy_.__dict__.update(self.__dict__)
+        return copy_
+
+    def __hash__(self):
+        return hash((self.wvalues, self.violation))
+
+    def __eq__(self, other):
+        return self.wvalues == other.wvalues and self.violation == other.violation
+
+
+creator.create("ParetoIndividual", list, fitness=ConstrainedFitness)
+
 toolbox = base.Toolbox()
 def enforce_bounds(ind):
     ind[0] = min(max(ind[0], POROSITY_MIN), POROSITY_MAX)
@@ -103,37 +1035,945 @@ toolbox.register("evaluate", evaluate)
 toolbox.decorate("mate", tools.DeltaPenality(lambda ind: True, -1e12, enforce_bounds))
 toolbox.decorate("mutate", tools.DeltaPenality(lambda ind: True, -1e12, enforce_bounds))
 
-def main():
-    pop_size = 20
-    ngen = 10
+# --- Generation checkpoints ---
+CHECKPOINT_VERSION = 1
+# Options that change the course of a run; a resumed run must use the same values
+TRAJECTORY_ARGS = ('pop_size', 'w_nox', 'cache', 'cache_tolerance', 'warm_start_dir',
+                   'multi_fidelity', 'fidelity_margin', 'pareto', 'islands', 'migration_interval',
+                   'migrants', 'migration_topology', 'screen', 'freeze_insensitive',
+                   'freeze_threshold')
+
+
+def operator_config(toolbox, names=('select', 'mate', 'mutate')):
+    """Registered GA operators with their arguments, as stored in a checkpoint"""
+    config = {}
+    for name in names:
+        registered = getattr(toolbox, name)
+        func = inspect.unwrap(registered.func)
+        config[name] = {'function': f"{func.__module__}.{func.__qualname__}",
+                        'args': [repr(a) for a in registered.args],
+                        'kwargs': {k: repr(v) for k, v in sorted(registered.keywords.items())}}
+    return config
+
+
+class Checkpoint:
+    """
+    Pickle of the whole GA state after a generation: population(s), hall of
+    fame, logbook(s), the random and NumPy generator states and the run
+    configuration. It is written to a temporary file and renamed, so a run
+    killed mid-write keeps the previous checkpoint.
+    """
+    def __init__(self, path, config, every=1, best_fitness=None, frozen=None, run_id=None):
+        """
+        Args:
+            path: checkpoint file (rewritten in place)
+            config: run configuration; resuming with a different one is refused
+            every: generations between checkpoints (the last generation is always saved)
+            best_fitness: shared multi-fidelity best fitness, saved with the state
+            frozen: genes fixed by --freeze-insensitive, so a resume skips the screen
+            run_id: evaluation-log run id, kept by a resumed run
+        """
+        self.path = str(path)
+        self.config = config
+        self.every = max(1, every)
+        self.best_fitness = best_fitness
+        self.frozen = frozen
+        self.run_id = run_id
+
+    def save(self, generation, ngen, **state):
+        if generation % self.every and generation != ngen:
+            return
+        state.update(version=CHECKPOINT_VERSION, generation=generation, config=self.config,
+                     frozen=self.frozen, run_id=self.run_id, random_state=random.getstate(),
+                     numpy_state=np.random.get_state(),
+                     best_fitness=self.best_fitness.value if self.best_fitness is not None else None)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(state, f, pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+
+def load_checkpoint(path, config):
+    """
+    Read a checkpoint written with the same configuration and restore the
+    random and NumPy generator states it was saved with.
+    Returns:
+        the saved state dict ('generation', 'population' or 'islands', 'halloffame', 'logbook', ...)
+    """
+    with open(path, 'rb') as f:
+        state = pickle.load(f)
+    if state.get('version') != CHECKPOINT_VERSION:
+        raise SystemExit(f"{path}: unsupported checkpoint version {state.get('version')}")
+    saved = state['config']
+    differences = [f"{key}: {saved.get(key)!r} -> {value!r}" for key, value in config.items()
+                   if saved.get(key) != value]
+    if differences:
+        raise SystemExit(f"{path} was written by a run with different settings:\n  "
+                         + "\n  ".join(differences))
+    random.setstate(state['random_state'])
+    np.random.set_state(state['numpy_state'])
+    return state
+
+
+def ea_simple(population, toolbox, cxpb, mutpb, ngen, stats=None, halloffame=None,
+              verbose=__debug__, checkpoint=None, resume=None):
+    """
+    algorithms.eaSimple with a Checkpoint saved after every generation.
+    With resume (a state from load_checkpoint, whose population and hall of
+    fame are passed in) it continues after the saved generation, giving the
+    same result as an uninterrupted run.
+    """
+    if resume is None:
+        logbook = tools.Logbook()
+        logbook.header = ['gen', 'nevals'] + (stats.fields if stats else [])
+
+        invalid_ind = [ind for ind in population if not ind.fitness.valid]
+        fitnesses = toolbox.map(toolbox.evaluate, invalid_ind)
+        for ind, fit in zip(invalid_ind, fitnesses):
+            ind.fitness.values = fit
+
+        if halloffame is not None:
+            halloffame.update(population)
+        record = stats.compile(population) if stats else {}
+        logbook.record(gen=0, nevals=len(invalid_ind), **record)
+        if verbose:
+            print(logbook.stream)
+        if checkpoint is not None:
+            checkpoint.save(0, ngen, population=population, halloffame=halloffame, logbook=logbook)
+        start = 1
+    else:
+        logbook = resume['logbook']
+        start = resume['generation'] + 1
+
+    for gen in range(start, ngen + 1):
+        offspring = toolbox.select(population, len(population))
+        offspring = algorithms.varAnd(offspring, toolbox, cxpb, mutpb)
+
+        invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
+        fitnesses = toolbox.map(toolbox.evaluate, invalid_ind)
+        for ind, fit in zip(invalid_ind, fitnesses):
+            ind.fitness.values = fit
+
+        if halloffame is not None:
+            halloffame.update(offspring)
+        population[:] = offspring
+
+        record = stats.compile(population) if stats else {}
+        logbook.record(gen=gen, nevals=len(invalid_ind), **record)
+        if verbose:
+            print(logbook.stream)
+        if checkpoint is not None:
+            checkpoint.save(gen, ngen, population=population, halloffame=halloffame, logbook=logbook)
+
+    return population, logbook
+
+
+def ea_surrogate(population, toolbox, cxpb, mutpb, ngen, surrogate, fraction=0.5, explore=0.25,
+                 stats=None, halloffame=None, verbose=__debug__):
+    """
+    algorithms.eaSimple with surrogate pre-screening of the offspring.
+    Only the screened-in offspring are solved; the rest are replaced by
+    individuals drawn with toolbox.select from the current (fully solved) population.
+    """
+    logbook = tools.Logbook()
+    logbook.header = ['gen', 'nevals', 'screened'] + (stats.fields if stats else [])
+
+    invalid_ind = [ind for ind in population if not ind.fitness.valid]
+    fitnesses = toolbox.map(toolbox.evaluate, invalid_ind)
+    for ind, fit in zip(invalid_ind, fitnesses):
+        ind.fitness.values = fit
+    surrogate.add(invalid_ind, [ind.fitness.values[0] for ind in invalid_ind])
+    surrogate.fit()
+
+    if halloffame is not None:
+        halloffame.update(population)
+    record = stats.compile(population) if stats else {}
+    logbook.record(gen=0, nevals=len(invalid_ind), screened=0, **record)
+    if verbose:
+        print(logbook.stream)
+
+    for gen in range(1, ngen + 1):
+        offspring = toolbox.select(population, len(population))
+        offspring = algorithms.varAnd(offspring, toolbox, cxpb, mutpb)
+
+        invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
+        chosen, rejected = screen_offspring(surrogate, invalid_ind, fraction, explore)
+        fitnesses = toolbox.map(toolbox.evaluate, chosen)
+        for ind, fit in zip(chosen, fitnesses):
+            ind.fitness.values = fit
+        surrogate.add(chosen, [ind.fitness.values[0] for ind in chosen])
+        surrogate.fit()
+
+        if rejected:
+            offspring = [ind for ind in offspring if ind.fitness.valid]
+            offspring += [toolbox.clone(ind) for ind in toolbox.select(population, len(rejected))]
+
+        if halloffame is not None:
+            halloffame.update(offspring)
+        population[:] = offspring
+
+        record = stats.compile(population) if stats else {}
+        logbook.record(gen=gen, nevals=len(chosen), screened=len(rejected), **record)
+        if verbose:
+            print(logbook.stream)
+
+    return population, logbook
+
+
+def quality_trace(logbook):
+    """
+    Hall-of-fame quality against cost: one entry each time the best fitness so
+    far improves, with the generation and the cumulative flame solves at which
+    it was first reached (scalar-fitness logbooks with 'max' and 'nevals').
+    """
+    trace, best, evaluations = [], -np.inf, 0
+    for entry in logbook:
+        evaluations += entry['nevals']
+        if entry['max'] > best:
+            best = float(entry['max'])
+            trace.append({'generation': entry['gen'], 'evaluations': int(evaluations), 'best': best})
+    return trace
+
+
+def first_reached(trace, target):
+    """First trace entry whose best fitness is at least target, or None"""
+    return next((entry for entry in trace if entry['best'] >= target), None)
+
+
+def compare_quality(trace, baseline):
+    """
+    Solves each run needed to first reach the lower of the two final
+    hall-of-fame values, i.e. the cost of the same quality.
+    Returns:
+        (target fitness, entry of trace, entry of baseline)
+    """
+    target = min(trace[-1]['best'], baseline[-1]['best'])
+    return target, first_reached(trace, target), first_reached(baseline, target)
+
+# --- Island-model driver ---
+def migration_array(n_islands, topology='ring'):
+    """migRing destination of each island: fixed ring, or a ring in a fresh random order"""
+    if topology == 'ring':
+        return list(range(1, n_islands)) + [0]
+    order = random.sample(range(n_islands), n_islands)
+    migarray = [0] * n_islands
+    for source, target in zip(order, order[1:] + order[:1]):
+        migarray[source] = target
+    return migarray
+
+
+def ea_islands(islands, toolbox, cxpb, mutpb, ngen, migration_interval=5, migrants=2,
+               topology='ring', stats=None, halloffame=None, verbose=__debug__,
+               checkpoint=None, resume=None):
+    """
+    Island-model eaSimple: every island evolves on its own, and every
+    migration_interval generations the best `migrants` of each island replace
+    the worst of the next one (tools.migRing; topology 'ring' or 'random').
+    The new individuals of all islands go through a single toolbox.map call per
+    generation, so the pool stays balanced however many islands there are.
+    checkpoint and resume work as in ea_simple.
+    Returns:
+        islands, a merged logbook (statistics over all islands) and one logbook per island
+    """
+    fields = stats.fields if stats else []
+    if resume is None:
+        logbook = tools.Logbook()
+        logbook.header = ['gen', 'nevals', 'migrated'] + fields
+        island_logs = [tools.Logbook() for _ in islands]
+        for log in island_logs:
+            log.header = ['gen', 'nevals'] + fields
+    else:
+        logbook, island_logs = resume['logbook'], resume['island_logs']
+
+    def evaluate_all(groups):
+        invalid = [[ind for ind in group if not ind.fitness.valid] for group in groups]
+        flat = [ind for group in invalid for ind in group]
+        for ind, fit in zip(flat, toolbox.map(toolbox.evaluate, flat)):
+            ind.fitness.values = fit
+        if halloffame is not None:
+            for group in groups:
+                halloffame.update(group)
+        return [len(group) for group in invalid]
+
+    def record(gen, counts, migrated):
+        for island, log, n in zip(islands, island_logs, counts):
+            log.record(gen=gen, nevals=n, **(stats.compile(island) if stats else {}))
+        merged = [ind for island in islands for ind in island]
+        logbook.record(gen=gen, nevals=sum(counts), migrated=migrated,
+                       **(stats.compile(merged) if stats else {}))
+        if verbose:
+            print(logbook.stream)
+        if checkpoint is not None:
+            checkpoint.save(gen, ngen, islands=islands, halloffame=halloffame, logbook=logbook,
+                            island_logs=island_logs)
+
+    def emigrants(population, k):
+        return [toolbox.clone(ind) for ind in tools.selBest(population, k)]
+
+    if resume is None:
+        record(0, evaluate_all(islands), 0)
+    start = resume['generation'] + 1 if resume is not None else 1
+
+    for gen in range(start, ngen + 1):
+        offspring = [algorithms.varAnd(toolbox.select(island, len(island)), toolbox, cxpb, mutpb)
+                     for island in islands]
+        counts = evaluate_all(offspring)
+        for island, children in zip(islands, offspring):
+            island[:] = children
+
+        migrated = 0
+        if len(islands) > 1 and migration_interval and gen % migration_interval == 0:
+            tools.migRing(islands, migrants, emigrants, replacement=tools.selWorst,
+                          migarray=migration_array(len(islands), topology))
+            migrated = migrants * len(islands)
+        record(gen, counts, migrated)
+
+    return islands, logbook, island_logs
+
+
+# --- NSGA-II driver (Pareto front of heat vs NOx) ---
+def ea_nsga2(population, toolbox, cxpb, mutpb, ngen, stats=None, halloffame=None,
+             verbose=__debug__, checkpoint=None, resume=None):
+    """
+    NSGA-II (mu + lambda with tools.selNSGA2): parents are picked by dominance
+    and crowding distance (selTournamentDCD), and the next population is the
+    best len(population) of parents and offspring. toolbox.evaluate must return
+    (heat, NOx, flame location); fitnesses are ConstrainedFitness.
+    len(population) must be a multiple of 4. checkpoint and resume work as in ea_simple.
+    """
+    if resume is None:
+        logbook = tools.Logbook()
+        logbook.header = ['gen', 'nevals', 'feasible'] + (stats.fields if stats else [])
+    else:
+        logbook = resume['logbook']
+
+    def evaluate_invalid(individuals):
+        invalid = [ind for ind in individuals if not ind.fitness.valid]
+        for ind, objectives in zip(invalid, toolbox.map(toolbox.evaluate, invalid)):
+            ind.fitness.set_objectives(objectives)
+        return len(invalid)
+
+    def record(gen, nevals):
+        if halloffame is not None:
+            halloffame.update(population)
+        feasible = sum(ind.fitness.feasible for ind in population)
+        logbook.record(gen=gen, nevals=nevals, feasible=feasible,
+                       **(stats.compile(population) if stats else {}))
+        if verbose:
+            print(logbook.stream)
+        if checkpoint is not None:
+            checkpoint.save(gen, ngen, population=population, halloffame=halloffame,
+                            logbook=logbook)
+
+    if resume is None:
+        nevals = evaluate_invalid(population)
+        population[:] = tools.selNSGA2(population, len(population))  # assigns crowding distances
+        record(0, nevals)
+    start = resume['generation'] + 1 if resume is not None else 1
+
+    for gen in range(start, ngen + 1):
+        offspring = algorithms.varAnd(tools.selTournamentDCD(population, len(population)),
+                                      toolbox, cxpb, mutpb)
+        nevals = evaluate_invalid(offspring)
+        population[:] = tools.selNSGA2(population + offspring, len(population))
+        record(gen, nevals)
+
+    return population, logbook
+
+
+def front_records(front):
+    """Feasible members of a Pareto front as parameter and raw-objective dicts, by increasing NOx"""
+    records = []
+    for ind in front:
+        if not ind.fitness.feasible:
+            continue
+        heat, nox = ind.fitness.values
+        records.append({'eps1': ind[0], 'eps2': ind[1], 'Lpre': ind[2], 'heat': heat,
+                        'nox': nox, 'flame_location': ind.fitness.flame_location})
+    return sorted(records, key=lambda r: r['nox'])
+
+
+def select_from_front(records, w_nox=None):
+    """Front member maximising the scalar fitness for a given w_NOx (no new solves)"""
+    return max(records, key=lambda r: fitness_from_objectives(r['heat'], r['nox'],
+                                                              r['flame_location'], w_nox))
+
+
+def save_pareto_front(path, records, w_nox=None):
+    with open(path, 'w') as f:
+        json.dump({'objectives': {'heat': 'max', 'nox': 'min'},
+                   'constraint': {'flame_location': [L_PRE_MIN, L_PRE_MAX]},
+                   'w_nox': w_nox if w_nox is not None else w_NOx,
+                   'front': records}, f, indent=4)
+
+
+# --- Asynchronous steady-state driver ---
+def task_individual(task_args):
+    """
+    Individual of a pool task's args: (func, individual, dispatched) from the
+    GA drivers (via _timed_call), or the bare individual from the screen.
+    """
+    (arg,) = task_args
+    return arg[1] if isinstance(arg, tuple) else arg
+
+
+def _timed_call(args):
+    """
+    Run func(individual) in a worker and return (fitness, busy seconds).
+    dispatched is the wall-clock time the parent queued the task (for queue wait).
+    """
+    func, individual, dispatched = args
+    start = time.perf_counter()
+    if _instrument is not None:
+        fitness = _instrument.call(func, individual, dispatched)
+    else:
+        fitness = func(individual)
+    return fitness, time.perf_counter() - start
+
+
+class UtilizationMap:
+    """
+    toolbox.map replacement over a Pool that accumulates worker busy time.
+    The generational drivers call map once per generation, so each call also
+    advances the shared generation counter read by the workers' EvaluationLog.
+    With instrumentation, each call is recorded as one generation.
+    """
+    def __init__(self, pool, n_workers, generation=None, instrumentation=None):
+        self.pool = pool
+        self.n_workers = n_workers
+        self.generation = generation
+        self.instrumentation = instrumentation
+        self.calls = 0
+        self.busy = 0.0
+        self.started = time.perf_counter()
+
+    def __call__(self, func, iterable):
+        if self.generation is not None:
+            self.generation.value = self.calls
+        if self.instrumentation is not None:
+            self.instrumentation.begin_map(self.calls)
+        self.calls += 1
+        dispatched = time.time()
+        results = self.pool.map(_timed_call, [(func, ind, dispatched) for ind in iterable])
+        if self.instrumentation is not None:
+            self.instrumentation.end_map()
+        self.busy += sum(busy for _, busy in results)
+        return [fitness for fitness, _ in results]
+
+    def utilization(self):
+        """Fraction of available worker time spent evaluating since construction"""
+        return self.busy / (self.n_workers * (time.perf_counter() - self.started))
+
+
+def expected_evaluations(pop_size, ngen, cxpb, mutpb):
+    """
+    Expected flame solves of a generational run: the initial population, then
+    the offspring that varAnd changes (crossover or mutation) in each generation.
+    """
+    varied = 1.0 - (1.0 - cxpb) * (1.0 - mutpb)
+    return pop_size + int(round(ngen * pop_size * varied))
+
+
+def ea_steady_state(population, toolbox, pool, n_workers, cxpb, mutpb, n_evals,
+                    stats=None, halloffame=None, verbose=__debug__, generation=None,
+                    instrumentation=None):
+    """
+    Asynchronous steady-state GA without a per-generation barrier.
+    Up to n_workers evaluations are kept in flight; each result is folded into
+    the population as soon as it arrives (replacing the worst individual if it
+    is better) and a new child is bred from the current population with
+    toolbox.select/mate/mutate. n_evals counts every solve, the initial
+    population included. The logbook gets one line per len(population)
+    completed evaluations (plus one for a final partial block) so it lines up
+    with eaSimple generations; the shared
+    generation counter, if given, follows the same numbering, and so do the
+    dispatch times given to instrumentation (a RunInstrumentation, optional).
+    Returns:
+        population, logbook and the fraction of worker time spent evaluating
+    """
+    pop_size = len(population)
+    logbook = tools.Logbook()
+    logbook.header = ['gen', 'nevals'] + (stats.fields if stats else [])
+    done = queue.Queue()
+    start = time.perf_counter()
+    busy = 0.0
+    submitted = 0
+    completed = 0
+    evaluated = []
+
+    def submit(ind):
+        nonlocal submitted
+        dispatched = time.time()
+        pool.apply_async(_timed_call, ((toolbox.evaluate, ind, dispatched),),
+                         callback=lambda result, ind=ind: done.put((ind, result)),
+                         error_callback=lambda exc, ind=ind: done.put((ind, ((FAILED_FITNESS,), 0.0))))
+        if instrumentation is not None:
+            instrumentation.add_dispatch(time.time() - dispatched)
+        submitted += 1
+
+    def breed():
+        child, other = [toolbox.clone(ind) for ind in toolbox.select(evaluated, 2)]
+        if random.random() < cxpb:
+            toolbox.mate(child, other)
+        if random.random() < mutpb:
+            toolbox.mutate(child)
+        del child.fitness.values
+        return child
+
+    for ind in population:
+        if ind.fitness.valid:
+            evaluated.append(ind)
+        else:
+            submit(ind)
+
+    while completed < submitted:
+        ind, (fitness, seconds) = done.get()
+        ind.fitness.values = fitness
+        busy += seconds
+        completed += 1
+
+        if len(evaluated) < pop_size:
+            evaluated.append(ind)
+        else:
+            worst = min(range(pop_size), key=lambda i: evaluated[i].fitness)
+            if ind.fitness > evaluated[worst].fitness:
+                evaluated[worst] = ind
+        if halloffame is not None:
+            halloffame.update([ind])
+
+        if generation is not None:
+            generation.value = completed // pop_size
+        if completed % pop_size == 0:
+            if instrumentation is not None:
+                instrumentation.close_generation(completed // pop_size - 1)
+            record = stats.compile(evaluated) if stats else {}
+            logbook.record(gen=completed // pop_size - 1, nevals=pop_size, **record)
+            if verbose:
+                print(logbook.stream)
+
+        while submitted - completed < n_workers and submitted < n_evals and len(evaluated) >= 2:
+            submit(breed())
+
+    if completed % pop_size:
+        record = stats.compile(evaluated) if stats else {}
+        logbook.record(gen=completed // pop_size, nevals=completed % pop_size, **record)
+        if verbose:
+            print(logbook.stream)
+    population[:] = evaluated
+    return population, logbook, busy / (n_workers * (time.perf_counter() - start))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="GA optimisation of the porous burner")
+    parser.add_argument("--mechanism", default=MECHANISM,
+                        help="Cantera mechanism of the flame solves, e.g. a skeletal mechanism "
+                             "from mechanism_reduction.py (default: %(default)s)")
+    parser.add_argument("--no-reuse", action="store_true",
+                        help="rebuild the Cantera Solution/FreeFlame for every evaluation")
+    parser.add_argument("--timing", action="store_true",
+                        help="report mechanism setup time separately from solve time")
+    parser.add_argument("--warm-start-dir", default=None,
+                        help="directory of converged profiles used to warm-start flame solves "
+                             "(faster, but a solve's objectives then depend on which neighbour "
+                             "it started from)")
+    parser.add_argument("--w-nox", type=float, default=w_NOx,
+                        help="NOx penalty weight in the fitness")
+    parser.add_argument("--cache", default=None,
+                        help="SQLite file caching raw objectives across runs")
+    parser.add_argument("--cache-tolerance", type=float, default=1e-3,
+                        help="cache key resolution as a fraction of each parameter range")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed for the random and NumPy generators")
+    parser.add_argument("--pop-size", type=int, default=20,
+                        help="GA population size")
+    parser.add_argument("--generations", type=int, default=10,
+                        help="number of GA generations")
+    parser.add_argument("--surrogate", action="store_true",
+                        help="pre-screen offspring with a Gaussian-process surrogate")
+    parser.add_argument("--surrogate-fraction", type=float, default=0.5,
+                        help="fraction of new offspring sent to the flame solver")
+    parser.add_argument("--surrogate-explore", type=float, default=0.25,
+                        help="share of solved offspring chosen by surrogate uncertainty")
+    parser.add_argument("--surrogate-data", default="results.yaml",
+                        help="earlier evaluations used to seed the surrogate")
+    parser.add_argument("--quality-trace", default=None, metavar="FILE",
+                        help="write the generation and solve count at which each new best "
+                             "fitness was first reached to FILE (JSON)")
+    parser.add_argument("--surrogate-baseline", default=None, metavar="FILE",
+                        help="with --surrogate, --quality-trace FILE of a plain run (same --seed, "
+                             "--pop-size, --generations) to compare solves at equal quality")
+    parser.add_argument("--islands", type=int, default=1,
+                        help="number of island populations of --pop-size each (island model)")
+    parser.add_argument("--migration-interval", type=int, default=5,
+                        help="generations between migrations between islands")
+    parser.add_argument("--migrants", type=int, default=2,
+                        help="best individuals each island sends to its neighbour")
+    parser.add_argument("--migration-topology", choices=["ring", "random"], default="ring",
+                        help="fixed ring, or a ring in a new random order at every migration")
+    parser.add_argument("--pareto", action="store_true",
+                        help="NSGA-II over (heat, NOx) with the flame location as a constraint; "
+                             "writes the non-dominated front with raw objectives")
+    parser.add_argument("--pareto-output", default="pareto_front.json",
+                        help="where --pareto writes the front")
+    parser.add_argument("--checkpoint", default=None, metavar="FILE",
+                        help="save the GA state (population, hall of fame, logbook, RNG states, "
+                             "settings) to FILE after every generation")
+    parser.add_argument("--checkpoint-every", type=int, default=1,
+                        help="generations between checkpoints")
+    parser.add_argument("--resume", default=None, metavar="FILE",
+                        help="continue the run saved in checkpoint FILE (and keep checkpointing "
+                             "to it unless --checkpoint is given); --generations may be raised")
+    parser.add_argument("--steady-state", action="store_true",
+                        help="asynchronous steady-state GA instead of generational eaSimple")
+    parser.add_argument("--evaluations", type=int, default=None,
+                        help="--steady-state budget of flame solves, initial population included "
+                             "(default: the expected count of a generational run with the same "
+                             "--pop-size and --generations; pass a generational run's printed "
+                             "total to compare at equal cost)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: all cores)")
+    parser.add_argument("--eval-timeout", type=float, default=None,
+                        help="wall-clock budget per evaluation in seconds; overrunning "
+                             "workers are killed and replaced")
+    parser.add_argument("--multi-fidelity", action="store_true",
+                        help="coarse solve first; re-solve at full fidelity only near the best")
+    parser.add_argument("--fidelity-margin", type=float, default=0.02,
+                        help="relative fitness margin to the best for a full-fidelity re-solve")
+    parser.add_argument("--eval-log", default="evaluations.jsonl",
+                        help="JSON-lines file the workers append one record per evaluation to "
+                             "(empty string disables it)")
+    parser.add_argument("--profile-store", default=None,
+                        help="directory keeping the grid, T, heat release rate and --profile-species "
+                             "mass fractions of every converged solve (float32), keyed by the "
+                             "eval_id in the evaluation log")
+    parser.add_argument("--profile-species", nargs="+", default=None,
+                        help=f"species stored per profile (default for a new store: "
+                             f"{' '.join(PROFILE_SPECIES)})")
+    parser.add_argument("--profile-format", choices=PROFILE_FORMATS, default=None,
+                        help="npy (one memory-mappable file per evaluation, the default for a new "
+                             "store) or hdf5 (chunked, one file per worker; needs h5py)")
+    parser.add_argument("--screen", action="store_true",
+                        help="run a Morris sensitivity screen on the pool before the GA")
+    parser.add_argument("--screen-trajectories", type=int, default=6,
+                        help="number of Morris trajectories (each costs 4 solves)")
+    parser.add_argument("--screen-levels", type=int, default=4,
+                        help="number of Morris grid levels")
+    parser.add_argument("--freeze-insensitive", action="store_true",
+                        help="fix parameters the screen finds insensitive at their mid-range value")
+    parser.add_argument("--freeze-threshold", type=float, default=0.05,
+                        help="mu* relative to the most influential parameter below which "
+                             "a parameter counts as insensitive")
+    parser.add_argument("--instrument", default=None, metavar="DIR",
+                        help="record per-evaluation phase timings and per-generation variation, "
+                             "dispatch and straggler times in DIR (summary.json)")
+    parser.add_argument("--profile-fraction", type=float, default=0.0,
+                        help="with --instrument, share of evaluations run under cProfile "
+                             "(dumps in DIR/profiles)")
+    parser.add_argument("--farm", default=None, metavar="HOST:PORT",
+                        help="serve evaluations from a TCP work queue that "
+                             "'python evaluation_farm.py worker' processes join (HOST defaults to "
+                             "localhost; use 0.0.0.0 or this machine's address for remote workers)")
+    parser.add_argument("--farm-authkey", default=DEFAULT_AUTHKEY,
+                        help="shared secret for --farm workers (default: $FARM_AUTHKEY, "
+                             "else a random key printed at start-up)")
+    parser.add_argument("--farm-local-workers", type=int, default=0,
+                        help="with --farm, worker processes to start on this machine")
+    parser.add_argument("--farm-lease", type=float, default=LEASE,
+                        help="seconds without a heartbeat before a farm worker's tasks are re-queued")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    global _run_id  # also tags the records the parent writes for timed-out solves
+    args = parse_args(argv)
+    if args.seed is not None:
+        random.seed(args.seed)
+        np.random.seed(args.seed)
+    pop_size = args.pop_size
+    ngen = args.generations
     cxpb = 0.7
     mutpb = 0.2
 
-    pop = toolbox.population(n=pop_size)
-    hof = tools.HallOfFame(1)
+    if args.islands > 1 and (args.steady_state or args.surrogate):
+        raise SystemExit("--islands cannot be combined with --steady-state or --surrogate")
+    if args.pareto and (args.steady_state or args.surrogate or args.islands > 1
+                        or args.multi_fidelity):
+        raise SystemExit("--pareto cannot be combined with --steady-state, --surrogate, "
+                         "--islands or --multi-fidelity")
+    checkpoint_path = args.checkpoint or args.resume
+    if args.surrogate_baseline and not args.surrogate:
+        raise SystemExit("--surrogate-baseline needs --surrogate")
+    if args.quality_trace and args.pareto:
+        raise SystemExit("--quality-trace needs a scalar fitness (not --pareto)")
+    if args.evaluations is not None and not args.steady_state:
+        raise SystemExit("--evaluations sets the budget of --steady-state")
+    if checkpoint_path and (args.steady_state or args.surrogate):
+        raise SystemExit("--checkpoint and --resume cannot be combined with --steady-state "
+                         "or --surrogate")
+    if args.pareto:
+        if pop_size % 4:
+            pop_size += 4 - pop_size % 4  # selTournamentDCD pairs up the population in fours
+            print(f"NSGA-II population rounded up to {pop_size}")
+        toolbox.register("individual", tools.initCycle, creator.ParetoIndividual,
+                         (toolbox.attr_por1, toolbox.attr_por2, toolbox.attr_len), n=1)
+        toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+    pop = toolbox.population(n=pop_size * args.islands)
+    hof = tools.ParetoFront() if args.pareto else tools.HallOfFame(1)
+    island_logs = None
+
+    # Parallel evaluation; each worker parses the mechanism once
+    n_workers = args.workers or os.cpu_count()
+    best_fitness = multiprocessing.Value('d', -np.inf)
+    generation = multiprocessing.Value('i', 0)
+    if (args.instrument and args.eval_log
+            and os.path.abspath(os.path.join(args.instrument, INSTRUMENT_RECORDS))
+            == os.path.abspath(args.eval_log)):
+        raise SystemExit(f"--eval-log {args.eval_log} is where --instrument writes its timings")
+    instrumentation = RunInstrumentation(args.instrument) if args.instrument else None
+
+    resume = None
+    if checkpoint_path:
+        checkpoint_config = {name: getattr(args, name) for name in TRAJECTORY_ARGS}
+        checkpoint_config.update(cxpb=cxpb, mutpb=mutpb, operators=operator_config(toolbox),
+                                 mechanism=config_hash(args.mechanism))
+    if args.resume:
+        resume = load_checkpoint(args.resume, checkpoint_config)
+        print(f"Resuming {args.resume} after generation {resume['generation']}")
+        hof = resume['halloffame']
+        pop = resume.get('population', pop)
+        if resume['best_fitness'] is not None:
+            best_fitness.value = resume['best_fitness']
+    _run_id = (resume or {}).get('run_id') or new_run_id()
+
+    if args.profile_store:
+        # Created here so workers share one species list and format
+        try:
+            ProfileStore(args.profile_store, args.profile_species, args.profile_format)
+        except ValueError as e:
+            raise SystemExit(str(e))
+    initargs = (args.mechanism, not args.no_reuse, args.timing, args.warm_start_dir,
+                'multi' if args.multi_fidelity else 'fine', args.fidelity_margin, best_fitness,
+                args.eval_log, generation, args.instrument, args.profile_fraction,
+                args.profile_store, _run_id)
+    if args.farm and args.eval_timeout:
+        raise SystemExit("--farm and --eval-timeout cannot be combined")
+    if args.farm:
+        # Shared Values cannot cross machines: farm workers log no generation and, in
+        # multi-fidelity mode, re-solve every individual at full fidelity
+        farm_initargs = initargs[:6] + (None, args.eval_log, None) + initargs[9:]
+        pool = FarmPool(parse_address(args.farm), args.farm_authkey, initializer=init_worker,
+                        initargs=farm_initargs, local_workers=args.farm_local_workers,
+                        lease=args.farm_lease)
+        n_workers = args.workers or args.farm_local_workers or n_workers
+        print(f"Evaluation farm listening on {pool.address[0] or '*'}:{pool.address[1]}")
+        if pool.authkey != args.farm_authkey:
+            print(f"Farm authkey (pass to workers as --authkey or $FARM_AUTHKEY): {pool.authkey}")
+    elif args.eval_timeout:
+        eval_log = EvaluationLog(args.eval_log) if args.eval_log else None
+
+        def on_timeout(task_args, elapsed):
+            result = {'status': 'timeout', 'solve_time': elapsed}
+            if not isinstance(task_args[0], tuple):
+                return result  # a screening solve (not logged): same shape as simulate
+            # The killed worker cannot log its own record
+            if eval_log is not None:
+                eval_log.write(evaluation_record(task_individual(task_args), result,
+                                                 TIMEOUT_FITNESS, generation.value))
+            # Same (fitness, busy seconds) shape as _timed_call
+            return (FAILED_OBJECTIVES if args.pareto else (TIMEOUT_FITNESS,)), elapsed
+
+        pool = SupervisedPool(n_workers, initializer=init_worker, initargs=initargs,
+                              timeout=args.eval_timeout, timeout_result=on_timeout)
+    else:
+        pool = multiprocessing.Pool(n_workers, initializer=init_worker, initargs=initargs)
+    pool_map = UtilizationMap(pool, n_workers, generation, instrumentation)
+    if resume is not None:
+        pool_map.calls = resume['generation'] + 1  # keeps the logged generation numbers
+    toolbox.register("map", pool_map)
+
+    cache = None
+    if args.cache:
+        cache = EvaluationCache(args.cache, args.cache_tolerance, args.mechanism, args.w_nox,
+                                pareto=args.pareto)
+        cached_before = cache.count()
+        toolbox.register("evaluate", cache)
+    elif args.pareto:
+        toolbox.register("evaluate", evaluate_pareto, w_nox=args.w_nox)
+    else:
+        toolbox.register("evaluate", evaluate, w_nox=args.w_nox)
 
-    # Parallel evaluation
-    pool = multiprocessing.Pool()
-    toolbox.register("map", pool.map)
+    frozen = None
+    if resume is not None:
+        frozen = resume['frozen']  # the screen ran before the checkpointed generations
+    elif args.screen:
+        screening = run_screening(pool.map, args.screen_trajectories, args.screen_levels,
+                                  args.seed, args.w_nox)
+        print("Sensitivity screen (Morris mu*, per unit of normalised parameter):")
+        for objective, per_param in screening['indices'].items():
+            print(f"  {objective:>15}: " + " | ".join(
+                f"{p} {v['mu_star']:.4g}" for p, v in per_param.items()))
+        screening['insensitive'] = insensitive_parameters(screening['indices'],
+                                                          args.freeze_threshold)
+        unscreened = sorted(set(screening['indices']) - set(screened_objectives(screening['indices'])))
+        if unscreened:
+            print("Not screened (no successful pair of solves):", ", ".join(unscreened))
+        print("Insensitive parameters:", screening['insensitive'] or "none")
+        with open("sensitivity_screening.json", "w") as f:
+            json.dump(screening, f, indent=4)
+
+        if args.freeze_insensitive and screening['insensitive']:
+            mid = PARAM_LOWS + PARAM_SPANS / 2
+            frozen = {i: float(mid[i]) for i, p in enumerate(PARAM_NAMES)
+                      if p in screening['insensitive']}
+            for ind in pop:
+                for i, value in frozen.items():
+                    ind[i] = value
+    if frozen:
+        toolbox.decorate("mate", freeze_genes(frozen))
+        toolbox.decorate("mutate", freeze_genes(frozen))
+
+    checkpoint = None
+    if checkpoint_path:
+        checkpoint = Checkpoint(checkpoint_path, checkpoint_config, args.checkpoint_every,
+                                best_fitness if args.multi_fidelity and not args.farm else None,
+                                frozen, _run_id)
+
+    if instrumentation is not None:
+        for name in ("select", "clone", "mate", "mutate"):
+            toolbox.decorate(name, instrumentation.timed)
 
     stats = tools.Statistics(lambda ind: ind.fitness.values)
-    stats.register("avg", np.mean)
-    stats.register("std", np.std)
-    stats.register("min", np.min)
-    stats.register("max", np.max)
+    axis = {'axis': 0} if args.pareto else {}  # per objective: [heat, NOx]
+    stats.register("avg", np.mean, **axis)
+    stats.register("std", np.std, **axis)
+    stats.register("min", np.min, **axis)
+    stats.register("max", np.max, **axis)
 
-    pop, log = algorithms.eaSimple(pop, toolbox, cxpb=cxpb, mutpb=mutpb,
-                                   ngen=ngen, stats=stats, halloffame=hof, verbose=True)
+    # Written with --quality-trace so a later run can tell whether it is comparable
+    quality_settings = {'seed': args.seed, 'pop_size': pop_size, 'generations': ngen,
+                        'w_nox': args.w_nox, 'mechanism': config_hash(args.mechanism),
+                        'surrogate': args.surrogate}
+    if args.steady_state:
+        n_evals = args.evaluations or expected_evaluations(pop_size, ngen, cxpb, mutpb)
+        print(f"Steady-state budget: {n_evals} evaluations"
+              + ("" if args.evaluations else " (expected count of the generational run)"))
+        pop, log, utilization = ea_steady_state(pop, toolbox, pool, n_workers, cxpb=cxpb,
+                                                mutpb=mutpb, n_evals=n_evals,
+                                                stats=stats, halloffame=hof, verbose=True,
+                                                generation=generation,
+                                                instrumentation=instrumentation)
+    elif args.surrogate:
+        surrogate = Surrogate()
+        if args.surrogate_data and os.path.exists(args.surrogate_data):
+            surrogate.add(*load_previous_evaluations(args.surrogate_data, args.w_nox))
+        pop, log = ea_surrogate(pop, toolbox, cxpb=cxpb, mutpb=mutpb, ngen=ngen,
+                                surrogate=surrogate, fraction=args.surrogate_fraction,
+                                explore=args.surrogate_explore, stats=stats,
+                                halloffame=hof, verbose=True)
+        solved = sum(log.select("nevals"))
+        screened = sum(log.select("screened"))
+        print(f"Surrogate: {solved} flame solves, {screened} offspring screened out")
+        trace = quality_trace(log)
+        print("Best fitness first reached: " + " | ".join(
+            f"{e['best']:.2f} at gen {e['generation']} ({e['evaluations']} solves)" for e in trace))
+        if args.surrogate_baseline:
+            with open(args.surrogate_baseline) as f:
+                baseline = json.load(f)
+            differences = [key for key in ('seed', 'pop_size', 'generations', 'w_nox', 'mechanism')
+                           if baseline['settings'].get(key) != quality_settings.get(key)]
+            if differences:
+                print(f"Note: the baseline differs in {', '.join(differences)}")
+            target, own, plain = compare_quality(trace, baseline['trace'])
+            line = (f"Same quality (best fitness {target:.2f}): {own['evaluations']} solves "
+                    f"(gen {own['generation']}) with the surrogate, ")
+            saved = plain['evaluations'] - own['evaluations']
+            print(line + (f"{plain['evaluations']} (gen {plain['generation']}) in the plain run: "
+                          + (f"saved {saved}" if saved >= 0 else f"needed {-saved} more")))
+    elif args.islands > 1:
+        if resume is not None:
+            islands = resume['islands']
+        else:
+            islands = [pop[i::args.islands] for i in range(args.islands)]
+        islands, log, island_logs = ea_islands(islands, toolbox, cxpb=cxpb, mutpb=mutpb, ngen=ngen,
+                                               migration_interval=args.migration_interval,
+                                               migrants=args.migrants,
+                                               topology=args.migration_topology,
+                                               stats=stats, halloffame=hof, verbose=True,
+                                               checkpoint=checkpoint, resume=resume)
+        pop = [ind for island in islands for ind in island]
+    elif args.pareto:
+        pop, log = ea_nsga2(pop, toolbox, cxpb=cxpb, mutpb=mutpb, ngen=ngen, stats=stats,
+                            halloffame=hof, verbose=True, checkpoint=checkpoint, resume=resume)
+    else:
+        pop, log = ea_simple(pop, toolbox, cxpb=cxpb, mutpb=mutpb, ngen=ngen, stats=stats,
+                             halloffame=hof, verbose=True, checkpoint=checkpoint, resume=resume)
+    if not args.steady_state:
+        utilization = pool_map.utilization()
     pool.close()
     pool.join()
 
+    print(f"Core utilisation: {100 * utilization:.1f}% of {n_workers} workers")
+    print(f"Evaluations: {int(sum(log.select('nevals')))}"
+          + (f" (budget {n_evals})" if args.steady_state else ""))
+    if args.quality_trace:
+        with open(args.quality_trace, 'w') as f:
+            json.dump({'settings': quality_settings, 'trace': quality_trace(log)}, f, indent=4)
+    timeout_summary = None
+    if args.eval_timeout:
+        timeout_summary = (f"Timeouts: {pool.timeouts} evaluations over {args.eval_timeout}s, "
+                           f"{pool.timeout_seconds:.1f} worker-seconds lost, "
+                           f"{pool.respawn_seconds:.1f}s restarting workers")
+        print(timeout_summary)
+        for task_args in pool.timed_out_args:
+            print(f"  timeout: {[float(x) for x in task_individual(task_args)]}")
+
+    if instrumentation is not None:
+        extra = {'timeouts': pool.timeouts} if args.eval_timeout else {}
+        summary = instrumentation.write_summary(n_workers, **extra)
+        phases = summary['phases']
+        print(f"Instrumentation: {summary['evaluations']} evaluations | " + " | ".join(
+            f"{p} {phases[p].get('total', 0.0):.1f}s" for p in ('setup_time', 'solve_time', 'post_time'))
+              + f" | variation {summary['totals']['variation']:.2f}s"
+              + f" | stragglers {summary['totals']['straggler_wait']:.1f}s"
+              + f" -> {args.instrument}/summary.json")
+
+    if args.farm:
+        farm_status = pool.status()
+        print(f"Evaluation farm: {farm_status['completed']} tasks, "
+              f"{farm_status['requeued']} re-queued from lost workers")
+
+    if cache is not None:
+        print(f"Evaluation cache: {cache.count()} entries ({cache.count() - cached_before} new)")
+    if args.pareto:
+        front = front_records(hof)
+        save_pareto_front(args.pareto_output, front, args.w_nox)
+        lines = [f"Pareto front: {len(front)} feasible non-dominated individuals "
+                 f"-> {args.pareto_output}"]
+        if front:
+            best = select_from_front(front, args.w_nox)
+            lines.append(f"Best for w_NOx={args.w_nox:g}: "
+                         f"[{best['eps1']}, {best['eps2']}, {best['Lpre']}] "
+                         f"heat {best['heat']:.2f}, NOx {best['nox']:.6g}")
+        print("\n".join(lines))
+        with open("ga_burner_results.txt", "w") as f:
+            f.write("\n".join(lines) + "\n")
+            if timeout_summary:
+                f.write(timeout_summary + "\n")
+            f.write(str(log))
+        return hof, log
     print("Best individual:", hof[0])
     print("Best fitness:", hof[0].fitness.values[0])
     # Save results
     with open("ga_burner_results.txt", "w") as f:
         f.write(f"Best individual: {hof[0]}\n")
         f.write(f"Best fitness: {hof[0].fitness.values[0]}\n")
+        if timeout_summary:
+            f.write(timeout_summary + "\n")
         f.write(str(log))
+        if island_logs is not None:
+            for i, island_log in enumerate(island_logs):
+                f.write(f"\n\nIsland {i}\n{island_log}")
+    return hof, log
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,262 @@
+import atexit
+import itertools
+import multiprocessing
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+
+def _worker_loop(conn, initializer, initargs):
+    """Worker process: run the initializer, then execute tasks received over conn"""
+    if initializer is not None:
+        initializer(*initargs)
+    conn.send(('ready', None, None))
+    while True:
+        try:
+            item = conn.recv()
+        except EOFError:
+            break
+        if item is None:
+            break
+        task_id, func, args = item
+        try:
+            message = ('done', task_id, func(*args))
+        except Exception as e:
+            message = ('error', task_id, e)
+        conn.send(message)
+
+
+class TaskTimeout(Exception):
+    """Raised by AsyncResult.get() for a task that overran the pool's time budget"""
+
+
+class AsyncResult:
+    def __init__(self, callback=None, error_callback=None):
+        self._event = threading.Event()
+        self._callback = callback
+        self._error_callback = error_callback
+        self._value = None
+        self._error = None
+
+    def _set(self, value=None, error=None):
+        self._value, self._error = value, error
+        self._event.set()
+        if error is None and self._callback is not None:
+            self._callback(value)
+        elif error is not None and self._error_callback is not None:
+            self._error_callback(error)
+
+    def ready(self):
+        return self._event.is_set()
+
+    def get(self, timeout=None):
+        if not self._event.wait(timeout):
+            raise multiprocessing.TimeoutError()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+class SupervisedPool:
+    """
+    Process pool with a wall-clock budget per task.
+    Each worker talks to the supervisor over its own pipe, so a worker that
+    overruns can be terminated without corrupting shared queues; it is replaced
+    by a fresh process (running the initializer again) and the task resolves to
+    timeout_result(args, elapsed) instead of blocking the caller. Offers the subset of
+    the multiprocessing.Pool interface used by solver.py: map, apply_async,
+    close, join and terminate.
+    """
+    def __init__(self, processes=None, initializer=None, initargs=(), timeout=None,
+                 timeout_result=None, poll_interval=0.1):
+        """
+        Args:
+            processes: number of workers (default: os.cpu_count())
+            initializer, initargs: run once in every worker, including replacements
+            timeout: per-task budget in seconds (None disables the limit)
+            timeout_result: callable(args, elapsed) giving the value of a timed-out task;
+                if None, get() raises TaskTimeout for that task (as it raises whatever
+                timeout_result itself raises)
+            poll_interval: how often the supervisor checks deadlines (seconds)
+        """
+        self.processes = processes or multiprocessing.cpu_count()
+        self.timeout = timeout
+        self.timeout_result = timeout_result
+        self.poll_interval = poll_interval
+        self._initializer = initializer
+        self._initargs = initargs
+
+        # Timeout accounting
+        self.timeouts = 0
+        self.timeout_seconds = 0.0   # worker time spent on tasks that were killed
+        self.respawn_seconds = 0.0   # time replacement workers spent starting up
+        self.timed_out_args = []
+
+        self._lock = threading.Lock()
+        self._worker_ids = itertools.count()
+        self._task_ids = itertools.count()
+        self._workers = {}    # wid -> (process, conn)
+        self._idle = deque()
+        self._running = {}    # wid -> (task_id, args, start)
+        self._spawned = {}    # wid -> spawn time, until the worker reports ready
+        self._replacements = set()
+        self._tasks = deque()
+        self._results = {}    # task_id -> AsyncResult
+        self._closed = False
+        self._stopped = False
+
+        for _ in range(self.processes):
+            self._spawn()
+        self._supervisor = threading.Thread(target=self._supervise, daemon=True)
+        self._supervisor.start()
+        # Runs before multiprocessing's own exit handler kills the daemonic workers,
+        # which the supervisor would otherwise see as crashes and replace
+        atexit.register(self.terminate)
+
+    def _spawn(self, replacement=False):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_worker_loop, daemon=True,
+                                          args=(child_conn, self._initializer, self._initargs))
+        process.start()
+        child_conn.close()
+        wid = next(self._worker_ids)
+        self._workers[wid] = (process, parent_conn)
+        self._spawned[wid] = time.perf_counter()
+        if replacement:
+            self._replacements.add(wid)
+
+    def _retire(self, wid):
+        process, conn = self._workers.pop(wid)
+        process.terminate()
+        process.join(5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        conn.close()
+        self._spawned.pop(wid, None)
+        self._replacements.discard(wid)
+        if wid in self._idle:
+            self._idle.remove(wid)
+
+    def _handle(self, wid, message, finished):
+        kind, task_id, value = message
+        if kind == 'ready':
+            started = self._spawned.pop(wid)
+            if wid in self._replacements:
+                self._replacements.discard(wid)
+                self.respawn_seconds += time.perf_counter() - started
+            self._idle.append(wid)
+            return
+        self._running.pop(wid, None)
+        self._idle.append(wid)
+        if kind == 'done':
+            finished.append((self._results.pop(task_id), value, None))
+        else:
+            finished.append((self._results.pop(task_id), None, value))
+
+    def _supervise(self):
+        while True:
+            finished = []  # (AsyncResult, value, error), resolved outside the lock
+            with self._lock:
+                if self._stopped or (self._closed and not self._tasks and not self._running):
+                    break
+                conns = {conn: wid for wid, (_, conn) in self._workers.items()}
+            try:
+                ready = wait(list(conns), timeout=self.poll_interval)
+            except (OSError, ValueError):
+                continue  # a connection was closed by terminate()
+            for conn in ready:
+                wid = conns[conn]
+                with self._lock:
+                    if wid not in self._workers:
+                        continue
+                    try:
+                        message = conn.recv()
+                    except (EOFError, OSError):
+                        # Worker died (e.g. a crash inside the solver): fail its task and replace it
+                        running = self._running.pop(wid, None)
+                        self._retire(wid)
+                        if not self._stopped:
+                            self._spawn(replacement=True)
+                        if running is not None:
+                            finished.append((self._results.pop(running[0]), None,
+                                             RuntimeError("worker process exited unexpectedly")))
+                        continue
+                    self._handle(wid, message, finished)
+
+            with self._lock:
+                now = time.perf_counter()
+                if self.timeout is not None:
+                    for wid, (task_id, args, start) in list(self._running.items()):
+                        elapsed = now - start
+                        if elapsed <= self.timeout:
+                            continue
+                        del self._running[wid]
+                        self._retire(wid)
+                        self._spawn(replacement=True)
+                        self.timeouts += 1
+                        self.timeout_seconds += elapsed
+                        self.timed_out_args.append(args)
+                        if self.timeout_result is not None:
+                            try:
+                                value, error = self.timeout_result(args, elapsed), None
+                            except Exception as e:  # fail this task, not the supervisor
+                                value, error = None, e
+                            finished.append((self._results.pop(task_id), value, error))
+                        else:
+                            finished.append((self._results.pop(task_id), None,
+                                             TaskTimeout(f"task exceeded {self.timeout}s")))
+
+                while self._idle and self._tasks:
+                    wid = self._idle.popleft()
+                    task_id, func, args = self._tasks.popleft()
+                    self._workers[wid][1].send((task_id, func, args))
+                    self._running[wid] = (task_id, args, time.perf_counter())
+
+            for result, value, error in finished:
+                result._set(value, error)
+
+    def apply_async(self, func, args=(), callback=None, error_callback=None):
+        result = AsyncResult(callback, error_callback)
+        with self._lock:
+            if self._closed:
+                raise ValueError("Pool not running")
+            task_id = next(self._task_ids)
+            self._results[task_id] = result
+            self._tasks.append((task_id, func, tuple(args)))
+        return result
+
+    def map(self, func, iterable):
+        return [result.get() for result in
+                [self.apply_async(func, (item,)) for item in iterable]]
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+
+    def join(self):
+        self._supervisor.join()
+        atexit.unregister(self.terminate)
+        with self._lock:
+            for wid, (process, conn) in list(self._workers.items()):
+                try:
+                    conn.send(None)
+                except OSError:
+                    pass
+            for wid, (process, conn) in list(self._workers.items()):
+                process.join(5)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+                conn.close()
+            self._workers.clear()
+
+    def terminate(self):
+        atexit.unregister(self.terminate)
+        with self._lock:
+            self._closed = True
+            self._stopped = True
+            for wid in list(self._workers):
+                self._retire(wid)
+        self._supervisor.join()
@@ -0,0 +1,236 @@
+# sweep.py
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+import solver
+
+# --- Sweep settings ---
+OUTPUT_DIR = 'sweep'
+DESIGN_FILE = 'design.json'
+RESULTS_FILE = 'results.jsonl'  # evaluation-log records, readable by analysis.py
+
+
+def grid_design(levels):
+    """Full factorial grid with levels[i] evenly spaced values of parameter i (unit cube)"""
+    axes = [np.linspace(0.0, 1.0, n) if n > 1 else np.array([0.5]) for n in levels]
+    return np.array(np.meshgrid(*axes, indexing='ij')).reshape(len(levels), -1).T
+
+
+def latin_hypercube(n, seed=None, dims=3):
+    """n-point Latin hypercube on the unit cube (one point per stratum of every axis)"""
+    rng = np.random.default_rng(seed)
+    strata = np.array([rng.permutation(n) for _ in range(dims)]).T
+    return (strata + rng.random((n, dims))) / n
+
+
+def continuation_order(points):
+    """
+    Order unit-cube points along a short path (greedy nearest neighbour from
+    the origin corner), so consecutive solves differ as little as possible.
+    """
+    remaining = np.ones(len(points), dtype=bool)
+    order = []
+    current = np.zeros(points.shape[1])
+    for _ in range(len(points)):
+        distances = np.linalg.norm(points - current, axis=1)
+        distances[~remaining] = np.inf
+        nxt = int(np.argmin(distances))
+        order.append(nxt)
+        remaining[nxt] = False
+        current = points[nxt]
+    return order
+
+
+def split_path(order, n_chunks):
+    """Cut the continuation path into n_chunks contiguous pieces of near-equal length"""
+    return [chunk.tolist() for chunk in np.array_split(np.asarray(order, dtype=int), n_chunks)
+            if len(chunk)]
+
+
+class ContinuationArchive:
+    """
+    In-memory stand-in for solver.ProfileArchive holding only the last converged
+    profile, so every solve in a chunk starts from its predecessor on the path.
+    """
+    def __init__(self):
+        self.profile = None
+
+    def add(self, individual, width, flame):
+        self.profile = {'individual': np.asarray(individual, dtype=float), 'width': width,
+                        'grid': flame.grid.copy(), 'T': flame.T.copy(), 'Y': flame.Y.copy(),
+                        'velocity': flame.velocity.copy(), 'mdot': float(flame.inlet.mdot),
+                        'species': list(flame.gas.species_names)}
+
+    def nearest(self, individual):
+        return self.profile
+
+
+_results_log = None  # solver.EvaluationLog of the checkpoint, per worker
+_w_nox = None
+_continuation = False
+
+
+def init_sweep_worker(results_path, w_nox, mechanism=solver.MECHANISM, profile_store=None,
+                      run_id=None, continuation=False):
+    global _results_log, _w_nox, _continuation
+    solver.init_worker(mechanism, reuse=True, profile_store=profile_store, run_id=run_id)
+    _results_log = solver.EvaluationLog(results_path)
+    _w_nox = w_nox
+    _continuation = continuation
+
+
+def run_chunk(chunk):
+    """
+    Solve a chunk of (index, individual) pairs in order, checkpointing every point.
+    With continuation, each solve starts from its predecessor's converged profile.
+    """
+    # Each chunk is its own continuation path
+    solver._archive = ContinuationArchive() if _continuation else None
+    for index, individual in chunk:
+        result = solver.simulate(individual, _w_nox)
+        if result['status'] == 'ok':
+            fitness = solver.fitness_from_objectives(result['heat'], result['nox'],
+                                                     result['flame_location'], _w_nox)
+        else:
+            fitness = solver.FAILED_FITNESS
+            if _continuation:
+                solver._archive = ContinuationArchive()  # do not continue from a failed solve
+        record = solver.evaluation_record(individual, result, fitness)
+        record['index'] = index
+        _results_log.write(record)
+    return len(chunk)
+
+
+def completed_indices(results_path):
+    """
+    Design indices already in the checkpoint. A record torn by an interrupted
+    write is cut off, so the resumed sweep appends after the last complete line.
+    """
+    done = set()
+    if not results_path.exists():
+        return done
+    with open(results_path, 'rb+') as f:
+        complete = 0
+        for line in f:
+            if not line.endswith(b'\n'):
+                f.truncate(complete)
+                break
+            complete += len(line)
+            try:
+                done.add(json.loads(line)['index'])
+            except (ValueError, KeyError):
+                continue
+    return done
+
+
+def sweep_config(args):
+    """Settings the recorded results depend on; a resumed sweep must use the same ones"""
+    return {'mechanism': solver.config_hash(args.mechanism), 'w_nox': args.w_nox,
+            'continuation': args.continuation}
+
+
+def make_design(args):
+    if args.lhs:
+        unit = latin_hypercube(args.lhs, args.seed)
+        spec = {'type': 'lhs', 'n': args.lhs, 'seed': args.seed}
+    else:
+        unit = grid_design(args.grid)
+        spec = {'type': 'grid', 'levels': args.grid}
+    points = solver.PARAM_LOWS + unit * solver.PARAM_SPANS
+    return spec, points, continuation_order(unit)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep the flame model over a grid or Latin "
+                                                 "hypercube design, with resume and optional continuation")
+    design = parser.add_mutually_exclusive_group()
+    design.add_argument("--grid", type=int, nargs=3, default=[5, 5, 5],
+                        metavar=("N_EPS1", "N_EPS2", "N_LPRE"),
+                        help="grid levels per parameter (default: 5 5 5)")
+    design.add_argument("--lhs", type=int, default=None, metavar="N",
+                        help="N-point Latin hypercube instead of a grid")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the Latin hypercube")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--chunks", type=int, default=None,
+                        help="continuation paths the design is cut into (default: one per worker)")
+    parser.add_argument("--w-nox", type=float, default=solver.w_NOx,
+                        help="NOx penalty weight in the recorded fitness")
+    parser.add_argument("--mechanism", default=solver.MECHANISM,
+                        help="Cantera mechanism of the flame solves (default: %(default)s)")
+    parser.add_argument("--continuation", action="store_true",
+                        help="start each solve from the previous point's converged profile "
+                             "(faster, but the results then depend on the path and --chunks)")
+    parser.add_argument("--profile-store", default=None,
+                        help="directory keeping every converged profile (see solver.py --profile-store)")
+    parser.add_argument("--output", default=OUTPUT_DIR,
+                        help="directory holding the design and the results checkpoint")
+    parser.add_argument("--restart", action="store_true",
+                        help="discard an existing checkpoint instead of resuming it")
+    args = parser.parse_args(argv)
+
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    design_path = output / DESIGN_FILE
+    results_path = output / RESULTS_FILE
+    n_workers = args.workers or os.cpu_count()
+
+    if args.restart:
+        design_path.unlink(missing_ok=True)
+        results_path.unlink(missing_ok=True)
+    config = sweep_config(args)
+    if design_path.exists():
+        # Resume: the stored design wins over the command line
+        with open(design_path) as f:
+            stored = json.load(f)
+        differences = [f"{key}: {value!r} -> {config[key]!r}"
+                       for key, value in stored.get('config', {}).items() if config.get(key) != value]
+        if differences:
+            raise SystemExit(f"{results_path} holds results of a sweep with different settings "
+                             f"(use --restart or another --output):\n  " + "\n  ".join(differences))
+        spec, points, chunks = stored['spec'], np.array(stored['points']), stored['chunks']
+        run_id = stored.get('run_id')
+        print(f"Resuming {spec['type']} sweep in {output}")
+    else:
+        spec, points, order = make_design(args)
+        chunks = split_path(order, args.chunks or n_workers)
+        run_id = solver.new_run_id()  # a resumed sweep keeps it
+        with open(design_path, 'w') as f:
+            json.dump({'spec': spec, 'points': points.tolist(), 'chunks': chunks,
+                       'run_id': run_id, 'config': config}, f)
+
+    done = completed_indices(results_path)
+    work = [[(i, points[i].tolist()) for i in chunk if i not in done] for chunk in chunks]
+    work = [chunk for chunk in work if chunk]
+    todo = sum(len(chunk) for chunk in work)
+    print(f"{len(points)} design points, {len(done)} already solved, {todo} to go "
+          f"in {len(work)} continuation chunks")
+    if not work:
+        return
+
+    if args.profile_store:
+        try:
+            solver.ProfileStore(args.profile_store)
+        except ValueError as e:
+            raise SystemExit(str(e))
+    start = time.perf_counter()
+    solved = 0
+    with multiprocessing.Pool(min(n_workers, len(work)), initializer=init_sweep_worker,
+                              initargs=(str(results_path), args.w_nox, args.mechanism,
+                                        args.profile_store, run_id, args.continuation)) as pool:
+        for count in pool.imap_unordered(run_chunk, work):
+            solved += count
+            print(f"Sweep progress: {len(done) + solved}/{len(points)} "
+                  f"({time.perf_counter() - start:.0f}s)", flush=True)
+    print(f"Sweep complete: results in {results_path} (python analysis.py {results_path})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+# conftest.py
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ansys_interface import AnsysInterface
+
+FAKE_ANSYS = Path(__file__).resolve().parent / "fake_ansys.py"
+
+
+@pytest.fixture
+def interface(tmp_path):
+    """AnsysInterface running fake_ansys.py as both MAPDL and Fluent"""
+    # Wrapper so the stand-in runs under this interpreter whatever the shebang finds
+    command = tmp_path / "fake_ansys"
+    command.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_ANSYS}" "$@"\n')
+    command.chmod(0o755)
+    return AnsysInterface(ansys_command=str(command), fluent_command=str(command))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# fake_ansys.py
+"""
+Stand-in for the MAPDL and Fluent executables, for exercising the case runner
+without ANSYS. It accepts their command lines (`-b -i SCRIPT` / `3d -i JOURNAL`),
+prints what it was asked to run and exits 0. As Fluent, it writes every data
+file the journal names and a synthetic ASCII export for every /file/export/ascii:
+4 cells per axial station, the flame base at preheating_length and the heat
+release scaled by the SiC3 porosity in force, so cases can be told apart.
+Extra keys in params.txt (of the case, or of a session's first case) change
+that for one step:
+    fake_step = geometry or fluent   step the keys below apply to (default: fluent)
+    fake_exit = N                    exit with code N (after writing the outputs)
+    fake_sleep = S                   start a helper process (pid in helper.pid), then sleep S seconds
+    fake_cases = N                   stop after the outputs of the first N cases
+"""
+import re
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+STATIONS = 41
+CELLS_PER_STATION = 4
+
+
+def read_params(path="params.txt"):
+    params = {}
+    with open(path) as f:
+        for line in f:
+            if '=' in line:
+                key, value = line.split('=', 1)
+                params[key.strip()] = value.strip()
+    return params
+
+
+def write_export(path, fields, params, sic3_porosity):
+    """Comma-separated cell export with the columns Fluent writes before the requested fields"""
+    length, flame = float(params["burner_length"]), float(params["preheating_length"])
+    z = np.repeat(np.linspace(0.0, length, STATIONS), CELLS_PER_STATION)
+    spread = np.tile([-1.5, -0.5, 0.5, 1.5], STATIONS)
+    T = 300.0 + 1500.0 / (1.0 + np.exp(-(z - flame) / 0.004)) + spread
+    values = {'temperature': T,
+              'heat-release-rate': 1e8 * sic3_porosity * np.exp(-((z - flame) / 0.005) ** 2),
+              'mass-fraction-no': 2e-5 * (T - 300.0) / 1500.0,
+              'mass-fraction-no2': 2e-6 * (T - 300.0) / 1500.0,
+              'velocity-magnitude': 0.5 * T / 300.0}
+    columns = [np.arange(1, len(z) + 1), 0.01 * spread, np.zeros_like(z), z]
+    columns += [values.get(field, np.zeros_like(z)) for field in fields]
+    header = ["cellnumber", "x-coordinate", "y-coordinate", "z-coordinate"] + list(fields)
+    np.savetxt(path, np.column_stack(columns), delimiter=", ", header=", ".join(header), comments="")
+
+
+def run_journal(journal, params, max_cases=None):
+    """Write the files a journal asks for; a case ends with its export"""
+    sic3_porosity = float(params["sic3_porosity"])
+    in_sic3 = False
+    cases = 0
+    with open(journal) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('/define/boundary-conditions/fluid'):
+                in_sic3 = '"sic3"' in line
+            elif line.startswith('porosity') and in_sic3:
+                sic3_porosity = float(line.split()[1])
+            elif max_cases is not None and cases >= max_cases and line.startswith('/file/'):
+                return  # died before writing the next case
+            elif line.startswith(('/file/write-data', '/file/write-case-data')):
+                with open(re.search(r'"([^"]+)"', line).group(1), 'w') as out:
+                    out.write("stand-in data\n")
+            elif line.startswith('/file/export/ascii'):
+                name = re.search(r'"([^"]+)"', line).group(1)
+                fields = line.split('()')[1].split()[1:]  # after the comma-delimiter answer
+                write_export(name, fields, params, sic3_porosity)
+                cases += 1
+
+
+def main(argv):
+    step = "fluent" if argv[:1] == ["3d"] else "geometry"
+    script = argv[argv.index("-i") + 1]
+    print(f"{step}: running {script}", flush=True)
+    params = read_params()
+    faked = params.get("fake_step", "fluent") == step
+    if faked and "fake_sleep" in params:
+        # Fluent and MAPDL leave helper processes behind; so does the stand-in
+        helper = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(600)"])
+        with open("helper.pid", "w") as f:
+            f.write(str(helper.pid))
+        time.sleep(float(params["fake_sleep"]))
+    if step == "fluent":
+        max_cases = int(params["fake_cases"]) if faked and "fake_cases" in params else None
+        run_journal(script, params, max_cases)
+    return int(params.get("fake_exit", 0)) if faked else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,97 @@
+# test_case_runner.py
+"""AnsysInterface.run_cases against the stand-in executables in fake_ansys.py (see conftest.py)"""
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ansys_interface import CASES_SUMMARY, EXPORT_FILE, EXPORT_FIELDS, AnsysInterface, main
+
+
+def process_alive(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split(")")[-1].split()[0] != "Z"  # a zombie is dead but not yet reaped
+    except FileNotFoundError:
+        return False
+
+
+def test_cases_run_in_their_own_directories(interface, tmp_path):
+    output = tmp_path / "cases"
+    results = interface.run_cases([[0.4, 0.6, 0.1], [0.5, 0.7, 0.15]], str(output), max_workers=2)
+    assert [r['status'] for r in results] == ['ok', 'ok']
+    for index, result in enumerate(results):
+        directory = output / f"case_{index:04d}"
+        assert result['directory'] == str(directory)
+        assert [s['step'] for s in result['steps']] == ['geometry', 'fluent']
+        assert all(s['returncode'] == 0 for s in result['steps'])
+        for name in ('params.txt', 'create_geometry.apdl', 'fluent_simulation.jou'):
+            assert (directory / name).exists()
+        assert "fluent: running fluent_simulation.jou" in (directory / "fluent.log").read_text()
+        # The journal exports the solution and the case picks up its objectives
+        assert result['export_file'] == str(directory / EXPORT_FILE)
+        assert f'/file/export/ascii "{EXPORT_FILE}"' in (directory / "fluent_simulation.jou").read_text()
+    assert [r['flame_location'] for r in results] == pytest.approx([0.1, 0.15], abs=0.01)
+    assert results[1]['heat'] > results[0]['heat'] > 0  # scaled by the SiC3 porosity
+    assert results[0]['nox'] > 0
+    assert "sic3_porosity = 0.5" in (output / "case_0001" / "params.txt").read_text()
+    assert json.loads((output / CASES_SUMMARY).read_text()) == results
+
+
+def test_missing_export(interface, tmp_path):
+    result, = interface.run_cases([{'fake_cases': 0}], str(tmp_path))
+    assert result['status'] == 'missing'
+    assert 'heat' not in result
+
+
+def test_export_columns_are_recognised(interface, tmp_path):
+    interface.run_cases([[0.5, 0.5, 0.1]], str(tmp_path))
+    export = tmp_path / "case_0000" / EXPORT_FILE
+    result = interface.extract_results(str(export))
+    assert result['velocity'] is not None and result['nox_concentration'] is not None
+    assert export.read_text().splitlines()[0].endswith(", ".join(EXPORT_FIELDS))
+
+
+def test_failed_step_stops_the_case(interface, tmp_path):
+    cases = [{'fake_step': 'geometry', 'fake_exit': 3}, {'fake_exit': 2}, [0.5, 0.5, 0.5]]
+    results = interface.run_cases(cases, str(tmp_path), max_workers=3)
+    assert [r['status'] for r in results] == ['failed', 'failed', 'ok']
+    assert [(s['step'], s['returncode']) for s in results[0]['steps']] == [('geometry', 3)]
+    assert [(s['step'], s['returncode']) for s in results[1]['steps']] == [('geometry', 0), ('fluent', 2)]
+
+
+def test_timeout_kills_the_process_group(interface, tmp_path):
+    start = time.perf_counter()
+    results = interface.run_cases([{'fake_sleep': 60}, [0.5, 0.5, 0.5]], str(tmp_path),
+                                  max_workers=2, timeout=2)
+    assert time.perf_counter() - start < 30
+    assert [r['status'] for r in results] == ['timeout', 'ok']
+    assert results[0]['steps'][-1]['step'] == 'fluent'
+    helper = int((tmp_path / "case_0000" / "helper.pid").read_text())
+    deadline = time.monotonic() + 5
+    while process_alive(helper) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert not process_alive(helper)
+
+
+def test_missing_executable_is_an_error(tmp_path):
+    interface = AnsysInterface(ansys_command=str(tmp_path / "no-such-ansys"),
+                               fluent_command=str(tmp_path / "no-such-fluent"))
+    result, = interface.run_cases([[0.5, 0.5, 0.5]], str(tmp_path))
+    assert result['status'] == 'error'
+    assert result['steps'][0]['returncode'] is None
+
+
+def test_command_line(interface, tmp_path, capsys):
+    cases = tmp_path / "cases.json"
+    cases.write_text(json.dumps([[0.5, 0.5, 0.1], {'fake_exit': 1}]))
+    main(["--cases", str(cases), "--output", str(tmp_path / "out"), "--workers", "2",
+          "--ansys-command", interface.ansys_command, "--fluent-command", interface.fluent_command])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith("case    0: ok") and "| heat " in lines[0]
+    assert lines[1].startswith("case    1: failed") and "fluent failed" in lines[1]
+    assert os.path.exists(tmp_path / "out" / CASES_SUMMARY)
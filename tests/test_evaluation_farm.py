@@ -0,0 +1,72 @@
+# test_evaluation_farm.py
+"""FarmPool on one machine: results, and re-queueing the task of a worker that dies"""
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from evaluation_farm import FarmPool, TaskBoard
+
+
+def square(x):
+    return x * x
+
+
+def hang_first_time(marker):
+    """The first worker to run this records its pid and hangs; any later one returns"""
+    if not os.path.exists(marker):
+        with open(marker, 'w') as f:
+            f.write(str(os.getpid()))
+        time.sleep(600)
+    return os.getpid()
+
+
+def wait_for(condition, timeout):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.1)
+
+
+@pytest.fixture
+def farm():
+    pool = FarmPool(('localhost', 0), local_workers=2, lease=2.0, poll_interval=0.1)
+    yield pool
+    pool.terminate()
+
+
+def test_map(farm):
+    assert farm.map(square, range(10)) == [x * x for x in range(10)]
+    assert farm.status()['completed'] == 10
+
+
+def test_task_of_killed_worker_is_requeued(farm, tmp_path):
+    marker = tmp_path / "first_worker"
+    result = farm.apply_async(hang_first_time, (str(marker),))
+    wait_for(lambda: marker.exists() and marker.read_text(), 30)
+    killed = int(marker.read_text())
+    os.kill(killed, signal.SIGKILL)
+    # Its heartbeats stop; after the lease the task goes to the other worker
+    survivor = result.get(timeout=60)
+    assert survivor != killed
+    status = farm.status()
+    assert status['requeued'] >= 1
+    assert status['completed'] == 1
+
+
+def test_late_answer_after_requeue():
+    board = TaskBoard()
+    board.submit(0, b'payload')
+    assert board.take('lost', 0) == (0, b'payload')
+    board.leave('lost')  # presumed lost: the task goes back to the queue
+    assert board.take('other', 0) == (0, b'payload')
+    board.complete('lost', 0, True, b'late')  # the lost worker answers after all
+    board.complete('other', 0, True, b'again')
+    assert board.results(0) == [(0, True, b'late')]
+    assert board.status() == {'workers': 1, 'pending': 0, 'running': 0, 'completed': 1,
+                              'requeued': 1}
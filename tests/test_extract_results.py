@@ -0,0 +1,110 @@
+# test_extract_results.py
+"""AnsysInterface.extract_results on synthetic Fluent exports with known axial profiles"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ansys_interface import AnsysInterface, read_fluent_ascii
+
+STATIONS = np.linspace(0.0, 0.1, 51)
+CELLS_PER_STATION = 4
+OFFSETS = np.array([-1.5, -0.5, 0.5, 1.5])  # per-cell deviations, zero on average at every station
+
+
+def station_profiles():
+    """Station means of temperature, heat release and NO / NO2 (flame base at z = 0.04)"""
+    T = 300.0 + 1500.0 / (1.0 + np.exp(-(STATIONS - 0.04) / 0.004))
+    heat_release = 5e8 * np.exp(-((STATIONS - 0.04) / 0.005) ** 2)
+    no = 2e-5 * (T - 300.0) / 1500.0
+    no2 = 0.1 * no
+    return T, heat_release, no, no2
+
+
+def cell_rows(seed=0):
+    """Rows of (cellnumber, x, z, T, heat release, NO, NO2), 4 cells per station, shuffled"""
+    T, heat_release, no, no2 = station_profiles()
+    z = np.repeat(STATIONS, CELLS_PER_STATION)
+    spread = np.tile(OFFSETS, len(STATIONS))
+    columns = [np.tile(OFFSETS * 0.01, len(STATIONS)), z,
+               np.repeat(T, CELLS_PER_STATION) + 10.0 * spread,
+               np.repeat(heat_release, CELLS_PER_STATION) + 1e6 * spread,
+               np.repeat(no, CELLS_PER_STATION) + 1e-7 * spread,
+               np.repeat(no2, CELLS_PER_STATION) + 1e-8 * spread]
+    rows = np.column_stack(columns)[np.random.default_rng(seed).permutation(len(z))]
+    return np.column_stack([np.arange(1, len(z) + 1), rows])
+
+
+def expected_objectives():
+    T, heat_release, no, no2 = station_profiles()
+    return (float(np.trapezoid(heat_release, STATIONS)), float(np.max(no + no2)),
+            float(STATIONS[np.argmax(np.gradient(T, STATIONS))]))
+
+
+@pytest.fixture
+def ascii_export(tmp_path):
+    path = tmp_path / "export.csv"
+    header = "cellnumber, x-coordinate, z-coordinate, temperature, heat-release-rate, no, no2"
+    lines = [header] + [", ".join(f"{v:.12e}" for v in row) for row in cell_rows()]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def test_shuffled_export_in_small_chunks(ascii_export):
+    assert ascii_export.stat().st_size > 10 * 1024  # many 1 kB chunks
+    result = AnsysInterface().extract_results(str(ascii_export), chunk_bytes=1024)
+    heat, nox, flame_location = expected_objectives()
+    assert result['status'] == 'ok'
+    assert len(result['axial']) == len(STATIONS) * CELLS_PER_STATION
+    assert result['heat'] == pytest.approx(heat, rel=1e-9)
+    assert result['nox'] == pytest.approx(nox, rel=1e-9)
+    assert result['flame_location'] == pytest.approx(flame_location)
+    assert result['velocity'] is None
+
+
+def test_chunking_does_not_change_the_columns(ascii_export):
+    fields = ['z-coordinate', 'temperature']
+    whole = read_fluent_ascii(str(ascii_export), fields)
+    for chunk_bytes in (1024, 100, 1):  # down to a chunk per line
+        pieces = read_fluent_ascii(str(ascii_export), fields, chunk_bytes)
+        for field in fields:
+            np.testing.assert_array_equal(pieces[field], whole[field])
+    np.testing.assert_allclose(whole['temperature'], cell_rows()[:, 3], rtol=1e-12)
+
+
+def test_space_separated_export_with_named_columns(tmp_path):
+    path = tmp_path / "export.txt"
+    rows = cell_rows(seed=1)
+    lines = ["cellnumber x-coordinate axial-position static-temperature q nox-total no2"]
+    lines += [" ".join(f"{v:.12e}" for v in row) for row in rows]
+    path.write_text("\n".join(lines) + "\n")
+    result = AnsysInterface().extract_results(
+        str(path), axis="axial-position", columns={'heat_release': 'q', 'nox': 'nox-total'},
+        chunk_bytes=1024)
+    heat, _, flame_location = expected_objectives()
+    assert result['heat'] == pytest.approx(heat, rel=1e-9)
+    assert result['nox'] == pytest.approx(np.max(station_profiles()[2]), rel=1e-9)  # NO only
+    assert result['flame_location'] == pytest.approx(flame_location)
+
+
+def test_profile_file(tmp_path):
+    path = tmp_path / "burner.prof"
+    rows = cell_rows(seed=2)
+    names = ['x', 'z', 'temperature', 'heat-release-rate', 'no', 'no2']
+    sections = [f"({name}\n" + "\n".join(f"{v:.12e}" for v in rows[:, i + 1]) + "\n)"
+                for i, name in enumerate(names)]
+    path.write_text(f"((burner point {len(rows)})\n" + "\n".join(sections) + "\n)\n")
+    result = AnsysInterface().extract_results(str(path))
+    heat, nox, flame_location = expected_objectives()
+    assert result['heat'] == pytest.approx(heat, rel=1e-9)
+    assert result['nox'] == pytest.approx(nox, rel=1e-9)
+    assert result['flame_location'] == pytest.approx(flame_location)
+
+
+def test_rows_not_matching_the_header(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_text("z-coordinate, temperature\n0.0, 300.0\n0.1\n")
+    with pytest.raises(ValueError):
+        AnsysInterface().extract_results(str(path))
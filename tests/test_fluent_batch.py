@@ -0,0 +1,95 @@
+# test_fluent_batch.py
+"""setup_fluent_batch journals, and run_sessions against the stand-in executables in fake_ansys.py"""
+import json
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ansys_interface import CASES_SUMMARY, AnsysInterface, main
+
+
+def case_blocks(journal):
+    """Text of each '; case N' block of a batch journal, by case number"""
+    parts = re.split(r'^\s*; case (\d+)\s*$', journal, flags=re.M)
+    return {int(number): block for number, block in zip(parts[1::2], parts[2::2])}
+
+
+def test_batch_journal(tmp_path):
+    cases = [[0.4, 0.6, 0.03], {'sic3_porosity': 0.7, 'preheating_length': 0.03,
+                                'inlet_velocity': 0.9}, [0.5, 0.8, 0.03]]
+    name, data_files, export_files = AnsysInterface().setup_fluent_batch(
+        cases, str(tmp_path), case_file="base.cas", iterations=250, indices=[4, 7, 9])
+    journal = (tmp_path / name).read_text()
+    assert data_files == ["case_0004.dat", "case_0007.dat", "case_0009.dat"]
+    assert export_files == ["case_0004.txt", "case_0007.txt", "case_0009.txt"]
+    assert journal.count('/file/read-case-data "base.cas"') == 1  # one case read per session
+    assert journal.rstrip().endswith("/exit yes")
+
+    blocks = case_blocks(journal)
+    assert list(blocks) == [4, 7, 9]
+    expected = {4: (0.4, 0.6, 0.5), 7: (0.7, 0.5, 0.9), 9: (0.5, 0.8, 0.5)}
+    for index, (sic3, sic10, velocity) in expected.items():
+        block = blocks[index]
+        assert re.search(rf'"sic3"\s+porosity {sic3}\n', block)
+        assert re.search(rf'"sic10"\s+porosity {sic10}\n', block)
+        assert f"velocity-magnitude {velocity}\n" in block
+        assert "/solve/iterate 250" in block
+        assert f'/file/write-data "case_{index:04d}.dat"' in block
+        assert f'/file/export/ascii "case_{index:04d}.txt"' in block
+    # Only the first case starts from scratch; the others continue from its data
+    assert "hybrid-initialization" in blocks[4]
+    assert all("hybrid-initialization" not in blocks[i] for i in (7, 9))
+
+
+def test_batch_needs_one_geometry(tmp_path):
+    with pytest.raises(ValueError):
+        AnsysInterface().setup_fluent_batch([[0.5, 0.5, 0.02], [0.5, 0.5, 0.03]], str(tmp_path))
+
+
+def test_sessions_per_geometry(interface, tmp_path):
+    cases = [[0.4, 0.6, 0.1], [0.5, 0.5, 0.15], [0.6, 0.7, 0.1]]
+    sessions = interface.run_sessions(cases, str(tmp_path), max_workers=2)
+    assert [s['status'] for s in sessions] == ['ok', 'ok']
+    assert [[c['case'] for c in s['cases']] for s in sessions] == [[0, 2], [1]]
+    assert [s['step'] for s in sessions[0]['steps']] == ['geometry', 'fluent']
+    directory = tmp_path / "session_0000"
+    assert (directory / "fluent_batch.jou").exists()
+    for case in sessions[0]['cases']:
+        assert case['status'] == 'ok'
+        assert case['data_file'] == str(directory / f"case_{case['case']:04d}.dat")
+        assert case['export_file'] == str(directory / f"case_{case['case']:04d}.txt")
+        assert case['flame_location'] == pytest.approx(0.1, abs=0.01)
+    # Heat release follows each case's own SiC3 porosity, so the cases were not mixed up
+    first, third = sessions[0]['cases']
+    assert third['heat'] / first['heat'] == pytest.approx(0.6 / 0.4)
+    assert sessions[1]['cases'][0]['flame_location'] == pytest.approx(0.15, abs=0.01)
+    assert json.loads((tmp_path / CASES_SUMMARY).read_text()) == sessions
+
+
+def test_session_dying_part_way_keeps_finished_cases(interface, tmp_path):
+    cases = [{'preheating_length': 0.1, 'fake_cases': 1, 'fake_exit': 1},
+             {'preheating_length': 0.1, 'sic3_porosity': 0.6}]
+    session, = interface.run_sessions(cases, str(tmp_path))
+    assert session['status'] == 'failed'
+    assert [c['status'] for c in session['cases']] == ['ok', 'failed']
+    assert session['cases'][0]['heat'] > 0 and 'heat' not in session['cases'][1]
+
+
+def test_session_timeout(interface, tmp_path):
+    session, = interface.run_sessions([{'fake_sleep': 60}, [0.6, 0.6, 0.5]], str(tmp_path),
+                                      timeout=2)
+    assert session['status'] == 'timeout'
+    assert [c['status'] for c in session['cases']] == ['timeout', 'timeout']
+
+
+def test_command_line(interface, tmp_path, capsys):
+    cases = tmp_path / "cases.json"
+    cases.write_text(json.dumps([[0.5, 0.5, 0.1], [0.6, 0.6, 0.1]]))
+    main(["--cases", str(cases), "--output", str(tmp_path / "out"), "--single-session",
+          "--ansys-command", interface.ansys_command, "--fluent-command", interface.fluent_command])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == "session    0: ok       case 0 ok, case 1 ok"
+    assert lines[1].startswith("  case    0 | heat ") and lines[2].startswith("  case    1 | heat ")
@@ -0,0 +1,91 @@
+# test_supervised_pool.py
+"""SupervisedPool timeouts, and solver.py --eval-timeout with the sensitivity screen"""
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from supervised_pool import SupervisedPool, TaskTimeout
+
+# Stand-in for solver.simulate: instant, except that porous-zone 2 above 0.8 hangs
+FAKE_SOLVER = f"""
+import sys, time
+sys.path.insert(0, {str(ROOT)!r})
+import solver
+
+def simulate(individual, w_nox=None):
+    eps1, eps2, lpre = individual
+    if eps2 > 0.8:
+        time.sleep(60)
+    return {{'heat': 1e5 * eps1 + 5e4 * eps2, 'nox': 1e-6 * lpre, 'flame_location': lpre,
+             'status': 'ok', 'solve_time': 0.0, 'grid_points': 10, 'fidelity': 'fine'}}
+
+solver.simulate = simulate
+solver.main(sys.argv[1:])
+"""
+
+
+def nap(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def refuse(args, elapsed):
+    raise TypeError(f"cannot handle {args!r}")
+
+
+def test_timed_out_task_gets_timeout_result():
+    pool = SupervisedPool(2, timeout=0.5, timeout_result=lambda args, elapsed: ('late', args))
+    try:
+        assert pool.map(nap, [0.0, 5.0, 0.1]) == [0.0, ('late', (5.0,)), 0.1]
+        assert pool.timeouts == 1 and pool.timed_out_args == [(5.0,)]
+    finally:
+        pool.terminate()
+
+
+def test_timeout_without_result_raises():
+    pool = SupervisedPool(1, timeout=0.5)
+    try:
+        with pytest.raises(TaskTimeout):
+            pool.apply_async(nap, (5.0,)).get(timeout=10)
+    finally:
+        pool.terminate()
+
+
+def test_failing_timeout_result_fails_only_that_task():
+    # It used to kill the supervisor thread, leaving every caller waiting forever
+    pool = SupervisedPool(2, timeout=0.5, timeout_result=refuse)
+    try:
+        late = pool.apply_async(nap, (5.0,))
+        with pytest.raises(TypeError):
+            late.get(timeout=10)
+        assert pool.apply_async(nap, (0.1,)).get(timeout=10) == 0.1
+    finally:
+        pool.terminate()
+
+
+def test_screen_with_eval_timeout(tmp_path):
+    script = tmp_path / "fake_solver.py"
+    script.write_text(FAKE_SOLVER)
+    run = subprocess.run([sys.executable, str(script), "--screen", "--screen-trajectories", "2",
+                          "--eval-timeout", "1", "--pop-size", "4", "--generations", "1",
+                          "--workers", "2", "--eval-log", "evaluations.jsonl"],
+                         cwd=tmp_path, capture_output=True, text=True, timeout=300,
+                         env=dict(os.environ, MPLBACKEND="Agg"))
+    assert run.returncode == 0, run.stderr
+    assert "Sensitivity screen" in run.stdout
+    timeouts = [line for line in run.stdout.splitlines() if line.startswith("  timeout: [")]
+    assert timeouts and all("np.float64" not in line for line in timeouts)
+    screening = json.loads((tmp_path / "sensitivity_screening.json").read_text())
+    assert any(value is None or value != value for row in screening['objectives'] for value in row)
+    # Screening solves are not logged, timed-out or not; timed-out GA evaluations are
+    with open(tmp_path / "evaluations.jsonl") as f:
+        records = [json.loads(line) for line in f]
+    assert all(r['generation'] is not None for r in records)
+    assert all(r['eps2'] > 0.8 for r in records if r.get('status') == 'timeout')